@@ -0,0 +1,106 @@
+'''
+Асинхронные представления для запуска под ASGI.
+
+Django 3.2 не умеет обращаться к базе асинхронно, поэтому работа с базой
+и сериализация выполняются в ограниченном пуле потоков, а отрисовка PDF
+в отдельном пуле. Event loop при этом остаётся свободным для медленных
+клиентов, а число одновременных обращений к базе ограничено размером
+пула.
+'''
+
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import FileResponse
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from recipes import shopping
+from .utils import render_pdf
+from .views import IngredientViewSet, RecipeViewset, TagViewSet
+
+DB_EXECUTOR = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_DB_THREADS, thread_name_prefix='async-db'
+)
+PDF_EXECUTOR = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_PDF_THREADS, thread_name_prefix='async-pdf'
+)
+
+
+def in_pool(func, executor=DB_EXECUTOR):
+    '''Выполнить синхронную функцию в пуле с учётом соединений с базой.'''
+
+    def run(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return sync_to_async(run, thread_sensitive=False, executor=executor)
+
+
+def offload(view):
+    '''Асинхронная обёртка над DRF представлением.'''
+
+    def handle(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+
+    handle = in_pool(handle)
+
+    async def async_view(request, *args, **kwargs):
+        return await handle(request, *args, **kwargs)
+
+    async_view.csrf_exempt = True
+    return async_view
+
+
+tag_list = offload(TagViewSet.as_view({'get': 'list'}))
+ingredient_list = offload(IngredientViewSet.as_view({'get': 'list'}))
+recipe_detail = offload(RecipeViewset.as_view({
+    'get': 'retrieve',
+    'put': 'update',
+    'patch': 'partial_update',
+    'delete': 'destroy',
+}))
+
+
+class ShoppingCartIngredients(APIView):
+    '''Ингредиенты списка покупок с проверками доступа DRF.'''
+
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request):
+        return Response(list(shopping.lines(request.user)))
+
+
+shopping_cart_ingredients = ShoppingCartIngredients.as_view()
+
+
+@in_pool
+def fetch_shopping_cart(request):
+    response = shopping_cart_ingredients(request)
+    if response.status_code != status.HTTP_200_OK:
+        response.render()
+    return response
+
+
+render_shopping_cart = in_pool(render_pdf, PDF_EXECUTOR)
+
+
+async def download_shopping_cart(request):
+    response = await fetch_shopping_cart(request)
+    if response.status_code != status.HTTP_200_OK:
+        return response
+    return FileResponse(
+        await render_shopping_cart(response.data),
+        as_attachment=True,
+        filename='grocery_list.pdf',
+    )
@@ -0,0 +1,106 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+
+class TokenCache:
+    '''
+    Кэш токенов: LRU в памяти процесса поверх общего кэша Django.
+
+    Запись в памяти процесса живёт не дольше TOKEN_CACHE_LOCAL_TTL,
+    поэтому инвалидация из другого воркера доходит до этого процесса
+    не позже чем через это время. Общий слой используется, только если
+    кэш действительно общий для воркеров (memcached и т.п.): LocMemCache
+    у каждого процесса свой, и отозванный токен жил бы в нём до
+    TOKEN_CACHE_TIMEOUT.
+    '''
+
+    prefix = 'auth_token'
+
+    def __init__(self, alias=None):
+        self.alias = alias
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def shared(self):
+        '''Общий кэш или None, если кэш живёт в памяти процесса.'''
+        cache = caches[self.alias or settings.TOKEN_CACHE_ALIAS]
+        if isinstance(cache, (LocMemCache, DummyCache)):
+            return None
+        return cache
+
+    def shared_key(self, key):
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return f'{self.prefix}:{digest}'
+
+    def get(self, key):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                token, expires = entry
+                if expires > now:
+                    self.entries.move_to_end(key)
+                    return token
+                del self.entries[key]
+        shared = self.shared()
+        if shared is None:
+            return None
+        token = shared.get(self.shared_key(key))
+        if token is not None:
+            self.remember(key, token)
+        return token
+
+    def set(self, key, token):
+        shared = self.shared()
+        if shared is not None:
+            shared.set(
+                self.shared_key(key), token, settings.TOKEN_CACHE_TIMEOUT
+            )
+        self.remember(key, token)
+
+    def remember(self, key, token):
+        with self.lock:
+            self.entries[key] = (
+                token, time.monotonic() + settings.TOKEN_CACHE_LOCAL_TTL
+            )
+            self.entries.move_to_end(key)
+            while len(self.entries) > settings.TOKEN_CACHE_LOCAL_SIZE:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, *keys):
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+        shared = self.shared()
+        if shared is not None:
+            shared.delete_many([self.shared_key(key) for key in keys])
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    '''Аутентификация по токену без запроса к базе на повторных запросах.'''
+
+    def authenticate_credentials(self, key):
+        token = token_cache.get(key)
+        if token is None:
+            _, token = super().authenticate_credentials(key)
+            token_cache.set(key, token)
+        elif not token.user.is_active:
+            raise exceptions.AuthenticationFailed(
+                'Пользователь неактивен или удалён.'
+            )
+        token = copy.copy(token)
+        token.user = copy.copy(token.user)
+        return (token.user, token)
@@ -0,0 +1,48 @@
+'''
+Маршрутизация чтения на реплики базы данных.
+
+Чтение уходит на реплики только внутри запросов, которые
+ReplicaRoutingMiddleware пометил как безопасные. Запись всегда идёт в
+основную базу, а после первой записи все дальнейшие чтения этого же
+запроса тоже закрепляются за ней.
+'''
+
+import random
+from contextlib import contextmanager
+
+from asgiref.local import Local
+from django.conf import settings
+
+PRIMARY = 'default'
+
+state = Local()
+
+
+@contextmanager
+def replica_reads(enabled):
+    '''Разрешить чтение с реплик на время обработки запроса.'''
+    state.use_replica = enabled
+    state.wrote = False
+    try:
+        yield state
+    finally:
+        state.use_replica = False
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if not getattr(state, 'use_replica', False):
+            return PRIMARY
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        state.use_replica = False
+        state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
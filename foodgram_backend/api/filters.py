@@ -1,7 +1,104 @@
+from django import forms
+from django.db.models import Exists, OuterRef
+from django_filters import rest_framework as filters
 from rest_framework.filters import SearchFilter
 
+from recipes.models import (FavoriteRecipe, Recipe, RecipeIngredient,
+                            ShoppingCart, Tag)
+
 
 class IngredientSearchFilter(SearchFilter):
     '''Фильтрация названий ингредиентов.'''
 
     search_param = 'name'
+
+
+class NumberInFilter(filters.BaseInFilter, filters.NumberFilter):
+    pass
+
+
+class MultipleValueField(forms.Field):
+    widget = forms.MultipleHiddenInput
+
+    def to_python(self, value):
+        return [str(item) for item in value or ()]
+
+
+class MultipleValueFilter(filters.Filter):
+    '''Несколько значений параметра: ?tags=lunch&tags=dinner.'''
+
+    field_class = MultipleValueField
+
+
+class RecipeFilter(filters.FilterSet):
+    '''
+    Фильтрация рецептов.
+
+    Условия по связанным таблицам проверяются подзапросами EXISTS и
+    NOT EXISTS, а не соединениями, поэтому рецепт не размножается в
+    выдаче и distinct() не нужен.
+    '''
+
+    author = filters.NumberFilter(field_name='author')
+    tags = MultipleValueFilter(method='filter_tags')
+    is_favorited = filters.BooleanFilter(method='filter_is_favorited')
+    is_in_shopping_cart = filters.BooleanFilter(
+        method='filter_is_in_shopping_cart'
+    )
+    cooking_time_min = filters.NumberFilter(
+        field_name='cooking_time', lookup_expr='gte'
+    )
+    cooking_time_max = filters.NumberFilter(
+        field_name='cooking_time', lookup_expr='lte'
+    )
+    ingredients = NumberInFilter(method='filter_ingredients')
+    exclude_ingredients = NumberInFilter(method='filter_exclude_ingredients')
+
+    class Meta:
+        model = Recipe
+        fields = (
+            'author', 'tags', 'is_favorited', 'is_in_shopping_cart',
+            'cooking_time_min', 'cooking_time_max',
+            'ingredients', 'exclude_ingredients',
+        )
+
+    def filter_tags(self, queryset, name, value):
+        '''Рецепты с любым из тегов; неизвестные slug ничего не находят.'''
+        if not value:
+            return queryset
+        return queryset.filter(Exists(Recipe.tags.through.objects.filter(
+            recipe_id=OuterRef('pk'),
+            tag_id__in=Tag.objects.filter(slug__in=value).values('id'),
+        )))
+
+    def filter_user_list(self, queryset, model, value):
+        '''Только рецепты из списка пользователя; 0 не фильтрует.'''
+        if not value:
+            return queryset
+        if not self.request.user.is_authenticated:
+            return queryset.none()
+        return queryset.filter(Exists(model.objects.filter(
+            user=self.request.user, recipe_id=OuterRef('pk')
+        )))
+
+    def filter_is_favorited(self, queryset, name, value):
+        return self.filter_user_list(queryset, FavoriteRecipe, value)
+
+    def filter_is_in_shopping_cart(self, queryset, name, value):
+        return self.filter_user_list(queryset, ShoppingCart, value)
+
+    def filter_ingredients(self, queryset, name, value):
+        '''Рецепты, в которых есть все указанные ингредиенты.'''
+        for ingredient_id in set(value):
+            queryset = queryset.filter(Exists(RecipeIngredient.objects.filter(
+                recipe_id=OuterRef('pk'), ingredient_id=ingredient_id
+            )))
+        return queryset
+
+    def filter_exclude_ingredients(self, queryset, name, value):
+        '''Рецепты без единого из указанных ингредиентов.'''
+        if not value:
+            return queryset
+        return queryset.filter(~Exists(RecipeIngredient.objects.filter(
+            recipe_id=OuterRef('pk'), ingredient_id__in=set(value)
+        )))
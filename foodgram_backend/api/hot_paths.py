@@ -0,0 +1,219 @@
+'''
+Основные эндпоинты API для замеров производительности.
+
+Для каждого эндпоинта подбирается самый нагруженный объект текущей
+базы: пользователь с наибольшим числом подписок и покупок, автор с
+наибольшим числом рецептов, самый популярный рецепт. get_sessions
+описывает сценарии пользовательских сессий для нагрузочного теста.
+'''
+
+import threading
+from urllib.parse import quote
+
+from django.db.models import Count
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from recipes.models import (FavoriteRecipe, Ingredient, Recipe, ShoppingCart,
+                            Tag)
+from users.models import User
+
+
+def get_token(user):
+    token, _ = Token.objects.get_or_create(user=user)
+    return token.key
+
+
+def get_busiest(queryset, relation):
+    return queryset.annotate(
+        count=Count(relation)
+    ).order_by('-count').first()
+
+
+def get_hot_requests():
+    '''Список (имя, адрес, заголовки) для основных сценариев API.'''
+    follower = get_busiest(User.objects, 'follower')
+    shopper = get_busiest(User.objects, 'shopping')
+    author = get_busiest(User.objects, 'recipes')
+    recipe = get_busiest(Recipe.objects, 'favorite')
+    tags = '&'.join(
+        f'tags={slug}'
+        for slug in Tag.objects.values_list('slug', flat=True)[:2]
+    )
+    anonymous = {}
+    follower_headers = {'Authorization': f'Token {get_token(follower)}'}
+    shopper_headers = {'Authorization': f'Token {get_token(shopper)}'}
+    return (
+        ('recipe_list', '/api/recipes/', anonymous),
+        ('recipe_list_auth', '/api/recipes/', follower_headers),
+        ('recipe_list_tags', f'/api/recipes/?{tags}', follower_headers),
+        ('recipe_list_author', f'/api/recipes/?author={author.id}',
+         anonymous),
+        ('recipe_list_favorited', '/api/recipes/?is_favorited=1',
+         follower_headers),
+        ('recipe_detail', f'/api/recipes/{recipe.id}/', follower_headers),
+        ('subscriptions', '/api/users/subscriptions/', follower_headers),
+        ('ingredient_search', f'/api/ingredients/?name={quote("са")}',
+         anonymous),
+        ('download_shopping_cart', '/api/recipes/download_shopping_cart/',
+         shopper_headers),
+    )
+
+
+class SessionReservations:
+    '''
+    Рецепты, закреплённые за идущими сессиями нагрузочного теста.
+
+    Рецепт добавляется во множество пользователя taken на время сессии,
+    чтобы параллельная сессия того же пользователя не взяла его и не
+    получила 400 на повторное добавление. run_sessions выполняет сессии
+    потока по очереди, поэтому закрепление снимается, когда поток
+    начинает следующую сессию.
+    '''
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.held = threading.local()
+
+    def take(self, candidates, taken, count):
+        '''До count рецептов из candidates, которых нет в taken.'''
+        with self.lock:
+            chosen = [
+                recipe_id for recipe_id in candidates
+                if recipe_id not in taken
+            ][:count]
+            taken.update(chosen)
+            self.held.recipes = [(taken, recipe_id) for recipe_id in chosen]
+        return chosen
+
+    def release(self):
+        with self.lock:
+            for taken, recipe_id in getattr(self.held, 'recipes', ()):
+                taken.discard(recipe_id)
+            self.held.recipes = []
+
+    def session(self, script):
+        '''Сценарий, снимающий закрепления прошлой сессии потока.'''
+        def run(rng):
+            self.release()
+            return script(rng)
+        return run
+
+
+def get_sessions(users=50, recipes=1000):
+    '''
+    Сценарии сессий для run_sessions: (имя, вес, сценарий).
+
+    Сессии выбирают случайных пользователей из первых users и рецепты
+    из recipes последних. Избранное и покупки добавляются только для
+    рецептов, которых у пользователя ещё нет, и в конце сессии
+    удаляются, поэтому повторные прогоны идут на той же базе.
+    Выбранные рецепты закрепляются за сессией, см. SessionReservations.
+    '''
+    profiles = []
+    for user in User.objects.order_by('id')[:users]:
+        profiles.append((
+            {'Authorization': f'Token {get_token(user)}'},
+            set(FavoriteRecipe.objects.filter(
+                user=user
+            ).values_list('recipe_id', flat=True)),
+            set(ShoppingCart.objects.filter(
+                user=user
+            ).values_list('recipe_id', flat=True)),
+        ))
+    recipe_ids = list(Recipe.objects.order_by(
+        '-pub_date'
+    ).values_list('id', flat=True)[:recipes])
+    slugs = list(Tag.objects.values_list('slug', flat=True))
+    names = list(Ingredient.objects.values_list('name', flat=True)[:500])
+    if not (profiles and recipe_ids and slugs and names):
+        raise ValueError('Нужны пользователи, рецепты, теги и ингредиенты.')
+
+    reservations = SessionReservations()
+
+    def visitor(rng):
+        return {} if rng.random() < 0.5 else rng.choice(profiles)[0]
+
+    def new_recipes(rng, taken, count):
+        sample = rng.sample(recipe_ids, min(len(recipe_ids), count * 4))
+        return [
+            f'/api/recipes/{recipe_id}/'
+            for recipe_id in reservations.take(sample, taken, count)
+        ]
+
+    def browse(rng):
+        tags = '&'.join(
+            f'tags={slug}'
+            for slug in rng.sample(slugs, rng.randint(1, min(3, len(slugs))))
+        )
+        return visitor(rng), [
+            ('recipe_list', 'GET', '/api/recipes/'),
+            ('recipe_list_tags', 'GET', f'/api/recipes/?{tags}'),
+            ('recipe_list_tags', 'GET', f'/api/recipes/?page=2&{tags}'),
+            ('recipe_detail', 'GET',
+             f'/api/recipes/{rng.choice(recipe_ids)}/'),
+        ]
+
+    def favorite(rng):
+        headers, favorites, _ = rng.choice(profiles)
+        steps = [('recipe_list', 'GET', '/api/recipes/')]
+        for recipe in new_recipes(rng, favorites, 1):
+            steps += [
+                ('recipe_detail', 'GET', recipe),
+                ('favorite_add', 'POST', f'{recipe}favorite/'),
+                ('recipe_list_favorited', 'GET',
+                 '/api/recipes/?is_favorited=1'),
+                ('favorite_remove', 'DELETE', f'{recipe}favorite/'),
+            ]
+        return headers, steps
+
+    def shopping(rng):
+        headers, _, cart = rng.choice(profiles)
+        recipes = new_recipes(rng, cart, 3)
+        return headers, [
+            ('cart_add', 'POST', f'{recipe}shopping_cart/')
+            for recipe in recipes
+        ] + [
+            ('cart_summary', 'GET', '/api/recipes/shopping_cart/summary/'),
+            ('download_shopping_cart', 'GET',
+             '/api/recipes/download_shopping_cart/'),
+        ] + [
+            ('cart_remove', 'DELETE', f'{recipe}shopping_cart/')
+            for recipe in recipes
+        ]
+
+    def search(rng):
+        name = rng.choice(names).lower()
+        return visitor(rng), [
+            ('ingredient_search', 'GET',
+             f'/api/ingredients/?name={quote(name[:length])}')
+            for length in range(1, min(len(name), 4) + 1)
+        ]
+
+    return (
+        ('browse', 50, reservations.session(browse)),
+        ('search_ingredients', 20, reservations.session(search)),
+        ('favorite', 15, reservations.session(favorite)),
+        ('shopping', 15, reservations.session(shopping)),
+    )
+
+
+def get_hot_endpoints():
+    '''Список (имя, клиент, адрес) для тестового клиента DRF.'''
+    endpoints = []
+    for name, url, headers in get_hot_requests():
+        client = APIClient()
+        if headers:
+            client.credentials(HTTP_AUTHORIZATION=headers['Authorization'])
+        endpoints.append((name, client, url))
+    return endpoints
+
+
+def fetch(client, url):
+    '''Запрос к эндпоинту с чтением всего тела ответа.'''
+    response = client.get(url)
+    if response.streaming:
+        body = b''.join(response.streaming_content)
+    else:
+        body = response.content
+    return response.status_code, len(body)
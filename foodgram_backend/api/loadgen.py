@@ -0,0 +1,154 @@
+'''
+Генератор HTTP нагрузки для замеров пропускной способности.
+
+Каждый поток держит собственное keep-alive соединение и до истечения
+времени отправляет запросы к случайно выбранным адресам или
+проигрывает сценарии пользовательских сессий.
+'''
+
+import http.client
+import random
+import statistics
+import threading
+import time
+from collections import Counter
+
+
+def percentile(values, percent):
+    values = sorted(values)
+    index = min(len(values) - 1, round(percent / 100 * (len(values) - 1)))
+    return values[index]
+
+
+def summarize(samples, duration):
+    '''Пропускная способность и перцентили задержки по эндпоинтам.'''
+    endpoints = {}
+    for name, status, latency in samples:
+        endpoint = endpoints.setdefault(
+            name, {'latencies': [], 'errors': 0}
+        )
+        endpoint['latencies'].append(latency * 1000)
+        if not 200 <= status < 400:
+            endpoint['errors'] += 1
+    report = {}
+    for name, endpoint in sorted(endpoints.items()):
+        latencies = endpoint['latencies']
+        report[name] = {
+            'requests': len(latencies),
+            'errors': endpoint['errors'],
+            'rps': round(len(latencies) / duration, 2),
+            'mean_ms': round(statistics.mean(latencies), 3),
+            'p50_ms': round(percentile(latencies, 50), 3),
+            'p95_ms': round(percentile(latencies, 95), 3),
+            'p99_ms': round(percentile(latencies, 99), 3),
+        }
+    latencies = [latency * 1000 for _, _, latency in samples]
+    report['total'] = {
+        'requests': len(samples),
+        'errors': sum(item['errors'] for item in endpoints.values()),
+        'rps': round(len(samples) / duration, 2),
+        'p50_ms': round(percentile(latencies, 50), 3) if samples else None,
+        'p95_ms': round(percentile(latencies, 95), 3) if samples else None,
+        'p99_ms': round(percentile(latencies, 99), 3) if samples else None,
+    }
+    return report
+
+
+def send(connection, method, url, headers, body=None):
+    connection.request(method, url, body=body, headers=headers)
+    response = connection.getresponse()
+    return response.status, response.read()
+
+
+def run_load(host, port, targets, concurrency, duration, seed=None):
+    '''Нагрузка по списку (имя, адрес, заголовки) в несколько потоков.'''
+    samples = []
+    deadline = time.monotonic() + duration
+
+    def worker(number):
+        rng = random.Random(None if seed is None else seed + number)
+        connection = http.client.HTTPConnection(host, port, timeout=60)
+        while time.monotonic() < deadline:
+            name, url, headers = rng.choice(targets)
+            started = time.perf_counter()
+            try:
+                status, _ = send(connection, 'GET', url, headers)
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                connection = http.client.HTTPConnection(
+                    host, port, timeout=60
+                )
+                status = 0
+            samples.append((name, status, time.perf_counter() - started))
+        connection.close()
+
+    threads = [
+        threading.Thread(target=worker, args=(number,), daemon=True)
+        for number in range(concurrency)
+    ]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(samples, time.monotonic() - started)
+
+
+def run_sessions(host, port, sessions, concurrency, duration, seed=None,
+                 think_time=0):
+    '''
+    Нагрузка сценариями сессий в несколько потоков.
+
+    sessions - список (имя, вес, сценарий), где сценарий по генератору
+    случайных чисел возвращает заголовки и шаги (имя, метод, адрес).
+    Поток выбирает сессию с учётом весов и выполняет её шаги подряд,
+    делая паузу think_time секунд между шагами. Начатая сессия
+    доигрывается и после истечения времени, чтобы сценарии успели
+    убрать за собой избранное и покупки.
+    '''
+    samples = []
+    completed = []
+    deadline = time.monotonic() + duration
+    weights = [weight for _, weight, _ in sessions]
+
+    def worker(number):
+        rng = random.Random(None if seed is None else seed + number)
+        connection = http.client.HTTPConnection(host, port, timeout=60)
+        while time.monotonic() < deadline:
+            session, _, script = rng.choices(sessions, weights)[0]
+            headers, steps = script(rng)
+            for name, method, url in steps:
+                started = time.perf_counter()
+                try:
+                    status, _ = send(connection, method, url, headers)
+                except (OSError, http.client.HTTPException):
+                    connection.close()
+                    connection = http.client.HTTPConnection(
+                        host, port, timeout=60
+                    )
+                    status = 0
+                samples.append((name, status, time.perf_counter() - started))
+                if think_time:
+                    time.sleep(rng.expovariate(1 / think_time))
+            completed.append(session)
+        connection.close()
+
+    threads = [
+        threading.Thread(target=worker, args=(number,), daemon=True)
+        for number in range(concurrency)
+    ]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+    report = summarize(samples, elapsed)
+    report['sessions'] = {
+        name: {
+            'completed': count,
+            'per_minute': round(count / elapsed * 60, 2),
+        }
+        for name, count in sorted(Counter(completed).items())
+    }
+    return report
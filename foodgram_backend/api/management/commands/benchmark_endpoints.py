@@ -0,0 +1,157 @@
+'''
+Management-команда на замер времени ответа основных эндпоинтов API.
+
+По умолчанию создаёт отдельную тестовую базу, наполняет её
+generate_fake_data до каждого из размеров --sizes и замеряет время
+ответа и количество SQL запросов. Результат пишется в JSON отчёт,
+который можно сравнить с предыдущим через --baseline.
+'''
+
+import json
+import statistics
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api.hot_paths import fetch, get_hot_endpoints
+from api.loadgen import percentile
+from recipes.models import Recipe
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Замер времени ответа основных эндпоинтов API.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[100, 1000, 10000],
+            help='Количество рецептов в базе для каждого замера.'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Количество запросов к каждому эндпоинту.'
+        )
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument(
+            '--output', default='benchmark.json', help='Файл отчёта.'
+        )
+        parser.add_argument(
+            '--baseline', help='Предыдущий отчёт для сравнения.'
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.2,
+            help='Допустимый относительный рост медианы времени ответа.'
+        )
+        parser.add_argument(
+            '--use-current-db', action='store_true',
+            help='Замерять на текущей базе без генерации данных.'
+        )
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        self.options = options
+        if options['use_current_db']:
+            runs = [self.measure(Recipe.objects.count())]
+        else:
+            runs = self.run_on_test_db()
+        report = {
+            'created': timezone.now().isoformat(),
+            'vendor': connection.vendor,
+            'repeat': options['repeat'],
+            'runs': runs,
+        }
+        with open(options['output'], 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        self.stdout.write(f'Отчёт сохранён в {options["output"]}.')
+        if options['baseline']:
+            self.compare(report, options['baseline'])
+
+    def run_on_test_db(self):
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        runs = []
+        try:
+            call_command('load_ingredients')
+            call_command('load_tags')
+            for size in sorted(self.options['sizes']):
+                missing = size - Recipe.objects.count()
+                if missing > 0:
+                    call_command(
+                        'generate_fake_data',
+                        users=max(size // 10 - User.objects.count(), 10),
+                        recipes=missing,
+                        follows=missing * 2,
+                        favorites=missing * 5,
+                        carts=missing,
+                        seed=self.options['seed'] + size,
+                        stdout=self.stdout,
+                    )
+                runs.append(self.measure(size))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+        return runs
+
+    def measure(self, size):
+        endpoints = {}
+        for name, client, url in get_hot_endpoints():
+            for _ in range(self.options['warmup']):
+                fetch(client, url)
+            timings = []
+            for _ in range(self.options['repeat']):
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    status, length = fetch(client, url)
+                    timings.append((time.perf_counter() - started) * 1000)
+            endpoints[name] = {
+                'url': url,
+                'status': status,
+                'bytes': length,
+                'queries': len(queries),
+                'min_ms': round(min(timings), 3),
+                'median_ms': round(statistics.median(timings), 3),
+                'p95_ms': round(percentile(timings, 95), 3),
+                'max_ms': round(max(timings), 3),
+            }
+            self.stdout.write(
+                f'{size:>8} {name:<24} {endpoints[name]["median_ms"]:>9} ms '
+                f'{len(queries):>4} queries'
+            )
+        return {
+            'size': size,
+            'counts': {
+                'users': User.objects.count(),
+                'recipes': Recipe.objects.count(),
+            },
+            'endpoints': endpoints,
+        }
+
+    def compare(self, report, path):
+        with open(path, 'r', encoding='utf-8') as file:
+            baseline = {
+                run['size']: run['endpoints']
+                for run in json.load(file)['runs']
+            }
+        regressions = 0
+        for run in report['runs']:
+            previous = baseline.get(run['size'], {})
+            for name, result in run['endpoints'].items():
+                if name not in previous:
+                    continue
+                old = previous[name]
+                slower = (result['median_ms']
+                          > old['median_ms'] * (1 + self.options['tolerance']))
+                if slower or result['queries'] > old['queries']:
+                    regressions += 1
+                    self.stdout.write(self.style.WARNING(
+                        f'{run["size"]} {name}: '
+                        f'{old["median_ms"]} -> {result["median_ms"]} ms, '
+                        f'{old["queries"]} -> {result["queries"]} queries'
+                    ))
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS('Регрессий не найдено.'))
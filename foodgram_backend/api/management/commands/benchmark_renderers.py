@@ -0,0 +1,71 @@
+'''
+Management-команда на сравнение JSON рендереров и парсеров API.
+
+Берёт данные сериализаторов (ReturnDict/ReturnList) из основных
+эндпоинтов на текущей базе и замеряет время JSONRenderer и
+ORJSONRenderer, а также разбор полученного тела JSONParser и
+ORJSONParser. Перед замером проверяет, что оба рендерера выдают
+одинаковый JSON.
+'''
+
+import io
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api.hot_paths import get_hot_endpoints
+from api.renderers import ORJSONParser, ORJSONRenderer, orjson
+
+
+def measure(func, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1_000_000
+
+
+class Command(BaseCommand):
+    help = 'Сравнение времени JSON рендереров и парсеров API.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat', type=int, default=1000,
+            help='Количество повторов для каждого замера.'
+        )
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            raise CommandError('orjson не установлен.')
+        repeat = options['repeat']
+        renderers = (JSONRenderer(), ORJSONRenderer())
+        parsers = (JSONParser(), ORJSONParser())
+        self.stdout.write(
+            f'{"endpoint":<24} {"bytes":>8} {"render, мкс":>22} '
+            f'{"parse, мкс":>22}'
+        )
+        for name, client, url in get_hot_endpoints():
+            response = client.get(url)
+            if response.streaming or not hasattr(response, 'data'):
+                continue
+            data = response.data
+            bodies = [renderer.render(data) for renderer in renderers]
+            if json.loads(bodies[0]) != json.loads(bodies[1]):
+                raise CommandError(f'{name}: ответы рендереров различаются.')
+            render = [
+                measure(lambda: renderer.render(data), repeat)
+                for renderer in renderers
+            ]
+            parse = [
+                measure(lambda: parser.parse(io.BytesIO(bodies[0])), repeat)
+                for parser in parsers
+            ]
+            self.stdout.write(
+                f'{name:<24} {len(bodies[0]):>8} '
+                f'{render[0]:>8.1f} -> {render[1]:>6.1f} '
+                f'(x{render[0] / render[1]:.1f}) '
+                f'{parse[0]:>8.1f} -> {parse[1]:>6.1f} '
+                f'(x{parse[0] / parse[1]:.1f})'
+            )
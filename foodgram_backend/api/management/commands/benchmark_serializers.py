@@ -0,0 +1,92 @@
+'''
+Management-команда на сравнение RecipeListSerializer и RecipeReader.
+
+Для сценариев списка и карточки рецепта из основных эндпоинтов строит
+ответ обоими способами на текущей базе, проверяет, что JSON совпадает
+побайтно, и замеряет процессорное время и количество SQL запросов.
+'''
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.authentication import CachedTokenAuthentication
+from api.hot_paths import get_hot_requests
+from api.readers import RecipeReader
+from api.renderers import ORJSONRenderer
+from api.serializers import RecipeListSerializer
+from api.views import RecipeViewset
+
+
+def measure(func, repeat):
+    started = time.process_time()
+    for _ in range(repeat):
+        reset_queries()
+        with CaptureQueriesContext(connection) as queries:
+            result = func()
+    elapsed = (time.process_time() - started) / repeat * 1000
+    return result, elapsed, len(queries)
+
+
+class Command(BaseCommand):
+    help = 'Сравнение RecipeListSerializer и RecipeReader на текущей базе.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--page-size', type=int,
+            default=settings.REST_FRAMEWORK['PAGE_SIZE'],
+            help='Количество рецептов на странице списка.'
+        )
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        factory = APIRequestFactory()
+        renderer = ORJSONRenderer()
+        self.stdout.write(
+            f'{"endpoint":<24} {"serializer":>16} {"reader":>16}'
+        )
+        for name, url, headers in get_hot_requests():
+            if not name.startswith('recipe_'):
+                continue
+            request = Request(
+                factory.get(url, HTTP_AUTHORIZATION=headers.get(
+                    'Authorization', ''
+                )),
+                authenticators=[CachedTokenAuthentication()],
+            )
+            view = RecipeViewset(request=request, format_kwarg=None)
+            queryset = view.get_queryset()
+            many = name != 'recipe_detail'
+            if many:
+                queryset = queryset[:options['page_size']]
+            else:
+                queryset = queryset.filter(pk=url.rstrip('/').split('/')[-1])
+            reader = RecipeReader(request)
+
+            def serializer_data():
+                return RecipeListSerializer(
+                    list(queryset.all()), many=True,
+                    context={'request': request}
+                ).data
+
+            def reader_data():
+                return reader.serialize(reader.rows(queryset.all()))
+
+            expected, old_ms, old_queries = measure(
+                serializer_data, options['repeat']
+            )
+            actual, new_ms, new_queries = measure(
+                reader_data, options['repeat']
+            )
+            if renderer.render(expected) != renderer.render(actual):
+                raise CommandError(f'{name}: ответы различаются.')
+            self.stdout.write(
+                f'{name:<24} {old_ms:>7.2f} ms {old_queries:>3} q '
+                f'{new_ms:>7.2f} ms {new_queries:>3} q '
+                f'(x{old_ms / new_ms:.1f})'
+            )
@@ -0,0 +1,133 @@
+'''
+Management-команда на сравнение WSGI и ASGI режимов под нагрузкой.
+
+Поочерёдно запускает gunicorn с синхронными воркерами и с воркерами
+uvicorn на текущей базе, нагружает основные эндпоинты и сравнивает
+пропускную способность и хвостовые задержки. Если задан --memory-mb,
+число воркеров каждого режима подбирается так, чтобы суммарная память
+сервера укладывалась в этот бюджет.
+'''
+
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.hot_paths import get_hot_requests
+from api.loadgen import run_load
+
+MODES = {
+    'wsgi': ('foodgram_backend.wsgi:application', []),
+    'asgi': (
+        'foodgram_backend.asgi:application',
+        ['--worker-class', 'uvicorn.workers.UvicornWorker'],
+    ),
+}
+
+GUNICORN = 'from gunicorn.app.wsgiapp import run; run()'
+
+
+def get_rss(pid):
+    '''Память процесса и всех его потомков в мегабайтах (Linux).'''
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f'/proc/{current}/status', encoding='utf-8') as file:
+                for line in file:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1])
+            with open(
+                f'/proc/{current}/task/{current}/children', encoding='utf-8'
+            ) as file:
+                pending.extend(int(child) for child in file.read().split())
+        except OSError:
+            continue
+    return round(total / 1024, 1)
+
+
+class Command(BaseCommand):
+    help = 'Сравнение пропускной способности WSGI и ASGI режимов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument(
+            '--memory-mb', type=float,
+            help='Бюджет памяти сервера для подбора числа воркеров.'
+        )
+        parser.add_argument('--concurrency', type=int, default=32)
+        parser.add_argument('--duration', type=float, default=30)
+        parser.add_argument('--output', default='benchmark_servers.json')
+
+    def handle(self, *args, **options):
+        self.options = options
+        targets = get_hot_requests()
+        report = {}
+        for mode in MODES:
+            workers = options['workers']
+            if options['memory_mb']:
+                workers = self.fit_workers(mode, targets)
+            report[mode] = self.measure(mode, workers, targets)
+            total = report[mode]['load']['total']
+            self.stdout.write(
+                f'{mode}: {workers} воркеров, {report[mode]["rss_mb"]} МБ, '
+                f'{total["rps"]} rps, p95 {total["p95_ms"]} мс, '
+                f'p99 {total["p99_ms"]} мс, ошибок {total["errors"]}'
+            )
+        with open(options['output'], 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        self.stdout.write(f'Отчёт сохранён в {options["output"]}.')
+
+    def start(self, mode, workers):
+        application, arguments = MODES[mode]
+        process = subprocess.Popen(
+            [sys.executable, '-c', GUNICORN, application,
+             '--bind', f'127.0.0.1:{self.options["port"]}',
+             '--workers', str(workers), *arguments],
+            env=os.environ.copy(),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        url = f'http://127.0.0.1:{self.options["port"]}/api/tags/'
+        for _ in range(100):
+            if process.poll() is not None:
+                raise CommandError(f'Сервер {mode} не запустился.')
+            try:
+                urllib.request.urlopen(url, timeout=1).read()
+                return process
+            except OSError:
+                time.sleep(0.2)
+        process.terminate()
+        raise CommandError(f'Сервер {mode} не отвечает.')
+
+    def stop(self, process):
+        process.terminate()
+        process.wait(timeout=30)
+
+    def fit_workers(self, mode, targets):
+        process = self.start(mode, 1)
+        try:
+            run_load('127.0.0.1', self.options['port'], targets, 4, 3)
+            worker_rss = get_rss(process.pid) / 2
+        finally:
+            self.stop(process)
+        return max(1, int(self.options['memory_mb'] // worker_rss) - 1)
+
+    def measure(self, mode, workers, targets):
+        process = self.start(mode, workers)
+        try:
+            run_load('127.0.0.1', self.options['port'], targets, 4, 2)
+            load = run_load(
+                '127.0.0.1', self.options['port'], targets,
+                self.options['concurrency'], self.options['duration'], seed=1
+            )
+            rss = get_rss(process.pid)
+        finally:
+            self.stop(process)
+        return {'workers': workers, 'rss_mb': rss, 'load': load}
@@ -0,0 +1,121 @@
+'''
+Management-команда на поиск запросов без подходящих индексов.
+
+Выполняет основные эндпоинты API на текущей базе, собирает их SELECT
+запросы и прогоняет каждый через EXPLAIN. В отчёт попадают полные
+просмотры таблиц (Seq Scan) и сортировки, для которых не нашлось
+индекса.
+'''
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.hot_paths import fetch, get_hot_endpoints
+from api.slow_queries import normalize
+
+
+class Command(BaseCommand):
+    help = 'Поиск полных просмотров таблиц и сортировок в запросах API.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-rows', type=int, default=1000,
+            help='Не сообщать о просмотре таблиц меньше этого размера '
+                 '(только PostgreSQL).'
+        )
+        parser.add_argument(
+            '--analyze', action='store_true',
+            help='Использовать EXPLAIN ANALYZE (только PostgreSQL).'
+        )
+        parser.add_argument(
+            '--json', action='store_true', help='Вывести отчёт в JSON.'
+        )
+        parser.add_argument(
+            '--fail', action='store_true',
+            help='Завершиться с ошибкой, если найдены проблемы.'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('postgresql', 'sqlite'):
+            raise CommandError(
+                f'База {connection.vendor} не поддерживается.'
+            )
+        self.options = options
+        self.tables = set(connection.introspection.table_names())
+        report = {}
+        seen = set()
+        for name, client, url in get_hot_endpoints():
+            with CaptureQueriesContext(connection) as queries:
+                fetch(client, url)
+            findings = []
+            for query in queries.captured_queries:
+                sql = query['sql']
+                statement = normalize(sql)
+                if not sql.startswith('SELECT') or statement in seen:
+                    continue
+                seen.add(statement)
+                findings.extend(
+                    {'issue': issue, 'statement': statement}
+                    for issue in self.explain(sql)
+                )
+            report[name] = {'url': url, 'findings': findings}
+        self.write_report(report)
+        if options['fail'] and any(
+            endpoint['findings'] for endpoint in report.values()
+        ):
+            raise CommandError('Найдены запросы без подходящих индексов.')
+
+    def explain(self, sql):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                prefix = connection.ops.explain_query_prefix(
+                    format='json', analyze=self.options['analyze']
+                )
+                cursor.execute(f'{prefix} {sql}')
+                plan = cursor.fetchone()[0]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                return list(self.walk_postgresql(cursor, plan[0]['Plan']))
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return list(self.walk_sqlite(cursor.fetchall()))
+
+    def walk_postgresql(self, cursor, node):
+        node_type = node['Node Type']
+        if node_type == 'Seq Scan':
+            table = node['Relation Name']
+            cursor.execute(
+                'SELECT reltuples FROM pg_class WHERE relname = %s', [table]
+            )
+            rows = int(cursor.fetchone()[0])
+            if rows >= self.options['min_rows']:
+                yield f'Seq Scan on {table} (~{rows} строк)'
+        elif node_type in ('Sort', 'Incremental Sort'):
+            yield f'{node_type} by {", ".join(node["Sort Key"])}'
+        for child in node.get('Plans', ()):
+            yield from self.walk_postgresql(cursor, child)
+
+    def walk_sqlite(self, rows):
+        for row in rows:
+            detail = row[-1]
+            words = detail.split()
+            if (words[0] == 'SCAN' and words[1] in self.tables
+                    and 'USING' not in words):
+                yield f'Seq Scan on {words[1]}'
+            elif detail.startswith('USE TEMP B-TREE FOR ORDER BY'):
+                yield 'Sort (temp b-tree)'
+
+    def write_report(self, report):
+        if self.options['json']:
+            self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+            return
+        for name, endpoint in report.items():
+            if not endpoint['findings']:
+                self.stdout.write(self.style.SUCCESS(f'{name}: OK'))
+                continue
+            self.stdout.write(self.style.WARNING(f'{name} {endpoint["url"]}'))
+            for finding in endpoint['findings']:
+                self.stdout.write(f'  {finding["issue"]}')
+                self.stdout.write(f'    {finding["statement"][:200]}')
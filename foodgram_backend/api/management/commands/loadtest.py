@@ -0,0 +1,144 @@
+'''
+Management-команда на нагрузочное тестирование сценариями сессий.
+
+Проигрывает взвешенные сценарии пользователей: просмотр рецептов с
+фильтром по тегам, открытие рецепта, избранное, покупки со скачиванием
+списка и поиск ингредиентов. Нагружает сервер по адресу --url или, если
+адрес не задан, запускает приложение в отдельном потоке на текущей базе,
+как LiveServerTestCase. Пропускная способность и перцентили задержки по
+эндпоинтам сохраняются в JSON.
+'''
+
+import json
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.testcases import LiveServerThread, _StaticFilesHandler
+
+from api.hot_paths import get_sessions
+from api.loadgen import run_sessions
+
+
+def with_prefix(sessions, prefix):
+    '''Сценарии с адресами относительно prefix, например /foodgram.'''
+    def wrap(script):
+        def prefixed(rng):
+            headers, steps = script(rng)
+            return headers, [
+                (name, method, prefix + url) for name, method, url in steps
+            ]
+        return prefixed
+    return [
+        (name, weight, wrap(script)) for name, weight, script in sessions
+    ]
+
+
+def parse_weights(values):
+    weights = {}
+    for value in values:
+        name, _, weight = value.partition('=')
+        try:
+            weights[name] = float(weight)
+        except ValueError:
+            raise CommandError(f'Неверный вес сессии: {value}.')
+    return weights
+
+
+class Command(BaseCommand):
+    help = 'Нагрузочный тест сценариями пользовательских сессий.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            help='Адрес работающего сервера, например http://localhost:8000.'
+        )
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--duration', type=float, default=30)
+        parser.add_argument(
+            '--users', type=int, default=50,
+            help='Сколько пользователей участвует в сессиях.'
+        )
+        parser.add_argument(
+            '--weights', nargs='+', default=(), metavar='SESSION=WEIGHT',
+            help='Веса сессий: browse, search_ingredients, favorite, '
+                 'shopping. Нулевой вес отключает сессию.'
+        )
+        parser.add_argument(
+            '--think-time', type=float, default=0,
+            help='Средняя пауза между шагами сессии в секундах.'
+        )
+        parser.add_argument('--seed', type=int)
+        parser.add_argument('--output', default='loadtest.json')
+
+    def handle(self, *args, **options):
+        sessions = self.get_sessions(options)
+        server = None
+        if options['url']:
+            url = urlsplit(options['url'])
+            if url.scheme != 'http' or not url.hostname:
+                raise CommandError('Поддерживаются только адреса http://.')
+            host, port = url.hostname, url.port or 80
+            if url.path.rstrip('/'):
+                sessions = with_prefix(sessions, url.path.rstrip('/'))
+        else:
+            server = LiveServerThread('127.0.0.1', _StaticFilesHandler)
+            server.daemon = True
+            server.start()
+            server.is_ready.wait()
+            if server.error:
+                raise CommandError(f'Сервер не запустился: {server.error}')
+            host, port = server.host, server.port
+        try:
+            report = run_sessions(
+                host, port, sessions, options['concurrency'],
+                options['duration'], options['seed'], options['think_time']
+            )
+        finally:
+            if server is not None:
+                server.terminate()
+        report = {
+            'target': options['url'] or f'http://{host}:{port}',
+            'concurrency': options['concurrency'],
+            'duration': options['duration'],
+            'weights': {name: weight for name, weight, _ in sessions},
+            **report,
+        }
+        with open(options['output'], 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        self.print_report(report)
+        self.stdout.write(f'Отчёт сохранён в {options["output"]}.')
+
+    def get_sessions(self, options):
+        try:
+            sessions = get_sessions(options['users'])
+        except ValueError as error:
+            raise CommandError(error)
+        weights = parse_weights(options['weights'])
+        unknown = set(weights) - {name for name, _, _ in sessions}
+        if unknown:
+            raise CommandError(
+                f'Неизвестные сессии: {", ".join(sorted(unknown))}.'
+            )
+        sessions = [
+            (name, weights.get(name, weight), script)
+            for name, weight, script in sessions
+            if weights.get(name, weight) > 0
+        ]
+        if not sessions:
+            raise CommandError('Все сессии отключены.')
+        return sessions
+
+    def print_report(self, report):
+        for name, item in report.items():
+            if not isinstance(item, dict) or 'p50_ms' not in item:
+                continue
+            self.stdout.write(
+                f'{name:24} {item["requests"]:7} {item["rps"]:9} rps  '
+                f'p50 {item["p50_ms"]} мс  p95 {item["p95_ms"]} мс  '
+                f'p99 {item["p99_ms"]} мс  ошибок {item["errors"]}'
+            )
+        for name, item in report['sessions'].items():
+            self.stdout.write(
+                f'{name:24} {item["completed"]:7} сессий, '
+                f'{item["per_minute"]} в минуту'
+            )
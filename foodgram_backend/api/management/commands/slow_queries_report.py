@@ -0,0 +1,94 @@
+'''
+Management-команда на сводку журнала медленных SQL запросов.
+
+Группирует записи по отпечатку запроса и выводит самые затратные
+отпечатки с эндпоинтами, из которых они выполнялись, и последним
+сохранённым планом EXPLAIN.
+'''
+
+import json
+import os
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+ORDERINGS = {
+    'total': lambda item: item['total_ms'],
+    'max': lambda item: item['max_ms'],
+    'count': lambda item: item['count'],
+}
+
+
+class Command(BaseCommand):
+    help = 'Сводка самых медленных SQL запросов по отпечаткам.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='*',
+            help='Файлы журнала, по умолчанию SLOW_QUERY_LOG_FILE '
+                 'вместе с ротированными копиями.'
+        )
+        parser.add_argument('--limit', type=int, default=10)
+        parser.add_argument(
+            '--order', choices=ORDERINGS, default='total',
+            help='Сортировка по суммарному, максимальному времени '
+                 'или количеству.'
+        )
+        parser.add_argument(
+            '--json', action='store_true', help='Вывести сводку в JSON.'
+        )
+
+    def get_paths(self):
+        path = settings.SLOW_QUERY_LOG_FILE
+        paths = [path] + [
+            f'{path}.{number}'
+            for number in range(1, settings.SLOW_QUERY_LOG_BACKUP_COUNT + 1)
+        ]
+        return [path for path in paths if os.path.exists(path)]
+
+    def handle(self, *args, **options):
+        summary = {}
+        for path in options['paths'] or self.get_paths():
+            with open(path, 'r', encoding='utf-8') as file:
+                for line in file:
+                    if line.strip():
+                        self.add_entry(summary, json.loads(line))
+        items = sorted(
+            summary.values(), key=ORDERINGS[options['order']], reverse=True
+        )[:options['limit']]
+        for item in items:
+            item['mean_ms'] = round(item['total_ms'] / item['count'], 3)
+            item['total_ms'] = round(item['total_ms'], 3)
+            item['routes'] = dict(item['routes'].most_common())
+        if options['json']:
+            self.stdout.write(json.dumps(items, ensure_ascii=False, indent=2))
+            return
+        for item in items:
+            self.stdout.write(self.style.WARNING(
+                f'{item["fingerprint"]}: {item["count"]} запросов, '
+                f'всего {item["total_ms"]} мс, среднее {item["mean_ms"]} мс, '
+                f'максимум {item["max_ms"]} мс'
+            ))
+            self.stdout.write(f'  {item["statement"]}')
+            for route, count in item['routes'].items():
+                self.stdout.write(f'  {route}: {count}')
+            for line in item['explain'] or ():
+                self.stdout.write(f'    {line}')
+
+    def add_entry(self, summary, entry):
+        item = summary.setdefault(entry['fingerprint'], {
+            'fingerprint': entry['fingerprint'],
+            'statement': entry['statement'],
+            'count': 0,
+            'total_ms': 0,
+            'max_ms': 0,
+            'routes': Counter(),
+            'explain': None,
+        })
+        item['count'] += 1
+        item['total_ms'] += entry['duration_ms']
+        item['max_ms'] = max(item['max_ms'], entry['duration_ms'])
+        item['routes'][f'{entry["method"]} {entry["route"]}'] += 1
+        if 'explain' in entry:
+            item['explain'] = entry['explain']
@@ -0,0 +1,130 @@
+'''
+Management-команда на отчёт о запуске воркера.
+
+Показывает пакеты, дольше всего импортирующиеся при загрузке
+приложения (python -X importtime), и сравнивает задержку первых
+запросов к основным эндпоинтам в свежем процессе без прогрева и с
+прогревом api/warmup.py. Каждый замер идёт в отдельном процессе, иначе
+кеши текущего процесса исказят результат.
+'''
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.hot_paths import get_hot_requests
+
+#  Загружает приложение как gunicorn и вызывает его напрямую: первый
+#  запрос к каждому адресу и затем несколько повторных.
+PROBE = '''
+import json, sys, time
+from wsgiref.util import setup_testing_defaults
+
+started = time.perf_counter()
+from foodgram_backend.wsgi import application
+report = {'load_ms': (time.perf_counter() - started) * 1000, 'requests': {}}
+
+for name, url, headers, repeat in json.load(sys.stdin):
+    path, _, query = url.partition('?')
+    timings = []
+    for _ in range(repeat + 1):
+        environ = {'PATH_INFO': path, 'QUERY_STRING': query}
+        for header, value in headers.items():
+            environ['HTTP_' + header.upper().replace('-', '_')] = value
+        setup_testing_defaults(environ)
+        started = time.perf_counter()
+        b''.join(application(environ, lambda *args: None))
+        timings.append((time.perf_counter() - started) * 1000)
+    report['requests'][name] = timings
+json.dump(report, sys.stdout)
+'''
+
+
+def run_python(arguments, warmup, stdin=None):
+    return subprocess.run(
+        [sys.executable, *arguments],
+        input=stdin,
+        capture_output=True,
+        text=True,
+        env={**os.environ, 'STARTUP_WARMUP': str(warmup)},
+    )
+
+
+class Command(BaseCommand):
+    help = 'Отчёт о времени импорта и задержке первых запросов воркера.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top', type=int, default=15,
+            help='Сколько самых медленных пакетов показать.'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Повторных запросов после первого к каждому адресу.'
+        )
+        parser.add_argument('--output', default='startup_report.json')
+
+    def handle(self, *args, **options):
+        report = {'imports': self.measure_imports(options['top'])}
+        self.stdout.write('Импорт приложения, собственное время пакетов:')
+        for package, ms in report['imports']['packages'].items():
+            self.stdout.write(f'  {package:<30} {ms:>8.1f} мс')
+        total = report['imports']['total_ms']
+        self.stdout.write(f'  {"всего":<30} {total:>8.1f} мс')
+        requests = json.dumps([
+            (name, url, headers, options['repeat'])
+            for name, url, headers in get_hot_requests()
+        ])
+        for mode, warmup in (('cold', False), ('warm', True)):
+            report[mode] = self.measure_requests(requests, warmup)
+        self.stdout.write(
+            f'Загрузка приложения: без прогрева '
+            f'{report["cold"]["load_ms"]:.0f} мс, с прогревом '
+            f'{report["warm"]["load_ms"]:.0f} мс.'
+        )
+        self.stdout.write(
+            f'{"эндпоинт":<24} {"первый":>10} {"с прогревом":>12} '
+            f'{"повторные":>10}'
+        )
+        for name, cold in report['cold']['requests'].items():
+            warm = report['warm']['requests'][name]
+            self.stdout.write(
+                f'{name:<24} {cold[0]:>8.1f}мс {warm[0]:>10.1f}мс '
+                f'{statistics.median(warm[1:] or warm):>8.1f}мс'
+            )
+        with open(options['output'], 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        self.stdout.write(f'Отчёт сохранён в {options["output"]}.')
+
+    def measure_imports(self, top):
+        result = run_python(
+            ['-X', 'importtime', '-c', 'import foodgram_backend.wsgi'],
+            warmup=False,
+        )
+        if result.returncode:
+            raise CommandError(result.stderr[-2000:])
+        packages = Counter()
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or '|' not in line:
+                continue
+            own, _, name = line[len('import time:'):].split('|')
+            if own.strip().isdigit():
+                packages[name.strip().split('.')[0]] += int(own) / 1000
+        return {
+            'total_ms': round(sum(packages.values()), 1),
+            'packages': {
+                package: round(ms, 1)
+                for package, ms in packages.most_common(top)
+            },
+        }
+
+    def measure_requests(self, requests, warmup):
+        result = run_python(['-c', PROBE], warmup, stdin=requests)
+        if result.returncode:
+            raise CommandError(result.stderr[-2000:])
+        return json.loads(result.stdout)
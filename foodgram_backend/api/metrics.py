@@ -0,0 +1,232 @@
+'''
+Метрики приложения в текстовом формате Prometheus.
+
+Каждый процесс копит значения в памяти. Если задан METRICS_DIR, процесс
+периодически сбрасывает их в собственный файл metrics_<pid>.json, а
+эндпоинт /metrics суммирует файлы всех воркеров gunicorn. Каталог
+должен очищаться при перезапуске сервиса, как и multiprocess-каталог
+у prometheus_client.
+'''
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+from django.http import HttpResponse
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+class Registry:
+    '''Хранилище значений метрик текущего процесса.'''
+
+    def __init__(self):
+        self.metrics = {}
+        self.values = {}
+        self.lock = threading.Lock()
+        self.flushed = 0
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+
+    def add(self, key, value):
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + value
+
+    def observe(self, key, index, value, size):
+        with self.lock:
+            histogram = self.values.get(key)
+            if histogram is None:
+                histogram = self.values[key] = [0] * size + [0]
+            histogram[index] += 1
+            histogram[-1] += value
+
+    def snapshot(self):
+        with self.lock:
+            return [
+                [name, list(labels), value if isinstance(value, (int, float))
+                 else list(value)]
+                for (name, labels), value in self.values.items()
+            ]
+
+    def flush(self, force=False):
+        directory = getattr(settings, 'METRICS_DIR', None)
+        if not directory:
+            return
+        now = time.monotonic()
+        interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 1)
+        if not force and now - self.flushed < interval:
+            return
+        self.flushed = now
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'metrics_{os.getpid()}.json')
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump(self.snapshot(), file)
+        os.replace(temporary, path)
+
+    def collect(self):
+        '''Значения всех процессов, просуммированные по ключу метрики.'''
+        directory = getattr(settings, 'METRICS_DIR', None)
+        if not directory:
+            snapshots = [self.snapshot()]
+        else:
+            self.flush(force=True)
+            snapshots = []
+            for entry in os.scandir(directory):
+                if not entry.name.endswith('.json'):
+                    continue
+                try:
+                    with open(entry.path, 'r', encoding='utf-8') as file:
+                        snapshots.append(json.load(file))
+                except (OSError, ValueError):
+                    continue
+        totals = {}
+        for snapshot in snapshots:
+            for name, labels, value in snapshot:
+                key = (name, tuple(tuple(pair) for pair in labels))
+                if isinstance(value, list):
+                    current = totals.setdefault(key, [0] * len(value))
+                    for index, item in enumerate(value):
+                        current[index] += item
+                else:
+                    totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def render(self):
+        totals = self.collect()
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for (name, labels), value in sorted(totals.items()):
+                if name == metric.name:
+                    lines.extend(metric.samples(labels, value))
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+def format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        '{}="{}"'.format(
+            key,
+            str(value).replace('\\', r'\\').replace('"', r'\"').replace(
+                '\n', r'\n'
+            )
+        ) for key, value in pairs
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.registry = registry
+        registry.register(self)
+
+    def key(self, labels):
+        return (
+            self.name,
+            tuple((label, str(labels[label])) for label in self.labelnames)
+        )
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, value=1, **labels):
+        self.registry.add(self.key(labels), value)
+
+    def samples(self, labels, value):
+        return [f'{self.name}{format_labels(labels)} {value}']
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(),
+                 buckets=LATENCY_BUCKETS, registry=REGISTRY):
+        self.buckets = tuple(buckets)
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value, **labels):
+        self.registry.observe(
+            self.key(labels), bisect_left(self.buckets, value), value,
+            len(self.buckets) + 1
+        )
+
+    def samples(self, labels, value):
+        counts, total = value[:-1], value[-1]
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + ('+Inf',), counts):
+            cumulative += count
+            lines.append(
+                f'{self.name}_bucket'
+                f'{format_labels(labels, (("le", bound),))} {cumulative}'
+            )
+        lines.append(f'{self.name}_sum{format_labels(labels)} {total}')
+        lines.append(f'{self.name}_count{format_labels(labels)} {cumulative}')
+        return lines
+
+
+REQUESTS = Counter(
+    'foodgram_http_requests_total',
+    'Количество обработанных запросов.',
+    ('route', 'method', 'status'),
+)
+REQUEST_LATENCY = Histogram(
+    'foodgram_http_request_duration_seconds',
+    'Время обработки запроса.',
+    ('route', 'method'),
+)
+RESPONSE_SIZE = Histogram(
+    'foodgram_http_response_size_bytes',
+    'Размер тела ответа.',
+    ('route', 'method'),
+    buckets=SIZE_BUCKETS,
+)
+DB_QUERIES = Histogram(
+    'foodgram_db_queries_per_request',
+    'Количество SQL запросов на один HTTP запрос.',
+    ('route', 'method'),
+    buckets=QUERY_COUNT_BUCKETS,
+)
+DB_DURATION = Histogram(
+    'foodgram_db_duration_seconds',
+    'Суммарное время SQL запросов на один HTTP запрос.',
+    ('route', 'method'),
+)
+ADMISSION_WAIT = Histogram(
+    'foodgram_admission_wait_seconds',
+    'Время ожидания свободного слота в очереди класса маршрутов.',
+    ('route_class',),
+)
+ADMISSION_REJECTED = Counter(
+    'foodgram_admission_rejected_total',
+    'Запросы, отклонённые с 503 из-за превышения лимита.',
+    ('route_class',),
+)
+
+
+def metrics_view(request):
+    '''Метрики в текстовом формате Prometheus.'''
+    return HttpResponse(
+        REGISTRY.render(), content_type='text/plain; version=0.0.4'
+    )
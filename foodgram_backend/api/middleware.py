@@ -0,0 +1,277 @@
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import JsonResponse
+from rest_framework.permissions import SAFE_METHODS
+
+from .db_router import replica_reads
+from .metrics import (ADMISSION_REJECTED, ADMISSION_WAIT, DB_DURATION,
+                      DB_QUERIES, REGISTRY, REQUEST_LATENCY, REQUESTS,
+                      RESPONSE_SIZE)
+from .slow_queries import SlowQueryLogger, setup_logger
+
+#  Шаг опроса семафора AdmissionControlMiddleware под ASGI, в секундах.
+ADMISSION_POLL = 0.01
+
+
+class QueryCounter:
+    '''Обёртка execute_wrapper, считающая SQL запросы и их время.'''
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - started
+
+
+#  Обёртки SQL запросов текущего HTTP запроса. Через contextvars они
+#  доходят до любого потока, в котором sync_to_async выполняет код
+#  запроса, а вызывает их dispatch_request_wrappers.
+request_wrappers = ContextVar('request_wrappers', default=())
+
+
+def dispatch_request_wrappers(execute, sql, params, many, context):
+    '''Постоянная обёртка соединений, см. api.signals.'''
+    for wrapper in reversed(request_wrappers.get()):
+        execute = partial(wrapper, execute)
+    return execute(sql, params, many, context)
+
+
+@contextmanager
+def wrap_request_connections(wrapper):
+    token = request_wrappers.set(request_wrappers.get() + (wrapper,))
+    try:
+        yield
+    finally:
+        request_wrappers.reset(token)
+
+
+class HybridMiddleware:
+    '''
+    Основа middleware для синхронной и асинхронной цепочки.
+
+    Под ASGI Django вызывает такой middleware без перехода в поток, как
+    MiddlewareMixin, иначе асинхронные представления снова попадали бы
+    в синхронный код. Подклассы задают call() и acall().
+    '''
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.acall(request)
+        return self.call(request)
+
+
+def get_route(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    return match.view_name or match.route
+
+
+class MetricsMiddleware(HybridMiddleware):
+    '''Сбор метрик времени ответа, SQL запросов и размера ответа.'''
+
+    def call(self, request):
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with wrap_request_connections(counter):
+            response = self.get_response(request)
+        return self.record(request, response, counter, started)
+
+    async def acall(self, request):
+        counter = QueryCounter()
+        started = time.perf_counter()
+        with wrap_request_connections(counter):
+            response = await self.get_response(request)
+        return self.record(request, response, counter, started)
+
+    def record(self, request, response, counter, started):
+        duration = time.perf_counter() - started
+        labels = {'route': get_route(request), 'method': request.method}
+        REQUESTS.inc(status=response.status_code, **labels)
+        REQUEST_LATENCY.observe(duration, **labels)
+        DB_QUERIES.observe(counter.count, **labels)
+        DB_DURATION.observe(counter.duration, **labels)
+        if not response.streaming:
+            RESPONSE_SIZE.observe(len(response.content), **labels)
+        elif response.has_header('Content-Length'):
+            RESPONSE_SIZE.observe(
+                int(response['Content-Length']), **labels
+            )
+        REGISTRY.flush()
+        return response
+
+
+class SlowQueryMiddleware(HybridMiddleware):
+    '''Журнал медленных SQL запросов, включается SLOW_QUERY_LOG.'''
+
+    def __init__(self, get_response):
+        if not settings.SLOW_QUERY_LOG:
+            raise MiddlewareNotUsed
+        setup_logger()
+        super().__init__(get_response)
+
+    def logger(self, request):
+        return SlowQueryLogger(lambda: get_route(request), request.method)
+
+    def call(self, request):
+        with wrap_request_connections(self.logger(request)):
+            return self.get_response(request)
+
+    async def acall(self, request):
+        with wrap_request_connections(self.logger(request)):
+            return await self.get_response(request)
+
+
+class ReplicaRoutingMiddleware(HybridMiddleware):
+    '''
+    Чтение с реплик для безопасных запросов.
+
+    После записи клиент получает cookie, и его запросы в течение
+    REPLICA_PIN_SECONDS читают из основной базы, чтобы видеть
+    собственные изменения. Клиенты без cookie могут передать заголовок
+    X-Pin-Primary.
+    '''
+
+    cookie = 'pin_primary'
+    header = 'HTTP_X_PIN_PRIMARY'
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def use_replica(self, request):
+        return (
+            request.method in SAFE_METHODS
+            and self.cookie not in request.COOKIES
+            and not request.META.get(self.header)
+        )
+
+    def call(self, request):
+        with replica_reads(self.use_replica(request)) as routing:
+            response = self.get_response(request)
+            wrote = routing.wrote
+        return self.pin(response, wrote)
+
+    async def acall(self, request):
+        with replica_reads(self.use_replica(request)) as routing:
+            response = await self.get_response(request)
+            wrote = routing.wrote
+        return self.pin(response, wrote)
+
+    def pin(self, response, wrote):
+        if wrote:
+            response.set_cookie(
+                self.cookie, '1', max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True, samesite='Lax'
+            )
+        return response
+
+
+class AdmissionControlMiddleware(HybridMiddleware):
+    '''
+    Ограничение числа одновременных запросов к дорогим маршрутам.
+
+    Классы маршрутов и их лимиты задаются в ADMISSION_LIMITS. Запрос,
+    не дождавшийся свободного слота за отведённое время, сразу получает
+    503 с заголовком Retry-After. Маршруты вне классов не ограничиваются.
+
+    Семафоры живут внутри процесса, поэтому лимиты действуют только в
+    потоковых (gthread) и ASGI воркерах; синхронный воркер gunicorn
+    и так обрабатывает один запрос за раз, и общий лимит для всех
+    воркеров равен лимиту, умноженному на их число. В асинхронной цепочке
+    слот ожидается без блокировки event loop: опросом раз в
+    ADMISSION_POLL секунд.
+    '''
+
+    def __init__(self, get_response):
+        if not settings.ADMISSION_LIMITS:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        if self.is_async:
+            self.process_view = self.aprocess_view
+        self.route_classes = {}
+        self.limits = {}
+        for name, limit in settings.ADMISSION_LIMITS.items():
+            self.limits[name] = (
+                threading.BoundedSemaphore(limit['concurrency']),
+                limit['timeout'],
+            )
+            for route in limit['routes']:
+                self.route_classes[route] = name
+
+    def release(self, request):
+        slot = getattr(request, '_admission_slot', None)
+        if slot is not None:
+            slot.release()
+
+    def call(self, request):
+        try:
+            return self.get_response(request)
+        finally:
+            self.release(request)
+
+    async def acall(self, request):
+        try:
+            return await self.get_response(request)
+        finally:
+            self.release(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        route_class = self.route_classes.get(get_route(request))
+        if route_class is None:
+            return None
+        slot, timeout = self.limits[route_class]
+        started = time.perf_counter()
+        admitted = slot.acquire(timeout=timeout)
+        return self.admit(request, route_class, slot, started, admitted)
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        route_class = self.route_classes.get(get_route(request))
+        if route_class is None:
+            return None
+        slot, timeout = self.limits[route_class]
+        started = time.perf_counter()
+        admitted = slot.acquire(blocking=False)
+        while not admitted and time.perf_counter() - started < timeout:
+            await asyncio.sleep(ADMISSION_POLL)
+            admitted = slot.acquire(blocking=False)
+        return self.admit(request, route_class, slot, started, admitted)
+
+    def admit(self, request, route_class, slot, started, admitted):
+        ADMISSION_WAIT.observe(
+            time.perf_counter() - started, route_class=route_class
+        )
+        if not admitted:
+            ADMISSION_REJECTED.inc(route_class=route_class)
+            response = JsonResponse(
+                {'detail': 'Сервис перегружен, повторите запрос позже.'},
+                status=503,
+                json_dumps_params={'ensure_ascii': False},
+            )
+            response['Retry-After'] = settings.ADMISSION_RETRY_AFTER
+            return response
+        request._admission_slot = slot
+        return None
@@ -1,5 +1,63 @@
 from rest_framework import mixins, viewsets
+from rest_framework.exceptions import ValidationError
 
 
 class ListViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
     pass
+
+
+def parse_names(value):
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+class SparseFieldsMixin:
+    '''
+    Выбор полей ответа через ?fields= и ?omit= для GET запросов.
+
+    Невыбранные поля убираются из сериализатора, а sparse_columns
+    задаёт поля модели, нужные каждому полю ответа, чтобы остальные
+    не загружались из базы через only().
+    '''
+
+    sparse_columns = {}
+
+    def get_sparse_fields(self):
+        '''Выбранные поля ответа или None, если выбор не задан.'''
+        params = self.request.query_params
+        if self.request.method != 'GET' or not (
+            'fields' in params or 'omit' in params
+        ):
+            return None
+        declared = self.get_serializer_class().Meta.fields
+        selected = parse_names(params.get('fields', ''))
+        omitted = parse_names(params.get('omit', ''))
+        unknown = (selected | omitted) - set(declared)
+        if unknown:
+            raise ValidationError({
+                'fields': f'Неизвестные поля: {", ".join(sorted(unknown))}.'
+            })
+        return tuple(
+            name for name in declared
+            if (not selected or name in selected) and name not in omitted
+        )
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            target = getattr(serializer, 'child', serializer)
+            for name in list(target.fields):
+                if name not in fields:
+                    target.fields.pop(name)
+        return serializer
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fields = self.get_sparse_fields()
+        if fields is None or not self.sparse_columns:
+            return queryset
+        return queryset.only('pk', *{
+            column
+            for name in fields
+            for column in self.sparse_columns.get(name, ())
+        })
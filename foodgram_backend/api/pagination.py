@@ -0,0 +1,76 @@
+'''
+Пагинация без точного COUNT(*) для больших таблиц.
+
+На PostgreSQL число строк неотфильтрованной выборки берётся из
+pg_class.reltuples, которое обновляют ANALYZE и autovacuum. Если оценка
+меньше ESTIMATED_COUNT_THRESHOLD, выполняется обычный COUNT(*).
+Отфильтрованные выборки всегда считаются точно: оценка плана EXPLAIN
+для них может ошибаться в разы, и страницы за концом выдачи или
+обрезанная нумерация заметны пользователю. Приблизительное число
+отмечается флагом count_is_estimated.
+'''
+
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+
+
+def estimate_count(queryset):
+    '''Оценка числа строк выборки или None, если оценить нельзя.'''
+    if (not isinstance(queryset, QuerySet) or queryset.query.is_sliced
+            or queryset.query.where or queryset.query.distinct):
+        return None
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+            [connection.ops.quote_name(queryset.model._meta.db_table)]
+        )
+        row = cursor.fetchone()
+    if row is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    '''Paginator с оценкой числа строк для больших выборок.'''
+
+    count_is_estimated = False
+
+    @cached_property
+    def count(self):
+        estimate = estimate_count(self.object_list)
+        if (estimate is not None
+                and estimate >= settings.ESTIMATED_COUNT_THRESHOLD):
+            self.count_is_estimated = True
+            return estimate
+        return super().count
+
+
+class EstimatedCountPagination(PageNumberPagination):
+    '''PageNumberPagination с EstimatedCountPaginator.'''
+
+    django_paginator_class = EstimatedCountPaginator
+
+    def get_paginated_response(self, data):
+        paginator = self.page.paginator
+        return Response(OrderedDict([
+            ('count', paginator.count),
+            ('count_is_estimated', paginator.count_is_estimated),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        response = super().get_paginated_response_schema(schema)
+        response['properties']['count_is_estimated'] = {'type': 'boolean'}
+        return response
@@ -0,0 +1,145 @@
+'''
+Быстрая сборка ответов со списком и карточкой рецепта.
+
+RecipeReader выдаёт тот же JSON, что и RecipeListSerializer, но строит
+его из строк values() без создания экземпляров моделей и вложенных
+сериализаторов: рецепты страницы, их теги, ингредиенты, авторы и
+подписки текущего пользователя читаются отдельными плоскими запросами.
+'''
+
+from rest_framework.settings import api_settings
+
+from recipes.models import Follow, Recipe, RecipeIngredient
+from users.models import User
+
+FIELDS = (
+    'id', 'tags', 'author', 'ingredients', 'is_favorited',
+    'is_in_shopping_cart', 'name', 'image', 'text', 'cooking_time',
+)
+COLUMNS = {
+    'author': 'author_id',
+    'is_favorited': 'favorit',
+    'is_in_shopping_cart': 'shoppings',
+    'name': 'name',
+    'image': 'image',
+    'text': 'text',
+    'cooking_time': 'cooking_time',
+}
+
+
+class RecipeReader:
+    '''Сборка ответа RecipeListSerializer из строк values().'''
+
+    def __init__(self, request, fields=None):
+        self.request = request
+        self.user = request.user
+        self.storage = Recipe._meta.get_field('image').storage
+        self.sparse = fields is not None
+        self.fields = FIELDS if fields is None else fields
+
+    def rows(self, queryset):
+        '''Строки рецептов для пагинации вместо экземпляров моделей.'''
+        columns = ['id'] + [
+            COLUMNS[name] for name in self.fields if name in COLUMNS
+        ]
+        return queryset.prefetch_related(None).values(*(
+            column for column in columns
+            if column not in ('favorit', 'shoppings')
+            or column in queryset.query.annotations
+        ))
+
+    def rows_in_order(self, queryset, recipe_ids):
+        '''Строки рецептов recipe_ids в том же порядке.'''
+        ranks = {recipe_id: rank for rank, recipe_id in enumerate(recipe_ids)}
+        return sorted(
+            self.rows(queryset.filter(id__in=recipe_ids)),
+            key=lambda row: ranks[row['id']]
+        )
+
+    def serialize(self, rows):
+        rows = list(rows)
+        ids = [row['id'] for row in rows]
+        fields = self.fields
+        tags = self.get_tags(ids) if 'tags' in fields else {}
+        ingredients = (
+            self.get_ingredients(ids) if 'ingredients' in fields else {}
+        )
+        authors = self.get_authors(
+            {row['author_id'] for row in rows}
+        ) if 'author' in fields else {}
+        data = [
+            {
+                'id': row['id'],
+                'tags': tags.get(row['id'], []),
+                'author': authors.get(row.get('author_id')),
+                'ingredients': ingredients.get(row['id'], []),
+                'is_favorited': row.get('favorit', False),
+                'is_in_shopping_cart': row.get('shoppings', False),
+                'name': row.get('name'),
+                'image': self.get_image(row.get('image')),
+                'text': row.get('text'),
+                'cooking_time': row.get('cooking_time'),
+            }
+            for row in rows
+        ]
+        if self.sparse:
+            return [{name: item[name] for name in fields} for item in data]
+        return data
+
+    def get_image(self, name):
+        if not name:
+            return None
+        if not api_settings.UPLOADED_FILES_USE_URL:
+            return name
+        return self.request.build_absolute_uri(self.storage.url(name))
+
+    def get_tags(self, ids):
+        tags = {}
+        rows = Recipe.tags.through.objects.filter(
+            recipe_id__in=ids
+        ).order_by('tag__name').values_list(
+            'recipe_id', 'tag_id', 'tag__name', 'tag__color', 'tag__slug'
+        )
+        for recipe_id, tag_id, name, color, slug in rows:
+            tags.setdefault(recipe_id, []).append(
+                {'id': tag_id, 'name': name, 'color': color, 'slug': slug}
+            )
+        return tags
+
+    def get_ingredients(self, ids):
+        ingredients = {}
+        rows = RecipeIngredient.objects.filter(
+            recipe_id__in=ids
+        ).order_by('id').values_list(
+            'recipe_id', 'ingredient_id', 'ingredient__name',
+            'ingredient__measurement_unit', 'amount'
+        )
+        for recipe_id, ingredient_id, name, unit, amount in rows:
+            ingredients.setdefault(recipe_id, []).append({
+                'id': ingredient_id,
+                'name': name,
+                'measurement_unit': unit,
+                'amount': amount,
+            })
+        return ingredients
+
+    def get_authors(self, ids):
+        subscribed = set()
+        if self.user.is_authenticated:
+            subscribed = set(Follow.objects.filter(
+                user=self.user, author_id__in=ids
+            ).values_list('author_id', flat=True))
+        return {
+            author_id: {
+                'email': email,
+                'id': author_id,
+                'username': username,
+                'first_name': first_name,
+                'last_name': last_name,
+                'is_subscribed': author_id in subscribed,
+            }
+            for author_id, email, username, first_name, last_name
+            in User.objects.filter(id__in=ids).values_list(
+                'id', 'email', 'username', 'first_name', 'last_name'
+            )
+        }
@@ -1,9 +1,13 @@
+from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
 from djoser.serializers import UserCreateSerializer, UserSerializer
 from drf_extra_fields.fields import Base64ImageField
 from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
 
-from recipes.models import Follow, Ingredient, Recipe, RecipeIngredient, Tag
+from recipes import shopping, tasks
+from recipes.models import (Follow, Ingredient, Recipe, RecipeIngredient,
+                            ShoppingCartTotal, Tag)
 from users.models import User
 
 
@@ -22,6 +26,8 @@ class CustomUserSerializer(UserSerializer):
     def get_is_subscribed(self, obj):
         if self.context.get('request').user.is_anonymous:
             return False
+        if hasattr(obj, 'subscribed'):
+            return obj.subscribed
         return Follow.objects.filter(
             author=obj,
             user=self.context.get('request').user
@@ -69,6 +75,20 @@ class RecipeIngredientsSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'measurement_unit', 'amount')
 
 
+class ShoppingCartTotalSerializer(serializers.ModelSerializer):
+    '''Сериализация итогов списка покупок.'''
+
+    id = serializers.ReadOnlyField(source='ingredient.id')
+    name = serializers.ReadOnlyField(source='ingredient.name')
+    measurement_unit = serializers.ReadOnlyField(
+        source='ingredient.measurement_unit'
+    )
+
+    class Meta:
+        model = ShoppingCartTotal
+        fields = ('id', 'name', 'measurement_unit', 'amount')
+
+
 class RecipeListSerializer(serializers.ModelSerializer):
     '''Сериализация списка рецептов.'''
 
@@ -107,11 +127,20 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
     author = CustomUserSerializer(read_only=True)
     image = Base64ImageField()
     ingredients = CreateIngredientSerializer(many=True)
+    tags = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False
+    )
 
     class Meta:
         model = Recipe
         fields = '__all__'
 
+    def validate_tags(self, value):
+        tags = list(Tag.objects.filter(id__in=value))
+        if len(tags) != len(set(value)):
+            raise serializers.ValidationError('Такого тега не существует.')
+        return tags
+
     def validate(self, data):
         name = data.get('name')
         if len(name) > 200:
@@ -155,14 +184,17 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
             ingredients_list.append(create_ingredients)
         RecipeIngredient.objects.bulk_create(ingredients_list)
 
+    @transaction.atomic
     def create(self, validated_data):
         ingredients = validated_data.pop('ingredients')
         tags = validated_data.pop('tags')
         recipe = Recipe.objects.create(**validated_data)
         recipe.tags.set(tags)
         self.create_ingredients(recipe, ingredients)
+        tasks.schedule_similar_recipes()
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         instance.name = validated_data.get('name', instance.name)
         instance.image = validated_data.get('image', instance.image)
@@ -174,14 +206,24 @@ class RecipeCreateSerializer(serializers.ModelSerializer):
             tags = validated_data.get('tags')
             instance.tags.set(tags)
         if 'ingredients' in validated_data:
-            instance.ingredients.clear()
-            self.create_ingredients(
-                instance, validated_data.get('ingredients')
-            )
+            ingredients = validated_data.get('ingredients')
+            with shopping.batch():
+                instance.ingredients.clear()
+                self.create_ingredients(instance, ingredients)
+                shopping.refresh(instance.id, {
+                    ingredient['id'] for ingredient in ingredients
+                })
         instance.save()
+        tasks.schedule_similar_recipes()
         return instance
 
     def to_representation(self, instance):
+        prefetch_related_objects(
+            [instance], 'tags', Prefetch(
+                'ingredient',
+                queryset=RecipeIngredient.objects.select_related('ingredient')
+            )
+        )
         return RecipeListSerializer(
             instance,
             context={
@@ -217,14 +259,17 @@ class SubscribeSerializer(serializers.ModelSerializer):
         )
 
     def get_is_subscribed(self, obj):
-        return Follow.objects.filter(author=obj.author, user=obj.user).exists()
+        return True
 
     def get_recipes(self, obj):
-        queryset = Recipe.objects.filter(author=obj.author)
-        return SubscribeRecipeSerializer(queryset, many=True).data
+        return SubscribeRecipeSerializer(
+            obj.author.recipes.all(), many=True
+        ).data
 
     def get_recipes_count(self, obj):
-        return Recipe.objects.filter(author=obj.author).count()
+        if hasattr(obj, 'recipes_count'):
+            return obj.recipes_count
+        return obj.author.recipes.count()
 
 
 class SubscribeUserSerializer(serializers.ModelSerializer):
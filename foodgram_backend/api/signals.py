@@ -0,0 +1,36 @@
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from users.models import User
+from .authentication import token_cache
+from .middleware import dispatch_request_wrappers
+
+
+@receiver(connection_created)
+def install_request_wrappers(sender, connection, **kwargs):
+    '''
+    Обёртки SQL из middleware действуют в любом потоке запроса: и в
+    синхронном, и в пулах асинхронных представлений.
+    '''
+    if dispatch_request_wrappers not in connection.execute_wrappers:
+        connection.execute_wrappers.append(dispatch_request_wrappers)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    '''Выход через djoser и удаление токена.'''
+    token_cache.invalidate(instance.key)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_tokens(sender, instance, created, **kwargs):
+    '''Смена пароля, блокировка и любые изменения пользователя.'''
+    if created:
+        return
+    keys = list(
+        Token.objects.filter(user=instance).values_list('key', flat=True)
+    )
+    if keys:
+        token_cache.invalidate(*keys)
@@ -0,0 +1,109 @@
+'''
+Журнал медленных SQL запросов.
+
+Запросы дольше SLOW_QUERY_THRESHOLD_MS пишутся в JSONL файл
+SLOW_QUERY_LOG_FILE вместе с эндпоинтом и отпечатком запроса, в
+котором литералы и списки IN заменены заглушками. Для доли
+SLOW_QUERY_EXPLAIN_RATE таких запросов дополнительно сохраняется план
+EXPLAIN (ANALYZE, BUFFERS).
+'''
+
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+import time
+from logging.handlers import RotatingFileHandler
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+PLACEHOLDER_LISTS = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+
+logger = logging.getLogger('foodgram.slow_queries')
+state = threading.local()
+
+
+def normalize(sql):
+    '''Текст запроса без литералов и с однотипными списками параметров.'''
+    sql = LITERALS.sub('?', sql.replace('%s', '?'))
+    sql = PLACEHOLDER_LISTS.sub('(...)', sql)
+    return ' '.join(sql.split())
+
+
+def fingerprint(statement):
+    return hashlib.md5(statement.encode('utf-8')).hexdigest()[:16]
+
+
+def setup_logger():
+    if logger.handlers:
+        return
+    handler = RotatingFileHandler(
+        settings.SLOW_QUERY_LOG_FILE,
+        maxBytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+        backupCount=settings.SLOW_QUERY_LOG_BACKUP_COUNT,
+        encoding='utf-8',
+    )
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def explain(connection, sql, params):
+    if connection.vendor == 'postgresql':
+        prefix = connection.ops.explain_query_prefix(
+            analyze=True, buffers=True
+        )
+    else:
+        prefix = connection.ops.explain_query_prefix()
+    state.explaining = True
+    try:
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                cursor.execute(f'{prefix} {sql}', params)
+                return [' '.join(map(str, row)) for row in cursor.fetchall()]
+    except DatabaseError as error:
+        return [f'EXPLAIN failed: {error}']
+    finally:
+        state.explaining = False
+
+
+class SlowQueryLogger:
+    '''Обёртка execute_wrapper, записывающая медленные запросы.'''
+
+    def __init__(self, get_route, method):
+        self.get_route = get_route
+        self.method = method
+        self.threshold = settings.SLOW_QUERY_THRESHOLD_MS / 1000
+        self.explain_rate = settings.SLOW_QUERY_EXPLAIN_RATE
+
+    def __call__(self, execute, sql, params, many, context):
+        if getattr(state, 'explaining', False):
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration = time.perf_counter() - started
+        if duration >= self.threshold:
+            self.log(sql, params, many, context['connection'], duration)
+        return result
+
+    def log(self, sql, params, many, connection, duration):
+        statement = normalize(sql)
+        entry = {
+            'time': timezone.now().isoformat(),
+            'database': connection.alias,
+            'route': self.get_route(),
+            'method': self.method,
+            'duration_ms': round(duration * 1000, 3),
+            'fingerprint': fingerprint(statement),
+            'statement': statement,
+        }
+        if (not many and sql.lstrip()[:6].upper() == 'SELECT'
+                and random.random() < self.explain_rate):
+            entry['explain'] = explain(connection, sql, params)
+        logger.info(json.dumps(entry, ensure_ascii=False))
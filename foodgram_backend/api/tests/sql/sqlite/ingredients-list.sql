@@ -0,0 +1,7 @@
+-- ingredients-list: HTTP 200, запросов 1
+
+SELECT "recipes_ingredient"."id", "recipes_ingredient"."name", "recipes_ingredient"."measurement_unit"
+    FROM "recipes_ingredient"
+    WHERE "recipes_ingredient"."name" LIKE ? ESCAPE ?
+    ORDER BY "recipes_ingredient"."name" ASC
+
@@ -0,0 +1,54 @@
+-- recipes-create: HTTP 201, запросов 15
+
+SELECT "recipes_tag"."id", "recipes_tag"."name", "recipes_tag"."color", "recipes_tag"."slug"
+    FROM "recipes_tag"
+    WHERE "recipes_tag"."id" IN (...)
+    ORDER BY "recipes_tag"."name" ASC
+
+SELECT COUNT(*) AS "__count"
+    FROM "recipes_ingredient"
+
+SAVEPOINT "savepoint"
+
+INSERT INTO "recipes_recipe" ("author_id", "name", "image", "text", "cooking_time", "pub_date", "updated")
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+
+SELECT "recipes_similarrecipequeue"."recipe_id", "recipes_similarrecipequeue"."created"
+    FROM "recipes_similarrecipequeue"
+    WHERE "recipes_similarrecipequeue"."recipe_id" = ?
+    LIMIT ?
+
+SAVEPOINT "savepoint"
+
+INSERT INTO "recipes_similarrecipequeue" ("recipe_id", "created") SELECT ?, ?
+
+RELEASE SAVEPOINT "savepoint"
+
+SELECT "recipes_tag"."id"
+    FROM "recipes_tag"
+    INNER JOIN "recipes_recipe_tags" ON ("recipes_tag"."id" = "recipes_recipe_tags"."tag_id")
+    WHERE "recipes_recipe_tags"."recipe_id" = ?
+    ORDER BY "recipes_tag"."name" ASC
+
+INSERT OR IGNORE INTO "recipes_recipe_tags" ("recipe_id", "tag_id") SELECT ?, ? UNION ALL ...
+
+INSERT INTO "recipes_recipeingredient" ("recipe_id", "ingredient_id", "amount") SELECT ?, ?, ? UNION ALL ...
+
+RELEASE SAVEPOINT "savepoint"
+
+SELECT ("recipes_recipe_tags"."recipe_id") AS "_prefetch_related_val_recipe_id", "recipes_tag"."id", "recipes_tag"."name", "recipes_tag"."color", "recipes_tag"."slug"
+    FROM "recipes_tag"
+    INNER JOIN "recipes_recipe_tags" ON ("recipes_tag"."id" = "recipes_recipe_tags"."tag_id")
+    WHERE "recipes_recipe_tags"."recipe_id" IN (...)
+    ORDER BY "recipes_tag"."name" ASC
+
+SELECT "recipes_recipeingredient"."id", "recipes_recipeingredient"."recipe_id", "recipes_recipeingredient"."ingredient_id", "recipes_recipeingredient"."amount", "recipes_ingredient"."id", "recipes_ingredient"."name", "recipes_ingredient"."measurement_unit"
+    FROM "recipes_recipeingredient"
+    INNER JOIN "recipes_ingredient" ON ("recipes_recipeingredient"."ingredient_id" = "recipes_ingredient"."id")
+    WHERE "recipes_recipeingredient"."recipe_id" IN (...)
+
+SELECT (?) AS "a"
+    FROM "recipes_follow"
+    WHERE ("recipes_follow"."author_id" = ? AND "recipes_follow"."user_id" = ?)
+    LIMIT ?
+
@@ -0,0 +1,8 @@
+-- recipes-download-shopping-cart: HTTP 200, запросов 1
+
+SELECT "recipes_ingredient"."name", "recipes_ingredient"."measurement_unit", "recipes_shoppingcarttotal"."amount"
+    FROM "recipes_shoppingcarttotal"
+    INNER JOIN "recipes_ingredient" ON ("recipes_shoppingcarttotal"."ingredient_id" = "recipes_ingredient"."id")
+    WHERE "recipes_shoppingcarttotal"."user_id" = ?
+    ORDER BY "recipes_ingredient"."name" ASC
+
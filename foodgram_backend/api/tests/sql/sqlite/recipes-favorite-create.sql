@@ -0,0 +1,23 @@
+-- recipes-favorite-create: HTTP 201, запросов 6
+
+SELECT "recipes_recipe"."id", "recipes_recipe"."author_id", "recipes_recipe"."name", "recipes_recipe"."image", "recipes_recipe"."text", "recipes_recipe"."cooking_time", "recipes_recipe"."pub_date", "recipes_recipe"."updated"
+    FROM "recipes_recipe"
+    WHERE "recipes_recipe"."id" = ?
+    LIMIT ?
+
+SELECT (?) AS "a"
+    FROM "recipes_favoriterecipe"
+    WHERE ("recipes_favoriterecipe"."recipe_id" = ? AND "recipes_favoriterecipe"."user_id" = ?)
+    LIMIT ?
+
+SAVEPOINT "savepoint"
+
+INSERT INTO "recipes_favoriterecipe" ("user_id", "recipe_id", "created")
+    VALUES (?, ?, ?)
+
+UPDATE "recipes_recipepopularity"
+    SET "score" = ("recipes_recipepopularity"."score" + ?)
+    WHERE "recipes_recipepopularity"."recipe_id" = ?
+
+RELEASE SAVEPOINT "savepoint"
+
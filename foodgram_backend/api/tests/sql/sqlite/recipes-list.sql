@@ -0,0 +1,45 @@
+-- recipes-list: HTTP 200, запросов 6
+
+SELECT COUNT(*)
+    FROM (SELECT "recipes_recipe"."id" AS Col1, "recipes_recipe"."author_id" AS Col2, "recipes_recipe"."name" AS Col3, "recipes_recipe"."image" AS Col4, "recipes_recipe"."text" AS Col5, "recipes_recipe"."cooking_time" AS Col6, EXISTS(SELECT (?) AS "a"
+    FROM "recipes_favoriterecipe" U0
+    WHERE (U0."recipe_id" = "recipes_recipe"."id" AND U0."user_id" = ?)
+    LIMIT ?) AS "favorit", EXISTS(SELECT (?) AS "a"
+    FROM "recipes_shoppingcart" U0
+    WHERE (U0."recipe_id" = "recipes_recipe"."id" AND U0."user_id" = ?)
+    LIMIT ?) AS "shoppings"
+    FROM "recipes_recipe") subquery
+
+SELECT "recipes_recipe"."id", "recipes_recipe"."author_id", "recipes_recipe"."name", "recipes_recipe"."image", "recipes_recipe"."text", "recipes_recipe"."cooking_time", EXISTS(SELECT (?) AS "a"
+    FROM "recipes_favoriterecipe" U0
+    WHERE (U0."recipe_id" = "recipes_recipe"."id" AND U0."user_id" = ?)
+    LIMIT ?) AS "favorit", EXISTS(SELECT (?) AS "a"
+    FROM "recipes_shoppingcart" U0
+    WHERE (U0."recipe_id" = "recipes_recipe"."id" AND U0."user_id" = ?)
+    LIMIT ?) AS "shoppings"
+    FROM "recipes_recipe"
+    ORDER BY "recipes_recipe"."pub_date" DESC
+    LIMIT ?
+
+SELECT "recipes_recipe_tags"."recipe_id", "recipes_recipe_tags"."tag_id", "recipes_tag"."name", "recipes_tag"."color", "recipes_tag"."slug"
+    FROM "recipes_recipe_tags"
+    INNER JOIN "recipes_tag" ON ("recipes_recipe_tags"."tag_id" = "recipes_tag"."id")
+    WHERE "recipes_recipe_tags"."recipe_id" IN (...)
+    ORDER BY "recipes_tag"."name" ASC
+
+SELECT "recipes_recipeingredient"."recipe_id", "recipes_recipeingredient"."ingredient_id", "recipes_ingredient"."name", "recipes_ingredient"."measurement_unit", "recipes_recipeingredient"."amount"
+    FROM "recipes_recipeingredient"
+    INNER JOIN "recipes_ingredient" ON ("recipes_recipeingredient"."ingredient_id" = "recipes_ingredient"."id")
+    WHERE "recipes_recipeingredient"."recipe_id" IN (...)
+    ORDER BY "recipes_recipeingredient"."id" ASC
+
+SELECT "recipes_follow"."author_id"
+    FROM "recipes_follow"
+    WHERE ("recipes_follow"."author_id" IN (...) AND "recipes_follow"."user_id" = ?)
+    ORDER BY "recipes_follow"."id" ASC
+
+SELECT "users_user"."id", "users_user"."email", "users_user"."username", "users_user"."first_name", "users_user"."last_name"
+    FROM "users_user"
+    WHERE "users_user"."id" IN (...)
+    ORDER BY "users_user"."username" ASC
+
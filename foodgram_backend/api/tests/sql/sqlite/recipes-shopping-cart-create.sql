@@ -0,0 +1,33 @@
+-- recipes-shopping-cart-create: HTTP 201, запросов 9
+
+SELECT "recipes_recipe"."id", "recipes_recipe"."author_id", "recipes_recipe"."name", "recipes_recipe"."image", "recipes_recipe"."text", "recipes_recipe"."cooking_time", "recipes_recipe"."pub_date", "recipes_recipe"."updated"
+    FROM "recipes_recipe"
+    WHERE "recipes_recipe"."id" = ?
+    LIMIT ?
+
+SELECT (?) AS "a"
+    FROM "recipes_shoppingcart"
+    WHERE ("recipes_shoppingcart"."recipe_id" = ? AND "recipes_shoppingcart"."user_id" = ?)
+    LIMIT ?
+
+SAVEPOINT "savepoint"
+
+INSERT INTO "recipes_shoppingcart" ("user_id", "recipe_id", "created")
+    VALUES (?, ?, ?)
+
+UPDATE "recipes_recipepopularity"
+    SET "score" = ("recipes_recipepopularity"."score" + ?)
+    WHERE "recipes_recipepopularity"."recipe_id" = ?
+
+SAVEPOINT "savepoint"
+
+INSERT INTO recipes_shoppingcarttotal (user_id, ingredient_id, amount) SELECT ?, ri.ingredient_id, ? * ri.amount
+    FROM recipes_recipeingredient ri
+    WHERE ri.recipe_id = ?
+    ON CONFLICT (user_id, ingredient_id) DO UPDATE
+    SET amount = recipes_shoppingcarttotal.amount + excluded.amount
+
+RELEASE SAVEPOINT "savepoint"
+
+RELEASE SAVEPOINT "savepoint"
+
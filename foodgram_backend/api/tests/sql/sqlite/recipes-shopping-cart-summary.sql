@@ -0,0 +1,8 @@
+-- recipes-shopping-cart-summary: HTTP 200, запросов 1
+
+SELECT "recipes_shoppingcarttotal"."id", "recipes_shoppingcarttotal"."user_id", "recipes_shoppingcarttotal"."ingredient_id", "recipes_shoppingcarttotal"."amount", "recipes_ingredient"."id", "recipes_ingredient"."name", "recipes_ingredient"."measurement_unit"
+    FROM "recipes_shoppingcarttotal"
+    INNER JOIN "recipes_ingredient" ON ("recipes_shoppingcarttotal"."ingredient_id" = "recipes_ingredient"."id")
+    WHERE "recipes_shoppingcarttotal"."user_id" = ?
+    ORDER BY "recipes_ingredient"."name" ASC
+
@@ -0,0 +1,90 @@
+-- recipes-update: HTTP 200, запросов 19
+
+SELECT "recipes_recipe"."id", "recipes_recipe"."author_id", "recipes_recipe"."name", "recipes_recipe"."image", "recipes_recipe"."text", "recipes_recipe"."cooking_time", "recipes_recipe"."pub_date", "recipes_recipe"."updated", EXISTS(SELECT (?) AS "a"
+    FROM "recipes_favoriterecipe" U0
+    WHERE (U0."recipe_id" = "recipes_recipe"."id" AND U0."user_id" = ?)
+    LIMIT ?) AS "favorit", EXISTS(SELECT (?) AS "a"
+    FROM "recipes_shoppingcart" U0
+    WHERE (U0."recipe_id" = "recipes_recipe"."id" AND U0."user_id" = ?)
+    LIMIT ?) AS "shoppings", "users_user"."id", "users_user"."password", "users_user"."last_login", "users_user"."is_superuser", "users_user"."is_staff", "users_user"."is_active", "users_user"."date_joined", "users_user"."email", "users_user"."username", "users_user"."first_name", "users_user"."last_name"
+    FROM "recipes_recipe"
+    INNER JOIN "users_user" ON ("recipes_recipe"."author_id" = "users_user"."id")
+    WHERE "recipes_recipe"."id" = ?
+    LIMIT ?
+
+SELECT ("recipes_recipe_tags"."recipe_id") AS "_prefetch_related_val_recipe_id", "recipes_tag"."id", "recipes_tag"."name", "recipes_tag"."color", "recipes_tag"."slug"
+    FROM "recipes_tag"
+    INNER JOIN "recipes_recipe_tags" ON ("recipes_tag"."id" = "recipes_recipe_tags"."tag_id")
+    WHERE "recipes_recipe_tags"."recipe_id" IN (...)
+    ORDER BY "recipes_tag"."name" ASC
+
+SELECT "recipes_tag"."id", "recipes_tag"."name", "recipes_tag"."color", "recipes_tag"."slug"
+    FROM "recipes_tag"
+    WHERE "recipes_tag"."id" IN (...)
+    ORDER BY "recipes_tag"."name" ASC
+
+SELECT COUNT(*) AS "__count"
+    FROM "recipes_ingredient"
+
+SAVEPOINT "savepoint"
+
+SELECT "recipes_tag"."id"
+    FROM "recipes_tag"
+    INNER JOIN "recipes_recipe_tags" ON ("recipes_tag"."id" = "recipes_recipe_tags"."tag_id")
+    WHERE "recipes_recipe_tags"."recipe_id" = ?
+    ORDER BY "recipes_tag"."name" ASC
+
+SELECT "recipes_recipeingredient"."id", "recipes_recipeingredient"."recipe_id", "recipes_recipeingredient"."ingredient_id", "recipes_recipeingredient"."amount"
+    FROM "recipes_recipeingredient"
+    WHERE "recipes_recipeingredient"."recipe_id" = ?
+
+DELETE
+    FROM "recipes_recipeingredient"
+    WHERE "recipes_recipeingredient"."id" IN (...)
+
+INSERT INTO "recipes_recipeingredient" ("recipe_id", "ingredient_id", "amount") SELECT ?, ?, ? UNION ALL ...
+
+SAVEPOINT "savepoint"
+
+DELETE
+    FROM "recipes_shoppingcarttotal"
+    WHERE ("recipes_shoppingcarttotal"."ingredient_id" IN (...) AND "recipes_shoppingcarttotal"."user_id" IN (SELECT U0."user_id"
+    FROM "recipes_shoppingcart" U0
+    WHERE U0."recipe_id" = ?))
+
+INSERT INTO recipes_shoppingcarttotal (user_id, ingredient_id, amount) SELECT cart.user_id, ri.ingredient_id, SUM(ri.amount)
+    FROM recipes_shoppingcart cart JOIN recipes_recipeingredient ri ON ri.recipe_id = cart.recipe_id
+    WHERE ri.ingredient_id IN (...) AND cart.user_id IN ( SELECT user_id
+    FROM recipes_shoppingcart
+    WHERE recipe_id = ? )
+    GROUP BY cart.user_id, ri.ingredient_id
+
+RELEASE SAVEPOINT "savepoint"
+
+UPDATE "recipes_recipe"
+    SET "author_id" = ?, "name" = ?, "image" = ?, "text" = ?, "cooking_time" = ?, "pub_date" = ?, "updated" = ?
+    WHERE "recipes_recipe"."id" = ?
+
+SELECT "recipes_similarrecipequeue"."recipe_id", "recipes_similarrecipequeue"."created"
+    FROM "recipes_similarrecipequeue"
+    WHERE "recipes_similarrecipequeue"."recipe_id" = ?
+    LIMIT ?
+
+RELEASE SAVEPOINT "savepoint"
+
+SELECT ("recipes_recipe_tags"."recipe_id") AS "_prefetch_related_val_recipe_id", "recipes_tag"."id", "recipes_tag"."name", "recipes_tag"."color", "recipes_tag"."slug"
+    FROM "recipes_tag"
+    INNER JOIN "recipes_recipe_tags" ON ("recipes_tag"."id" = "recipes_recipe_tags"."tag_id")
+    WHERE "recipes_recipe_tags"."recipe_id" IN (...)
+    ORDER BY "recipes_tag"."name" ASC
+
+SELECT "recipes_recipeingredient"."id", "recipes_recipeingredient"."recipe_id", "recipes_recipeingredient"."ingredient_id", "recipes_recipeingredient"."amount", "recipes_ingredient"."id", "recipes_ingredient"."name", "recipes_ingredient"."measurement_unit"
+    FROM "recipes_recipeingredient"
+    INNER JOIN "recipes_ingredient" ON ("recipes_recipeingredient"."ingredient_id" = "recipes_ingredient"."id")
+    WHERE "recipes_recipeingredient"."recipe_id" IN (...)
+
+SELECT (?) AS "a"
+    FROM "recipes_follow"
+    WHERE ("recipes_follow"."author_id" = ? AND "recipes_follow"."user_id" = ?)
+    LIMIT ?
+
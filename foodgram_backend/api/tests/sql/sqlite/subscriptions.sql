@@ -0,0 +1,24 @@
+-- subscriptions: HTTP 200, запросов 3
+
+SELECT COUNT(*)
+    FROM (SELECT COUNT("recipes_recipe"."id") AS "recipes_count"
+    FROM "recipes_follow"
+    INNER JOIN "users_user" T3 ON ("recipes_follow"."author_id" = T3."id")
+    LEFT OUTER JOIN "recipes_recipe" ON (T3."id" = "recipes_recipe"."author_id")
+    WHERE "recipes_follow"."user_id" = ?
+    GROUP BY "recipes_follow"."id") subquery
+
+SELECT "recipes_follow"."id", "recipes_follow"."user_id", "recipes_follow"."author_id", COUNT("recipes_recipe"."id") AS "recipes_count", T3."id", T3."password", T3."last_login", T3."is_superuser", T3."is_staff", T3."is_active", T3."date_joined", T3."email", T3."username", T3."first_name", T3."last_name"
+    FROM "recipes_follow"
+    INNER JOIN "users_user" T3 ON ("recipes_follow"."author_id" = T3."id")
+    LEFT OUTER JOIN "recipes_recipe" ON (T3."id" = "recipes_recipe"."author_id")
+    WHERE "recipes_follow"."user_id" = ?
+    GROUP BY "recipes_follow"."id", "recipes_follow"."user_id", "recipes_follow"."author_id", T3."id", T3."password", T3."last_login", T3."is_superuser", T3."is_staff", T3."is_active", T3."date_joined", T3."email", T3."username", T3."first_name", T3."last_name"
+    ORDER BY "recipes_follow"."id" ASC
+    LIMIT ?
+
+SELECT "recipes_recipe"."id", "recipes_recipe"."author_id", "recipes_recipe"."name", "recipes_recipe"."image", "recipes_recipe"."cooking_time"
+    FROM "recipes_recipe"
+    WHERE "recipes_recipe"."author_id" IN (...)
+    ORDER BY "recipes_recipe"."pub_date" DESC
+
@@ -0,0 +1,6 @@
+-- tags-list: HTTP 200, запросов 1
+
+SELECT "recipes_tag"."id", "recipes_tag"."name", "recipes_tag"."color", "recipes_tag"."slug"
+    FROM "recipes_tag"
+    ORDER BY "recipes_tag"."name" ASC
+
@@ -0,0 +1,10 @@
+-- users-detail: HTTP 200, запросов 1
+
+SELECT "users_user"."id", "users_user"."password", "users_user"."last_login", "users_user"."is_superuser", "users_user"."is_staff", "users_user"."is_active", "users_user"."date_joined", "users_user"."email", "users_user"."username", "users_user"."first_name", "users_user"."last_name", EXISTS(SELECT (?) AS "a"
+    FROM "recipes_follow" U0
+    WHERE (U0."author_id" = "users_user"."id" AND U0."user_id" = ?)
+    LIMIT ?) AS "subscribed"
+    FROM "users_user"
+    WHERE "users_user"."id" = ?
+    LIMIT ?
+
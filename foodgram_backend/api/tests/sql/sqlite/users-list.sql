@@ -0,0 +1,17 @@
+-- users-list: HTTP 200, запросов 2
+
+SELECT COUNT(*)
+    FROM (SELECT EXISTS(SELECT (?) AS "a"
+    FROM "recipes_follow" U0
+    WHERE (U0."author_id" = "users_user"."id" AND U0."user_id" = ?)
+    LIMIT ?) AS "subscribed"
+    FROM "users_user") subquery
+
+SELECT "users_user"."id", "users_user"."password", "users_user"."last_login", "users_user"."is_superuser", "users_user"."is_staff", "users_user"."is_active", "users_user"."date_joined", "users_user"."email", "users_user"."username", "users_user"."first_name", "users_user"."last_name", EXISTS(SELECT (?) AS "a"
+    FROM "recipes_follow" U0
+    WHERE (U0."author_id" = "users_user"."id" AND U0."user_id" = ?)
+    LIMIT ?) AS "subscribed"
+    FROM "users_user"
+    ORDER BY "users_user"."username" ASC
+    LIMIT ?
+
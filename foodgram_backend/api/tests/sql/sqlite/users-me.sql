@@ -0,0 +1,7 @@
+-- users-me: HTTP 200, запросов 1
+
+SELECT (?) AS "a"
+    FROM "recipes_follow"
+    WHERE ("recipes_follow"."author_id" = ? AND "recipes_follow"."user_id" = ?)
+    LIMIT ?
+
@@ -0,0 +1,84 @@
+import threading
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.http import HttpResponse
+from django.test import (AsyncClient, RequestFactory, TestCase,
+                         override_settings)
+from django.test.client import AsyncClientHandler
+from django.urls import resolve
+
+from api import middleware
+from api.middleware import AdmissionControlMiddleware
+
+
+@override_settings(
+    ROOT_URLCONF='foodgram_backend.asgi_urls',
+    SLOW_QUERY_LOG=True,
+    DATABASE_REPLICAS=['default'],
+)
+class AsyncChainTest(TestCase):
+    '''Middleware проекта работают в асинхронной цепочке без потоков.'''
+
+    def test_middleware_not_adapted(self):
+        with override_settings(DEBUG=True):
+            with mock.patch('django.core.handlers.base.logger') as logger:
+                AsyncClientHandler().load_middleware(is_async=True)
+        adapted = [
+            call.args[1] for call in logger.debug.call_args_list
+            if call.args[0].endswith('%s adapted.')
+        ]
+        self.assertEqual([
+            name for name in adapted
+            if name in {f'middleware {path}' for path in settings.MIDDLEWARE}
+        ], [])
+
+    def test_queries_counted_in_pool(self):
+        counts, threads = [], set()
+
+        def observe(value, **labels):
+            if labels['route'] == 'tags-list':
+                counts.append(value)
+
+        counter = middleware.QueryCounter.__call__
+
+        def count(self, execute, *args):
+            threads.add(threading.current_thread().name)
+            return counter(self, execute, *args)
+
+        with mock.patch.object(middleware.DB_QUERIES, 'observe', observe):
+            with mock.patch.object(middleware.QueryCounter, '__call__', count):
+                response = async_to_sync(AsyncClient().get)('/api/tags/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(counts, [1])
+        self.assertTrue(all(name.startswith('async-db') for name in threads))
+
+
+class AsyncAdmissionTest(TestCase):
+    '''Ожидание слота под ASGI не блокирует event loop.'''
+
+    @override_settings(ADMISSION_LIMITS={'tags': {
+        'routes': ('tags-list',), 'concurrency': 1, 'timeout': 0.05,
+    }})
+    def test_rejects_when_busy(self):
+        async def get_response(request):
+            return HttpResponse()
+
+        admission = AdmissionControlMiddleware(get_response)
+        request = RequestFactory().get('/api/tags/')
+        request.resolver_match = resolve('/api/tags/')
+        slot, _ = admission.limits['tags']
+        slot.acquire()
+        try:
+            response = async_to_sync(admission.process_view)(
+                request, None, (), {}
+            )
+        finally:
+            slot.release()
+        self.assertEqual(response.status_code, 503)
+        self.assertIsNone(async_to_sync(admission.process_view)(
+            request, None, (), {}
+        ))
+        async_to_sync(admission.acall)(request)
+        self.assertTrue(slot.acquire(blocking=False))
@@ -0,0 +1,62 @@
+import tempfile
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from rest_framework import exceptions
+from rest_framework.authtoken.models import Token
+
+from api import authentication
+from api.authentication import CachedTokenAuthentication, TokenCache
+from users.models import User
+
+LOCMEM = 'django.core.cache.backends.locmem.LocMemCache'
+FILES = 'django.core.cache.backends.filebased.FileBasedCache'
+
+
+class TokenRevocationTest(TestCase):
+    '''
+    Токен, отозванный в одном воркере, не принимается в другом.
+
+    Воркеры моделируются двумя экземплярами TokenCache: с LocMemCache
+    у каждого своё хранилище, как у отдельных процессов gunicorn, а
+    FileBasedCache общий для обоих.
+    '''
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='cook', email='cook@example.com', password='password'
+        )
+        self.token = Token.objects.create(user=self.user)
+
+    def revoke_and_authenticate(self, first, second):
+        with override_settings(TOKEN_CACHE_LOCAL_TTL=0):
+            worker_a, worker_b = TokenCache(first), TokenCache(second)
+            key = self.token.key
+            worker_b.set(key, self.token)
+            self.token.delete()
+            worker_a.invalidate(key)
+            self.assertIsNone(worker_b.get(key))
+            with mock.patch.object(authentication, 'token_cache', worker_b):
+                with self.assertRaises(exceptions.AuthenticationFailed):
+                    CachedTokenAuthentication().authenticate_credentials(key)
+
+    def test_process_local_cache(self):
+        with override_settings(CACHES={
+            'default': {'BACKEND': LOCMEM},
+            'worker_a': {'BACKEND': LOCMEM, 'LOCATION': 'worker_a'},
+            'worker_b': {'BACKEND': LOCMEM, 'LOCATION': 'worker_b'},
+        }):
+            self.revoke_and_authenticate('worker_a', 'worker_b')
+
+    def test_shared_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(CACHES={
+                'default': {'BACKEND': LOCMEM},
+                'shared': {'BACKEND': FILES, 'LOCATION': directory},
+            }):
+                worker = TokenCache('shared')
+                worker.set(self.token.key, self.token)
+                self.assertEqual(
+                    TokenCache('shared').get(self.token.key), self.token
+                )
+                self.revoke_and_authenticate('shared', 'shared')
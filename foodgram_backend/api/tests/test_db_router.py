@@ -0,0 +1,56 @@
+from django.db import router
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from api.middleware import ReplicaRoutingMiddleware
+from recipes.models import Recipe
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTest(SimpleTestCase):
+    '''
+    Выбор базы для запросов через ReplicaRoutingMiddleware.
+
+    Представление только спрашивает у роутера базу для чтения до и после
+    записи, так что реплика в настройках тестов не нужна.
+    '''
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.reads = []
+        self.write = False
+        self.middleware = ReplicaRoutingMiddleware(self.view)
+
+    def view(self, request):
+        self.reads.append(Recipe.objects.all().db)
+        if self.write:
+            router.db_for_write(Recipe)
+            self.reads.append(Recipe.objects.all().db)
+        return HttpResponse()
+
+    def test_safe_request_reads_replica(self):
+        response = self.middleware(self.factory.get('/api/recipes/'))
+        self.assertEqual(self.reads, ['replica'])
+        self.assertNotIn(ReplicaRoutingMiddleware.cookie, response.cookies)
+
+    def test_write_pins_primary(self):
+        self.write = True
+        response = self.middleware(self.factory.get('/api/recipes/'))
+        self.assertEqual(self.reads, ['replica', 'default'])
+        self.assertIn(ReplicaRoutingMiddleware.cookie, response.cookies)
+        self.reads, self.write = [], False
+        self.middleware(self.factory.post('/api/recipes/'))
+        self.assertEqual(self.reads, ['default'])
+
+    def test_pinned_client_reads_primary(self):
+        request = self.factory.get('/api/recipes/')
+        request.COOKIES[ReplicaRoutingMiddleware.cookie] = '1'
+        self.middleware(request)
+        self.middleware(self.factory.get(
+            '/api/recipes/', HTTP_X_PIN_PRIMARY='1'
+        ))
+        self.assertEqual(self.reads, ['default', 'default'])
+
+    def test_reads_primary_outside_request(self):
+        self.middleware(self.factory.get('/api/recipes/'))
+        self.assertEqual(Recipe.objects.all().db, 'default')
@@ -0,0 +1,131 @@
+import re
+
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.filters import RecipeFilter
+from recipes.models import (FavoriteRecipe, Ingredient, Recipe,
+                            RecipeIngredient, Tag)
+from users.models import User
+
+#  Просмотр таблицы без индекса в плане запроса SQLite и PostgreSQL.
+FULL_SCAN = re.compile(r'\bSCAN (TABLE )?\w+$|Seq Scan', re.MULTILINE)
+
+
+class RecipeFilterTest(TestCase):
+    '''Фильтры рецептов: результаты и форма SQL-запросов.'''
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='cook', email='cook@example.com', password='password'
+        )
+        cls.salt, cls.egg, cls.milk = (
+            Ingredient.objects.create(name=name, measurement_unit='г')
+            for name in ('соль', 'яйцо', 'молоко')
+        )
+        cls.tag = Tag.objects.create(
+            name='Завтрак', color='#FFFFFF', slug='breakfast'
+        )
+        cls.recipes = {}
+        for name, cooking_time, ingredients in (
+            ('омлет', 10, (cls.salt, cls.egg, cls.milk)),
+            ('яичница', 5, (cls.salt, cls.egg)),
+            ('каша', 20, (cls.salt, cls.milk)),
+        ):
+            recipe = Recipe.objects.create(
+                author=cls.user, name=name, text=name, image='recipe.png',
+                cooking_time=cooking_time,
+            )
+            recipe.tags.add(cls.tag)
+            RecipeIngredient.objects.bulk_create(
+                RecipeIngredient(recipe=recipe, ingredient=ingredient,
+                                 amount=1)
+                for ingredient in ingredients
+            )
+            cls.recipes[name] = recipe
+        FavoriteRecipe.objects.create(
+            user=cls.user, recipe=cls.recipes['каша']
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def names(self, query):
+        response = self.client.get(f'/api/recipes/?{query}')
+        self.assertEqual(response.status_code, 200, response.content)
+        return sorted(item['name'] for item in response.json()['results'])
+
+    def filtered(self, params):
+        request = self.client.get('/').wsgi_request
+        request.user = self.user
+        return RecipeFilter(
+            params, Recipe.objects.all(), request=request
+        ).qs
+
+    def assert_no_full_scan(self, queryset):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        self.assertNotRegex(queryset.explain(), FULL_SCAN)
+
+    def test_ingredients_include_all(self):
+        self.assertEqual(
+            self.names(f'ingredients={self.egg.id},{self.milk.id}'),
+            ['омлет'],
+        )
+
+    def test_ingredients_exclude_any(self):
+        self.assertEqual(
+            self.names(f'exclude_ingredients={self.egg.id}'), ['каша']
+        )
+
+    def test_cooking_time_range(self):
+        self.assertEqual(
+            self.names('cooking_time_min=6&cooking_time_max=20'),
+            ['каша', 'омлет'],
+        )
+
+    def test_flags(self):
+        self.assertEqual(self.names('is_favorited=1'), ['каша'])
+        self.assertEqual(
+            self.names('is_favorited=0'), ['каша', 'омлет', 'яичница']
+        )
+        self.assertEqual(self.names('is_in_shopping_cart=1'), [])
+
+    def test_invalid_values(self):
+        response = self.client.get('/api/recipes/?ingredients=salt')
+        self.assertEqual(response.status_code, 400)
+
+    def test_unknown_tags(self):
+        self.assertEqual(self.names('tags=unknown'), [])
+        self.assertEqual(
+            self.names(f'tags=unknown&tags={self.tag.slug}'),
+            ['каша', 'омлет', 'яичница'],
+        )
+
+    def test_semi_joins(self):
+        queryset = self.filtered({
+            'ingredients': f'{self.egg.id},{self.milk.id}',
+            'exclude_ingredients': str(self.salt.id),
+            'tags': [self.tag.slug],
+            'is_favorited': 'true',
+            'is_in_shopping_cart': 'false',
+        })
+        sql = str(queryset.query).upper()
+        self.assertNotIn('DISTINCT', sql)
+        self.assertNotIn('JOIN', sql)
+        self.assertEqual(sql.count('NOT EXISTS'), 1)
+        self.assertEqual(sql.count('EXISTS'), 5)
+
+    def test_semi_joins_use_indexes(self):
+        queryset = self.filtered({
+            'ingredients': str(self.egg.id),
+            'exclude_ingredients': str(self.salt.id),
+            'tags': [self.tag.slug],
+            'is_favorited': 'true',
+            'cooking_time_max': '15',
+        })
+        self.assert_no_full_scan(queryset)
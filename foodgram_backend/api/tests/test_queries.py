@@ -0,0 +1,377 @@
+'''
+Число и форма SQL-запросов каждого маршрута API.
+
+Каждый маршрут из api/urls.py вызывается на двух объёмах данных, и
+число запросов должно совпадать: рост с объёмом означает запрос на
+строку выдачи. Нормализованный SQL основных маршрутов сравнивается со
+снимком в api/tests/sql/<СУБД>/, так что новое соединение, DISTINCT
+или лишний запрос видны в диффе. Снимки хранятся для SQLite; для СУБД
+без каталога снимков сравнение пропускается. После намеренного
+изменения запросов снимки обновляются запуском тестов с
+UPDATE_SQL_SNAPSHOTS=1.
+'''
+
+import os
+import re
+import tempfile
+
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, resolve
+from rest_framework.test import APIClient
+
+from api import urls
+from recipes import pantry
+from recipes.models import (FavoriteRecipe, Follow, Ingredient, Recipe,
+                            RecipeIngredient, RecipePopularity, ShoppingCart,
+                            SimilarRecipe, Tag, TagPopularRecipe)
+from users.models import User
+
+SNAPSHOTS = os.path.join(os.path.dirname(__file__), 'sql')
+SIZES = (2, 5)
+PASSWORD = 'Pa55-word'
+IMAGE = 'data:image/png;base64,' + (
+    'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAC'
+    'hwGA60e6kgAAAABJRU5ErkJggg=='
+)
+
+
+def recipe_payload(data):
+    return {
+        'ingredients': [
+            {'id': ingredient, 'amount': 10}
+            for ingredient in data['ingredients']
+        ],
+        'tags': data['tags'],
+        'image': IMAGE,
+        'name': 'новый рецепт',
+        'text': 'описание',
+        'cooking_time': 15,
+    }
+
+
+#  (имя, метод, адрес, тело, нужна ли авторизация). В адресе и теле
+#  подставляются идентификаторы из populate.
+CASES = (
+    ('api-root', 'get', '/api/', None, False),
+    ('users-list', 'get', '/api/users/', None, True),
+    ('users-create', 'post', '/api/users/', lambda data: {
+        'email': 'new@example.com', 'username': 'new',
+        'first_name': 'Новый', 'last_name': 'Пользователь',
+        'password': PASSWORD,
+    }, False),
+    ('users-detail', 'get', '/api/users/{author}/', None, True),
+    ('users-me', 'get', '/api/users/me/', None, True),
+    ('users-set-password', 'post', '/api/users/set_password/',
+     lambda data: {
+         'new_password': 'N3w-password', 'current_password': PASSWORD,
+     }, True),
+    ('users-set-username', 'post', '/api/users/set_email/', lambda data: {
+        'new_email': 'changed@example.com', 'current_password': PASSWORD,
+    }, True),
+    ('users-activation', 'post', '/api/users/activation/', lambda data: {
+        'uid': 'MQ', 'token': 'token',
+    }, False),
+    ('users-resend-activation', 'post', '/api/users/resend_activation/',
+     lambda data: {'email': 'nobody@example.com'}, False),
+    ('users-reset-password', 'post', '/api/users/reset_password/',
+     lambda data: {'email': 'nobody@example.com'}, False),
+    ('users-reset-password-confirm', 'post',
+     '/api/users/reset_password_confirm/', lambda data: {
+         'uid': 'MQ', 'token': 'token', 'new_password': 'N3w-password',
+     }, False),
+    ('users-reset-username', 'post', '/api/users/reset_email/',
+     lambda data: {'email': 'nobody@example.com'}, False),
+    ('users-reset-username-confirm', 'post',
+     '/api/users/reset_email_confirm/', lambda data: {
+         'uid': 'MQ', 'token': 'token', 'new_email': 'changed@example.com',
+     }, False),
+    ('subscriptions', 'get', '/api/users/subscriptions/', None, True),
+    ('subscriptions-count', 'get',
+     '/api/users/subscriptions/?fields=id,recipes_count', None, True),
+    ('subscribe-create', 'post', '/api/users/{stranger}/subscribe/', None,
+     True),
+    ('subscribe-delete', 'delete', '/api/users/{author}/subscribe/', None,
+     True),
+    ('tags-list', 'get', '/api/tags/', None, False),
+    ('tags-detail', 'get', '/api/tags/{tag}/', None, False),
+    ('ingredients-list', 'get', '/api/ingredients/?name=ингр', None, False),
+    ('ingredients-detail', 'get', '/api/ingredients/{ingredient}/', None,
+     False),
+    ('recipes-list-anonymous', 'get', '/api/recipes/', None, False),
+    ('recipes-list', 'get', '/api/recipes/', None, True),
+    ('recipes-list-filtered', 'get',
+     '/api/recipes/?tags={tag_slug}&is_favorited=1&is_in_shopping_cart=1',
+     None, True),
+    ('recipes-list-author', 'get', '/api/recipes/?author={author}', None,
+     True),
+    ('recipes-list-popular', 'get', '/api/recipes/?ordering=popular', None,
+     True),
+    ('recipes-create', 'post', '/api/recipes/', recipe_payload, True),
+    ('recipes-detail', 'get', '/api/recipes/{recipe}/', None, True),
+    ('recipes-update', 'patch', '/api/recipes/{own_recipe}/',
+     recipe_payload, True),
+    ('recipes-delete', 'delete', '/api/recipes/{own_recipe}/', None, True),
+    ('recipes-favorite-create', 'post', '/api/recipes/{own_recipe}/favorite/',
+     None, True),
+    ('recipes-favorite-delete', 'delete', '/api/recipes/{recipe}/favorite/',
+     None, True),
+    ('recipes-shopping-cart-create', 'post',
+     '/api/recipes/{own_recipe}/shopping_cart/', None, True),
+    ('recipes-shopping-cart-delete', 'delete',
+     '/api/recipes/{recipe}/shopping_cart/', None, True),
+    ('recipes-similar', 'get', '/api/recipes/{recipe}/similar/', None, True),
+    ('recipes-pantry', 'get',
+     '/api/recipes/pantry/?ingredients={ingredient_list}', None, True),
+    ('recipes-popular', 'get', '/api/recipes/popular/', None, True),
+    ('recipes-popular-tag', 'get', '/api/recipes/popular/?tag={tag_slug}',
+     None, True),
+    ('recipes-shopping-cart-summary', 'get',
+     '/api/recipes/shopping_cart/summary/', None, True),
+    ('recipes-download-shopping-cart', 'get',
+     '/api/recipes/download_shopping_cart/', None, True),
+    ('login', 'post', '/api/auth/token/login/', lambda data: {
+        'email': 'viewer@example.com', 'password': PASSWORD,
+    }, False),
+    ('logout', 'post', '/api/auth/token/logout/', None, True),
+)
+
+#  Маршруты, SQL которых сверяется со снимком: списки и карточки, где
+#  легко появиться запросу на строку, и горячие записи. Число запросов
+#  остальных маршрутов проверяется без снимка.
+SNAPSHOT_CASES = (
+    'users-list', 'users-detail', 'users-me', 'subscriptions',
+    'tags-list', 'ingredients-list',
+    'recipes-list-anonymous', 'recipes-list', 'recipes-list-filtered',
+    'recipes-detail', 'recipes-create', 'recipes-update',
+    'recipes-favorite-create', 'recipes-shopping-cart-create',
+    'recipes-shopping-cart-delete', 'recipes-pantry', 'recipes-popular',
+    'recipes-shopping-cart-summary', 'recipes-download-shopping-cart',
+)
+
+LITERALS = (
+    (re.compile(r'\s+'), ' '),
+    (re.compile(r'"s\d+_x\d+"'), '"savepoint"'),
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'(?<![\w."])-?\d+(?:\.\d+)?(?:e[-+]?\d+)?\b', re.I), '?'),
+    (re.compile(r'\(\?(?:, \?)*\)(?:, \(\?(?:, \?)*\))+'), '(?), ...'),
+    (re.compile(r'(?: UNION ALL SELECT \?(?:, \?)*)+'), ' UNION ALL ...'),
+    (re.compile(r'IN \(\?(?:, \?)*\)'), 'IN (...)'),
+)
+CLAUSES = re.compile(
+    r' (?=FROM |WHERE |INNER JOIN |LEFT OUTER JOIN |GROUP BY |HAVING '
+    r'|ORDER BY |LIMIT |VALUES |SET |ON CONFLICT |RETURNING )'
+)
+
+
+def normalize(sql):
+    '''SQL без значений параметров, по предложению на строку.'''
+    for pattern, replacement in LITERALS:
+        sql = pattern.sub(replacement, sql)
+    return CLAUSES.sub('\n    ', sql.strip())
+
+
+def populate(size):
+    '''
+    Данные, где каждая связь рецептов и пользователей имеет size строк.
+
+    viewer подписан на size авторов, у каждого из которых рецепт с size
+    тегами и ингредиентами. Все рецепты в избранном и покупках viewer,
+    популярны и похожи друг на друга.
+    '''
+    viewer = User.objects.create_user(
+        username='viewer', email='viewer@example.com', password=PASSWORD,
+    )
+    stranger = User.objects.create(
+        username='stranger', email='stranger@example.com'
+    )
+    tags = [
+        Tag.objects.create(
+            name=f'Тег {number}', color=f'#00000{number}',
+            slug=f'tag{number}',
+        )
+        for number in range(size)
+    ]
+    ingredients = [
+        Ingredient.objects.create(
+            name=f'ингредиент {number}', measurement_unit='г'
+        )
+        for number in range(size)
+    ]
+    authors = [
+        User.objects.create(
+            username=f'author{number}', email=f'author{number}@example.com'
+        )
+        for number in range(size)
+    ]
+    recipes = []
+    for author in authors + [viewer]:
+        for number in range(size if author is viewer else 1):
+            recipe = Recipe.objects.create(
+                author=author, name=f'{author.username} {number}',
+                text='описание', image='recipes/images/recipe.png',
+                cooking_time=30,
+            )
+            recipe.tags.set(tags)
+            RecipeIngredient.objects.bulk_create(
+                RecipeIngredient(
+                    recipe=recipe, ingredient=ingredient, amount=100
+                )
+                for ingredient in ingredients
+            )
+            recipes.append(recipe)
+    for author in authors:
+        Follow.objects.create(user=viewer, author=author)
+        Follow.objects.create(user=author, author=viewer)
+    for recipe in recipes[:size]:
+        FavoriteRecipe.objects.create(user=viewer, recipe=recipe)
+        ShoppingCart.objects.create(user=viewer, recipe=recipe)
+        SimilarRecipe.objects.bulk_create(
+            SimilarRecipe(recipe=recipe, similar=similar, score=0.5)
+            for similar in recipes if similar != recipe
+        )
+    RecipePopularity.objects.bulk_create(
+        (RecipePopularity(recipe=recipe, score=1.0) for recipe in recipes),
+        ignore_conflicts=True,
+    )
+    TagPopularRecipe.objects.bulk_create(
+        TagPopularRecipe(tag=tag, recipe=recipe, rank=rank)
+        for tag in tags
+        for rank, recipe in enumerate(recipes, 1)
+    )
+    return viewer, {
+        'author': authors[0].id,
+        'stranger': stranger.id,
+        'tag': tags[0].id,
+        'tag_slug': tags[0].slug,
+        'tags': [tag.id for tag in tags],
+        'ingredient': ingredients[0].id,
+        'ingredients': [ingredient.id for ingredient in ingredients],
+        'ingredient_list': ','.join(
+            str(ingredient.id) for ingredient in ingredients
+        ),
+        'recipe': recipes[0].id,
+        'own_recipe': recipes[-1].id,
+    }
+
+
+def route_names(patterns, seen=None):
+    '''Имена маршрутов, до которых может дойти запрос.'''
+    seen = set() if seen is None else seen
+    names = set()
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            names |= route_names(pattern.url_patterns, seen)
+            continue
+        if str(pattern.pattern) in seen:
+            continue
+        seen.add(str(pattern.pattern))
+        names.add(pattern.name or pattern.callback.cls.__name__)
+    return names
+
+
+class QueryShapeTest(TestCase):
+    '''Число и форма запросов не зависят от объёма данных.'''
+
+    maxDiff = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.media = tempfile.TemporaryDirectory()
+        cls.media_settings = override_settings(MEDIA_ROOT=cls.media.name)
+        cls.media_settings.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.media_settings.disable()
+        cls.media.cleanup()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.queries = {size: cls.collect(size) for size in SIZES}
+
+    @classmethod
+    def collect(cls, size):
+        queries = {}
+        with transaction.atomic():
+            viewer, data = populate(size)
+            pantry.index = None
+            for name, method, url, body, auth in CASES:
+                url = url.format(**data)
+                body = body(data) if body else None
+                for _ in range(2):
+                    client = APIClient()
+                    if auth:
+                        client.force_authenticate(
+                            User.objects.get(pk=viewer.pk)
+                        )
+                    with transaction.atomic():
+                        with CaptureQueriesContext(connection) as context:
+                            response = getattr(client, method)(
+                                url, body, format='json'
+                            )
+                        transaction.set_rollback(True)
+                queries[name] = (
+                    response.status_code,
+                    [normalize(query['sql']) for query in context],
+                )
+            transaction.set_rollback(True)
+        return queries
+
+    def test_routes_covered(self):
+        covered = set()
+        for _, _, url, _, _ in CASES:
+            match = resolve(re.sub(r'{\w+}', '1', url.split('?')[0]))
+            covered.add(match.url_name or match.func.cls.__name__)
+        self.assertEqual(route_names(urls.urlpatterns) - covered, set())
+
+    def test_no_server_errors(self):
+        for size, queries in self.queries.items():
+            for name, (status, _) in queries.items():
+                with self.subTest(name, size=size):
+                    self.assertLess(status, 500)
+
+    def test_query_count_is_constant(self):
+        small, large = (self.queries[size] for size in SIZES)
+        for name, _, _, _, _ in CASES:
+            with self.subTest(name):
+                self.assertEqual(
+                    len(small[name][1]), len(large[name][1]),
+                    f'{name}: число запросов растёт с объёмом данных.'
+                )
+                self.assertEqual(
+                    '\n\n'.join(small[name][1]), '\n\n'.join(large[name][1])
+                )
+
+    def test_sql_matches_snapshot(self):
+        directory = os.path.join(SNAPSHOTS, connection.vendor)
+        update = os.getenv('UPDATE_SQL_SNAPSHOTS') == '1'
+        if not update and not os.path.isdir(directory):
+            self.skipTest(
+                f'Нет снимков для {connection.vendor}, запустите тесты с '
+                'UPDATE_SQL_SNAPSHOTS=1.'
+            )
+        for name in SNAPSHOT_CASES:
+            status, queries = self.queries[SIZES[-1]][name]
+            path = os.path.join(directory, f'{name}.sql')
+            actual = (
+                f'-- {name}: HTTP {status}, запросов {len(queries)}\n\n'
+            ) + ''.join(
+                f'{query}\n\n' for query in queries
+            )
+            if update:
+                os.makedirs(directory, exist_ok=True)
+                with open(path, 'w', encoding='utf-8') as file:
+                    file.write(actual)
+                continue
+            with self.subTest(name):
+                if not os.path.exists(path):
+                    self.fail(
+                        f'Нет снимка {path}, запустите тесты с '
+                        'UPDATE_SQL_SNAPSHOTS=1.'
+                    )
+                with open(path, encoding='utf-8') as file:
+                    self.assertEqual(file.read(), actual)
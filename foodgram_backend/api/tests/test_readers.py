@@ -0,0 +1,97 @@
+from django.contrib.auth.models import AnonymousUser
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.readers import RecipeReader
+from api.serializers import RecipeListSerializer
+from api.views import RecipeViewset
+from recipes.models import (FavoriteRecipe, Follow, Ingredient, Recipe,
+                            RecipeIngredient, ShoppingCart, Tag)
+from users.models import User
+
+
+class RecipeReaderTest(TestCase):
+    '''RecipeReader выдаёт тот же JSON, что и RecipeListSerializer.'''
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.viewer = User.objects.create_user(
+            username='viewer', email='viewer@example.com', password='password'
+        )
+        authors = [
+            User.objects.create_user(
+                username=f'author{number}',
+                email=f'author{number}@example.com',
+                first_name='Имя', last_name='Фамилия', password='password'
+            )
+            for number in range(2)
+        ]
+        tags = [
+            Tag.objects.create(name=name, color=color, slug=slug)
+            for name, color, slug in (
+                ('Обед', '#00FF00', 'lunch'),
+                ('Завтрак', '#FF0000', 'breakfast'),
+            )
+        ]
+        ingredients = [
+            Ingredient.objects.create(name=name, measurement_unit='г')
+            for name in ('соль', 'мука', 'сахар')
+        ]
+        recipes = []
+        for number in range(4):
+            recipe = Recipe.objects.create(
+                author=authors[number % 2], name=f'рецепт {number}',
+                image=f'recipes/images/{number}.png', text='описание',
+                cooking_time=10 + number
+            )
+            recipe.tags.set(tags[:number % 2 + 1])
+            RecipeIngredient.objects.bulk_create(
+                RecipeIngredient(
+                    recipe=recipe, ingredient=ingredient, amount=amount
+                )
+                for amount, ingredient in enumerate(
+                    ingredients[number % 3:], start=1
+                )
+            )
+            recipes.append(recipe)
+        FavoriteRecipe.objects.create(user=cls.viewer, recipe=recipes[0])
+        FavoriteRecipe.objects.create(user=cls.viewer, recipe=recipes[1])
+        ShoppingCart.objects.create(user=cls.viewer, recipe=recipes[1])
+        ShoppingCart.objects.create(user=cls.viewer, recipe=recipes[2])
+        Follow.objects.create(user=cls.viewer, author=authors[0])
+
+    def render(self, user):
+        request = Request(APIRequestFactory().get('/api/recipes/'))
+        request.user = user
+        queryset = RecipeViewset(
+            request=request, format_kwarg=None
+        ).get_queryset()
+        reader = RecipeReader(request)
+        expected = RecipeListSerializer(
+            queryset, many=True, context={'request': request}
+        ).data
+        actual = reader.serialize(reader.rows(queryset))
+        renderer = JSONRenderer()
+        self.assertEqual(renderer.render(actual), renderer.render(expected))
+        return actual
+
+    def test_anonymous(self):
+        data = self.render(AnonymousUser())
+        self.assertFalse(any(
+            item['is_favorited'] or item['is_in_shopping_cart']
+            or item['author']['is_subscribed']
+            for item in data
+        ))
+
+    def test_authenticated(self):
+        data = self.render(self.viewer)
+        flags = {
+            (item['is_favorited'], item['is_in_shopping_cart'])
+            for item in data
+        }
+        self.assertTrue({
+            (True, False), (True, True), (False, True), (False, False)
+        } <= flags)
+        self.assertTrue(any(item['author']['is_subscribed'] for item in data))
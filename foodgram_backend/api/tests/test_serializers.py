@@ -0,0 +1,37 @@
+from django.test import TestCase
+
+from api.serializers import RecipeCreateSerializer
+from recipes.models import Ingredient, Tag
+
+
+class RecipeCreateSerializerTest(TestCase):
+    '''Проверка тегов при создании рецепта.'''
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tag = Tag.objects.create(
+            name='Обед', color='#000000', slug='lunch'
+        )
+        cls.salt = Ingredient.objects.create(
+            name='соль', measurement_unit='г'
+        )
+
+    def validate(self, tags):
+        serializer = RecipeCreateSerializer(data={
+            'ingredients': [{'id': self.salt.id, 'amount': 5}],
+            'tags': tags,
+            'name': 'суп',
+            'text': 'суп',
+            'cooking_time': 30,
+        }, partial=True)
+        serializer.is_valid()
+        return serializer.errors.get('tags')
+
+    def test_tags_required(self):
+        self.assertIsNotNone(self.validate([]))
+
+    def test_unknown_tag(self):
+        self.assertIsNotNone(self.validate([self.tag.id, self.tag.id + 1]))
+
+    def test_valid_tags(self):
+        self.assertIsNone(self.validate([self.tag.id]))
@@ -0,0 +1,132 @@
+from django.db.models import Sum
+from django.test import TestCase
+from rest_framework.test import (APIClient, APIRequestFactory,
+                                 force_authenticate)
+
+from api import async_views
+from recipes.models import (Ingredient, Recipe, RecipeIngredient,
+                            ShoppingCartTotal, Tag)
+from users.models import User
+
+
+class ShoppingCartSummaryTest(TestCase):
+    '''Итоги списка покупок совпадают с пересчётом по рецептам.'''
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='cook', email='cook@example.com', password='password'
+        )
+        cls.tag = Tag.objects.create(
+            name='Обед', color='#000000', slug='lunch'
+        )
+        cls.salt, cls.potato = (
+            Ingredient.objects.create(name=name, measurement_unit='г')
+            for name in ('соль', 'картофель')
+        )
+        cls.soup, cls.puree = (
+            Recipe.objects.create(
+                author=cls.user, name=name, text=name, image='recipe.png',
+                cooking_time=30,
+            )
+            for name in ('суп', 'пюре')
+        )
+        for recipe, salt, potato in ((cls.soup, 5, 300), (cls.puree, 3, 500)):
+            RecipeIngredient.objects.create(
+                recipe=recipe, ingredient=cls.salt, amount=salt
+            )
+            RecipeIngredient.objects.create(
+                recipe=recipe, ingredient=cls.potato, amount=potato
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def summary(self):
+        response = self.client.get('/api/recipes/shopping_cart/summary/')
+        self.assertEqual(response.status_code, 200)
+        return {item['name']: item['amount'] for item in response.json()}
+
+    def assert_consistent(self):
+        expected = dict(RecipeIngredient.objects.filter(
+            recipe__shopping__user=self.user
+        ).values_list('ingredient_id').annotate(total=Sum('amount')))
+        self.assertEqual(dict(ShoppingCartTotal.objects.filter(
+            user=self.user
+        ).values_list('ingredient_id', 'amount')), expected)
+
+    def test_add_and_remove(self):
+        for recipe in (self.soup, self.puree):
+            self.client.post(f'/api/recipes/{recipe.id}/shopping_cart/')
+        self.assertEqual(self.summary(), {'соль': 8, 'картофель': 800})
+        self.client.delete(f'/api/recipes/{self.soup.id}/shopping_cart/')
+        self.assertEqual(self.summary(), {'соль': 3, 'картофель': 500})
+        self.client.delete(f'/api/recipes/{self.puree.id}/shopping_cart/')
+        self.assertEqual(self.summary(), {})
+        self.assert_consistent()
+
+    def test_recipe_changes(self):
+        self.client.post(f'/api/recipes/{self.soup.id}/shopping_cart/')
+        self.client.post(f'/api/recipes/{self.puree.id}/shopping_cart/')
+        response = self.client.patch(
+            f'/api/recipes/{self.soup.id}/',
+            {
+                'ingredients': [{'id': self.salt.id, 'amount': 10}],
+                'tags': [self.tag.id],
+                'name': 'суп',
+                'text': 'суп',
+                'cooking_time': 30,
+            },
+            format='json',
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(self.summary(), {'соль': 13, 'картофель': 500})
+        self.puree.delete()
+        self.assertEqual(self.summary(), {'соль': 10})
+        self.assert_consistent()
+
+    def test_summary_is_one_query(self):
+        self.client.post(f'/api/recipes/{self.soup.id}/shopping_cart/')
+        with self.assertNumQueries(1):
+            self.client.get('/api/recipes/shopping_cart/summary/')
+
+    def test_asgi_download_reads_totals(self):
+        for recipe in (self.soup, self.puree):
+            self.client.post(f'/api/recipes/{recipe.id}/shopping_cart/')
+        request = APIRequestFactory().get(
+            '/api/recipes/download_shopping_cart/'
+        )
+        force_authenticate(request, self.user)
+        response = async_views.shopping_cart_ingredients(request)
+        self.assertEqual(
+            [tuple(line) for line in response.data],
+            [('картофель', 'г', 800), ('соль', 'г', 8)],
+        )
+
+    def test_orm_changes(self):
+        self.client.post(f'/api/recipes/{self.soup.id}/shopping_cart/')
+        salt = RecipeIngredient.objects.get(
+            recipe=self.soup, ingredient=self.salt
+        )
+        salt.amount = 7
+        salt.save()
+        self.assertEqual(self.summary(), {'соль': 7, 'картофель': 300})
+        RecipeIngredient.objects.filter(
+            recipe=self.soup, ingredient=self.potato
+        ).delete()
+        self.assertEqual(self.summary(), {'соль': 7})
+        pepper = Ingredient.objects.create(name='перец', measurement_unit='г')
+        self.soup.ingredients.add(pepper, through_defaults={'amount': 2})
+        self.assertEqual(self.summary(), {'соль': 7, 'перец': 2})
+        salt.ingredient = self.potato
+        salt.save()
+        self.assertEqual(self.summary(), {'картофель': 7, 'перец': 2})
+        self.assert_consistent()
+
+    def test_delete_recipe_in_cart(self):
+        for recipe in (self.soup, self.puree):
+            self.client.post(f'/api/recipes/{recipe.id}/shopping_cart/')
+        self.soup.delete()
+        self.assertEqual(self.summary(), {'соль': 3, 'картофель': 500})
+        self.assert_consistent()
@@ -1,5 +1,8 @@
 import io
+import os
 
+from django.conf import settings
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
@@ -7,6 +10,10 @@ from reportlab.pdfgen import canvas
 from rest_framework import status
 from rest_framework.response import Response
 
+from recipes import tasks
+
+FONT_PATH = os.path.join(settings.BASE_DIR, 'fonts', 'verdana.ttf')
+
 
 def post(request, pk, get_object, models, serializer):
     obj = get_object_or_404(get_object, id=pk)
@@ -21,9 +28,11 @@ def post(request, pk, get_object, models, serializer):
     serializer = serializer(
         obj, context={request: 'request'}
     )
-    models.objects.create(
-        recipe=obj, user=request.user
-    )
+    with transaction.atomic():
+        models.objects.create(
+            recipe=obj, user=request.user
+        )
+        tasks.schedule_popular_tags()
     return Response(
         serializer.data, status=status.HTTP_201_CREATED
     )
@@ -38,17 +47,24 @@ def delete(request, pk, get_object, models):
             {'message':
                 f'Вы не добавляли рецепт {obj}.'}
         )
-    models.objects.filter(
-        recipe=obj, user=request.user
-    ).delete()
+    with transaction.atomic():
+        models.objects.filter(
+            recipe=obj, user=request.user
+        ).delete()
+        tasks.schedule_popular_tags()
     return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+def register_fonts():
+    '''Разобрать TTF один раз на процесс, а не при каждом рендеринге.'''
+    if 'verdana' not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(TTFont('verdana', FONT_PATH, 'UTF-8'))
+
+
 def render_pdf(ingredients):
     grocery_list = {}
     download = io.BytesIO()
-    pdfmetrics.registerFont(
-        TTFont('verdana', 'fonts/verdana.ttf', 'UTF-8'))
+    register_fonts()
     for ingredient in ingredients:
         if ingredient[0] not in grocery_list:
             grocery_list[ingredient[0]] = {
@@ -1,30 +1,51 @@
-from django.db.models import Exists, OuterRef
-from django.http import FileResponse
+from django.conf import settings
+from django.db.models import Count, Exists, F, OuterRef, Prefetch
+from django.http import FileResponse, Http404
 from django.shortcuts import get_object_or_404
+from django_filters.rest_framework import DjangoFilterBackend
 from djoser import views
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from recipes import pantry, shopping
 from recipes.models import (FavoriteRecipe, Follow, Ingredient, Recipe,
-                            RecipeIngredient, ShoppingCart, Tag)
+                            RecipePopularity, ShoppingCart, ShoppingCartTotal,
+                            Tag, TagPopularRecipe)
 from users.models import User
-from .filters import IngredientSearchFilter
-from .mixins import ListViewSet
+from .filters import IngredientSearchFilter, RecipeFilter
+from .mixins import ListViewSet, SparseFieldsMixin
 from .permissions import IsAdminOrReadOnly, IsAuthorOrReadOnly
+from .readers import RecipeReader
 from .serializers import (CustomUserSerializer, IngredientSerializer,
                           RecipeCreateSerializer, RecipeListSerializer,
+                          ShoppingCartTotalSerializer,
                           SubscribeRecipeSerializer, SubscribeSerializer,
                           SubscribeUserSerializer, TagSerializer)
 from .utils import delete, post, render_pdf
 
 
-class CustomUserViewSet(views.UserViewSet):
+class CustomUserViewSet(SparseFieldsMixin, views.UserViewSet):
 
     queryset = User.objects.all()
     serializer_class = CustomUserSerializer
+    sparse_columns = {
+        'email': ('email',),
+        'username': ('username',),
+        'first_name': ('first_name',),
+        'last_name': ('last_name',),
+    }
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.user.is_authenticated:
+            return queryset.annotate(subscribed=Exists(Follow.objects.filter(
+                user=self.request.user, author_id=OuterRef('pk')
+            )))
+        return queryset
 
 
 class SubscribeView(APIView):
@@ -46,14 +67,39 @@ class SubscribeView(APIView):
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
-class SubscriptionsList(ListViewSet):
+class SubscriptionsList(SparseFieldsMixin, ListViewSet):
     '''Представление списка подписок пользователя.'''
 
     serializer_class = SubscribeSerializer
     permission_classes = (IsAuthenticated,)
+    sparse_columns = {
+        'email': ('author', 'author__email'),
+        'id': ('author',),
+        'username': ('author', 'author__username'),
+        'first_name': ('author', 'author__first_name'),
+        'last_name': ('author', 'author__last_name'),
+        'is_subscribed': ('author', 'user'),
+        'recipes': ('author',),
+        'recipes_count': ('author',),
+    }
 
     def get_queryset(self):
-        return Follow.objects.filter(user=self.request.user)
+        fields = self.get_sparse_fields()
+        queryset = Follow.objects.filter(
+            user=self.request.user
+        ).select_related('author')
+        if fields is None or 'recipes_count' in fields:
+            queryset = queryset.annotate(
+                recipes_count=Count('author__recipes')
+            ).order_by('id')
+        if fields is None or 'recipes' in fields:
+            queryset = queryset.prefetch_related(Prefetch(
+                'author__recipes',
+                queryset=Recipe.objects.only(
+                    'id', 'author', 'name', 'image', 'cooking_time'
+                )
+            ))
+        return queryset
 
 
 class TagViewSet(viewsets.ReadOnlyModelViewSet):
@@ -76,40 +122,28 @@ class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     search_fields = ('^name',)
 
 
-class RecipeViewset(viewsets.ModelViewSet):
+class RecipeViewset(SparseFieldsMixin, viewsets.ModelViewSet):
     '''Представление рецептов'''
 
     permission_classes = (IsAuthorOrReadOnly | IsAdminOrReadOnly,)
+    filter_backends = (DjangoFilterBackend,)
+    filterset_class = RecipeFilter
 
     def get_queryset(self):
         queryset = Recipe.objects.select_related(
             'author').prefetch_related('tags')
-        favorited = self.request.query_params.get('is_favorited')
-        shopping_cart = self.request.query_params.get('is_in_shopping_cart')
-        author = self.request.query_params.get('author')
-        tags = self.request.query_params.getlist('tags')
-        if favorited:
-            queryset = queryset.filter(favorite__user=self.request.user)
-        if shopping_cart:
-            queryset = queryset.filter(shopping__user=self.request.user)
-        if author:
-            queryset = queryset.filter(author=author)
-        if tags:
-            queryset = queryset.filter(tags__slug__in=tags).distinct()
+        if self.request.query_params.get('ordering') == 'popular':
+            queryset = queryset.order_by(
+                F('popularity__score').desc(nulls_last=True), '-pub_date'
+            )
         if self.request.user.is_authenticated:
             return queryset.annotate(
-                favorit=Exists(
-                    queryset.filter(
-                        favorite__user=self.request.user,
-                        favorite__recipe=OuterRef('id'),
-                    )
-                ),
-                shoppings=Exists(
-                    queryset.filter(
-                        shopping__user=self.request.user,
-                        shopping__recipe=OuterRef('id'),
-                    )
-                ),
+                favorit=Exists(FavoriteRecipe.objects.filter(
+                    user=self.request.user, recipe_id=OuterRef('pk')
+                )),
+                shoppings=Exists(ShoppingCart.objects.filter(
+                    user=self.request.user, recipe_id=OuterRef('pk')
+                )),
             )
         return queryset
 
@@ -118,9 +152,32 @@ class RecipeViewset(viewsets.ModelViewSet):
             return RecipeListSerializer
         return RecipeCreateSerializer
 
+    def list(self, request, *args, **kwargs):
+        reader = RecipeReader(request, self.get_sparse_fields())
+        rows = reader.rows(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(reader.serialize(page))
+        return Response(reader.serialize(rows))
+
+    def retrieve(self, request, *args, **kwargs):
+        reader = RecipeReader(request, self.get_sparse_fields())
+        try:
+            queryset = self.get_queryset().filter(pk=kwargs['pk'])
+        except (TypeError, ValueError):
+            raise Http404
+        data = reader.serialize(reader.rows(queryset))
+        if not data:
+            raise Http404
+        return Response(data[0])
+
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
+    def perform_destroy(self, instance):
+        with shopping.batch():
+            instance.delete()
+
     @action(
         detail=True,
         methods=['POST', 'DELETE'],
@@ -151,14 +208,88 @@ class RecipeViewset(viewsets.ModelViewSet):
             return delete(request, pk, Recipe, ShoppingCart)
         return Response(status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=True)
+    def similar(self, request, pk=None):
+        try:
+            recipes = Recipe.objects.filter(similar_to__recipe_id=pk)
+        except (TypeError, ValueError):
+            raise Http404
+        recipes = recipes.order_by('-similar_to__score').only(
+            'id', 'name', 'image', 'cooking_time'
+        )[:settings.SIMILAR_RECIPES_COUNT]
+        return Response(SubscribeRecipeSerializer(
+            recipes, many=True, context={'request': request}
+        ).data)
+
+    @action(detail=False)
+    def pantry(self, request):
+        params = request.query_params
+        try:
+            ingredients = [
+                int(value)
+                for value in params.get('ingredients', '').split(',')
+                if value.strip()
+            ]
+            max_missing = params.get('max_missing')
+            max_missing = int(max_missing) if max_missing else None
+            author = int(params['author']) if params.get('author') else None
+        except ValueError:
+            raise ValidationError(
+                'Ингредиенты, max_missing и author должны быть числами.'
+            )
+        if not ingredients:
+            raise ValidationError(
+                {'ingredients': 'Укажите хотя бы один ингредиент.'}
+            )
+        tags = params.getlist('tags')
+        tag_ids = list(
+            Tag.objects.filter(slug__in=tags).values_list('id', flat=True)
+        ) if tags else None
+        recipe_ids, missing, coverage = pantry.get_index().search(
+            ingredients, max_missing, tag_ids, author
+        )
+        ranks = {recipe_id: rank for rank, recipe_id in enumerate(recipe_ids)}
+        page = self.paginate_queryset(recipe_ids)
+        reader = RecipeReader(request, self.get_sparse_fields())
+        rows = reader.rows_in_order(self.get_queryset(), page)
+        data = reader.serialize(rows)
+        for item, row in zip(data, rows):
+            item['missing_count'] = missing[ranks[row['id']]]
+            item['coverage'] = round(coverage[ranks[row['id']]], 3)
+        return self.get_paginated_response(data)
+
+    @action(detail=False)
+    def popular(self, request):
+        tag = request.query_params.get('tag')
+        if tag:
+            recipe_ids = TagPopularRecipe.objects.filter(
+                tag__slug=tag
+            ).order_by('rank').values_list('recipe_id', flat=True)
+        else:
+            recipe_ids = RecipePopularity.objects.order_by(
+                '-score'
+            ).values_list('recipe_id', flat=True)
+        reader = RecipeReader(request, self.get_sparse_fields())
+        rows = reader.rows_in_order(
+            self.get_queryset(),
+            list(recipe_ids[:settings.POPULARITY_TOP_COUNT])
+        )
+        return Response(reader.serialize(rows))
+
+    @action(
+        detail=False,
+        url_path='shopping_cart/summary',
+        permission_classes=[IsAuthenticated]
+    )
+    def shopping_cart_summary(self, request):
+        totals = ShoppingCartTotal.objects.filter(
+            user=request.user
+        ).select_related('ingredient').order_by('ingredient__name')
+        return Response(ShoppingCartTotalSerializer(totals, many=True).data)
+
     @action(detail=False, permission_classes=[IsAuthenticated])
     def download_shopping_cart(self, request):
-        ingredients = RecipeIngredient.objects.filter(
-            recipe__shopping__user=request.user
-        ).values_list(
-            'ingredient__name', 'ingredient__measurement_unit', 'amount'
-        )
         return FileResponse(
-            render_pdf(ingredients),
+            render_pdf(shopping.lines(request.user)),
             as_attachment=True,
             filename='grocery_list.pdf',)
@@ -0,0 +1,84 @@
+'''
+Прогрев процесса до первого запроса.
+
+Вызывается из wsgi.py и asgi.py после создания приложения. Под
+gunicorn --preload модуль приложения импортируется в мастер-процессе,
+поэтому всё, что построено здесь, форкнутые воркеры получают готовым и
+делят эти страницы памяти copy-on-write. После прогрева соединения с
+базой закрываются, чтобы воркеры не унаследовали общий сокет, а
+gc.freeze() переносит созданные объекты в постоянное поколение: сборщик
+мусора воркеров не обходит их и не копирует страницы.
+'''
+
+import gc
+import inspect
+import logging
+import time
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.db import DatabaseError, connections
+from django.urls import get_resolver
+from rest_framework import serializers
+
+logger = logging.getLogger('foodgram.warmup')
+
+
+def build_resolver():
+    '''Скомпилировать регулярные выражения всех маршрутов.'''
+    resolver = get_resolver()
+    return len(resolver.reverse_dict)
+
+
+def build_serializers():
+    '''
+    Построить поля всех сериализаторов API: заполняет кеши _meta моделей
+    и импортирует лениво загружаемые модули полей и валидаторов.
+    '''
+    from api import serializers as api_serializers
+
+    built = 0
+    for _, serializer in inspect.getmembers(api_serializers, inspect.isclass):
+        if (issubclass(serializer, serializers.Serializer)
+                and serializer.__module__ == api_serializers.__name__):
+            serializer().fields
+            built += 1
+    return built
+
+
+def build_fonts():
+    from api.utils import register_fonts
+
+    register_fonts()
+
+
+def build_catalogs():
+    '''Кеш типов содержимого и индекс поиска по продуктам.'''
+    from recipes import pantry
+
+    ContentType.objects.get_for_models(*apps.get_models())
+    return len(pantry.get_index().recipe_ids)
+
+
+STEPS = (
+    ('url_resolver', build_resolver),
+    ('serializers', build_serializers),
+    ('fonts', build_fonts),
+    ('catalogs', build_catalogs),
+)
+
+
+def warm_up():
+    '''Выполнить шаги прогрева и вернуть их длительность в мс.'''
+    timings = {}
+    for name, step in STEPS:
+        started = time.perf_counter()
+        try:
+            step()
+        except DatabaseError as error:
+            logger.warning('Прогрев %s пропущен: %s', name, error)
+        timings[name] = round((time.perf_counter() - started) * 1000, 1)
+    connections.close_all()
+    gc.collect()
+    gc.freeze()
+    return timings
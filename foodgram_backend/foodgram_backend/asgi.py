@@ -0,0 +1,27 @@
+import os
+
+from asgiref.sync import ThreadSensitiveContext
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'foodgram_backend.settings')
+os.environ.setdefault('ROOT_URLCONF', 'foodgram_backend.asgi_urls')
+
+from django.core.asgi import get_asgi_application  # noqa: E402
+
+django_application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402
+
+if settings.STARTUP_WARMUP:
+    from api.warmup import warm_up
+
+    warm_up()
+
+
+async def application(scope, receive, send):
+    # Каждый запрос получает свой поток для синхронного кода, иначе
+    # Django 3.2 выполняет все синхронные представления в одном потоке.
+    # Middleware проекта асинхронные, поэтому асинхронные представления
+    # из asgi_urls такого потока не занимают и работают через пулы
+    # api.async_views.
+    async with ThreadSensitiveContext():
+        return await django_application(scope, receive, send)
@@ -0,0 +1,21 @@
+from django.urls import path
+
+from api import async_views
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path('api/tags/', async_views.tag_list, name='tags-list'),
+    path(
+        'api/ingredients/', async_views.ingredient_list,
+        name='ingredients-list'
+    ),
+    path(
+        'api/recipes/download_shopping_cart/',
+        async_views.download_shopping_cart,
+        name='recipes-download-shopping-cart',
+    ),
+    path(
+        'api/recipes/<int:pk>/', async_views.recipe_detail,
+        name='recipes-detail'
+    ),
+] + sync_urlpatterns
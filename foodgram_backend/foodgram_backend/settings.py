@@ -8,7 +8,7 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 SECRET_KEY = os.getenv('SECRET_KEY', default='xxx')
 
-DEBUG = os.getenv('DEBUG', default=False)
+DEBUG = os.getenv('DEBUG', default='False') == 'True'
 
 ALLOWED_HOSTS = os.getenv('ALLOWED_HOSTS', default=['*'])
 
@@ -21,7 +21,6 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
-    'debug_toolbar',
 
     'rest_framework',
     'rest_framework.authtoken',
@@ -31,9 +30,14 @@ INSTALLED_APPS = [
     'api.apps.ApiConfig',
     'recipes.apps.RecipesConfig',
     'users.apps.UsersConfig',
+    'jobs.apps.JobsConfig',
 ]
 
 MIDDLEWARE = [
+    'api.middleware.MetricsMiddleware',
+    'api.middleware.SlowQueryMiddleware',
+    'api.middleware.ReplicaRoutingMiddleware',
+    'api.middleware.AdmissionControlMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -41,10 +45,16 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
 ]
 
-ROOT_URLCONF = 'foodgram_backend.urls'
+if DEBUG:
+    INSTALLED_APPS.append('debug_toolbar')
+    MIDDLEWARE.append('debug_toolbar.middleware.DebugToolbarMiddleware')
+
+#  Прогрев процесса при импорте wsgi.py и asgi.py, см. api/warmup.py.
+STARTUP_WARMUP = os.getenv('STARTUP_WARMUP', default='True') == 'True'
+
+ROOT_URLCONF = os.getenv('ROOT_URLCONF', default='foodgram_backend.urls')
 
 TEMPLATES = [
     {
@@ -64,6 +74,13 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'foodgram_backend.wsgi.application'
 
+ASGI_APPLICATION = 'foodgram_backend.asgi.application'
+
+#  Размеры пулов потоков асинхронных представлений.
+ASYNC_DB_THREADS = int(os.getenv('ASYNC_DB_THREADS', default=8))
+
+ASYNC_PDF_THREADS = int(os.getenv('ASYNC_PDF_THREADS', default=2))
+
 AUTH_USER_MODEL = 'users.User'
 
 DATABASES = {
@@ -77,6 +94,38 @@ DATABASES = {
     }
 }
 
+#  Реплики для чтения, через запятую: [имя_базы@]хост[:порт].
+DATABASE_REPLICAS = []
+
+for number, replica in enumerate(
+    filter(None, os.getenv('DB_REPLICAS', default='').split(','))
+):
+    replica_name, _, replica_host = replica.strip().rpartition('@')
+    replica_host, _, replica_port = replica_host.partition(':')
+    DATABASES[f'replica_{number}'] = {
+        **DATABASES['default'],
+        'NAME': replica_name or DATABASES['default']['NAME'],
+        'HOST': replica_host,
+        'PORT': replica_port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica_{number}')
+
+DATABASE_ROUTERS = ['api.db_router.ReplicaRouter']
+
+#  Сколько секунд после записи клиент читает из основной базы.
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', default=5))
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', default=''),
+    }
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -112,14 +161,135 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'backend_media')
 
 QUERY_SET_LENGTH = 50
 
+#  Каталог для обмена метриками между воркерами gunicorn.
+METRICS_DIR = os.getenv('METRICS_DIR', default=None)
+
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', default=1))
+
+SLOW_QUERY_LOG = os.getenv('SLOW_QUERY_LOG', default='False') == 'True'
+
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv('SLOW_QUERY_THRESHOLD_MS', default=100))
+
+#  Доля медленных SELECT запросов, для которых сохраняется EXPLAIN ANALYZE.
+SLOW_QUERY_EXPLAIN_RATE = float(os.getenv('SLOW_QUERY_EXPLAIN_RATE', default=0.1))
+
+SLOW_QUERY_LOG_FILE = os.getenv(
+    'SLOW_QUERY_LOG_FILE', default=os.path.join(BASE_DIR, 'slow_queries.jsonl')
+)
+
+SLOW_QUERY_LOG_MAX_BYTES = 10 * 1024 * 1024
+
+SLOW_QUERY_LOG_BACKUP_COUNT = 5
+
+#  Общий слой кэша токенов работает только с кэшем, общим для всех
+#  воркеров (CACHE_BACKEND=...PyMemcacheCache и т.п.). С LocMemCache
+#  токены кэшируются лишь в памяти процесса на TOKEN_CACHE_LOCAL_TTL.
+TOKEN_CACHE_ALIAS = 'default'
+
+TOKEN_CACHE_TIMEOUT = 300
+
+TOKEN_CACHE_LOCAL_TTL = 10
+
+TOKEN_CACHE_LOCAL_SIZE = 10000
+
+#  Лимиты одновременных запросов внутри воркера по классам маршрутов:
+#  сколько запросов выполняется параллельно и сколько секунд запрос
+#  может ждать свободного слота до ответа 503. Лимиты действуют только
+#  в потоковых и ASGI воркерах (в Dockerfile по умолчанию gthread), на
+#  весь сервер приходится лимит, умноженный на число воркеров.
+ADMISSION_LIMITS = {
+    'shopping_list': {
+        'routes': ('recipes-download-shopping-cart',),
+        'concurrency': int(os.getenv('ADMISSION_PDF_CONCURRENCY', default=2)),
+        'timeout': 1,
+    },
+    'recipe_list': {
+        'routes': (
+            'recipes-list', 'recipes-pantry', 'api.views.SubscriptionsList',
+        ),
+        'concurrency': int(os.getenv('ADMISSION_LIST_CONCURRENCY', default=8)),
+        'timeout': 2,
+    },
+}
+
+ADMISSION_RETRY_AFTER = 2
+
+#  Начиная с этого числа строк пагинаторы выборок без фильтров берут
+#  оценку из статистики PostgreSQL вместо точного COUNT(*).
+ESTIMATED_COUNT_THRESHOLD = int(
+    os.getenv('ESTIMATED_COUNT_THRESHOLD', default=100000)
+)
+
+#  Похожие рецепты: сколько хранить на рецепт, минимальное сходство и
+#  вес тегов относительно ингредиентов.
+SIMILAR_RECIPES_COUNT = 10
+
+SIMILAR_RECIPES_MIN_SCORE = 0.05
+
+SIMILAR_RECIPES_TAG_WEIGHT = 0.5
+
+#  Через сколько секунд после изменения рецепта фоновая задача
+#  пересчитывает очередь похожих, чтобы собрать изменения в один проход.
+SIMILAR_RECIPES_DELAY = int(os.getenv('SIMILAR_RECIPES_DELAY', default=60))
+
+#  Индекс поиска по продуктам: как часто подгружать изменённые рецепты
+#  и как часто строить индекс заново, в секундах.
+PANTRY_INDEX_REFRESH = int(os.getenv('PANTRY_INDEX_REFRESH', default=30))
+
+PANTRY_INDEX_REBUILD = int(os.getenv('PANTRY_INDEX_REBUILD', default=3600))
+
+#  Популярность рецептов: веса добавлений, период полураспада и общая
+#  эпоха, от которой отсчитываются веса.
+POPULARITY_WEIGHTS = {
+    'favorite': 1.0,
+    'shopping_cart': 0.5,
+}
+
+POPULARITY_HALF_LIFE_DAYS = 7
+
+POPULARITY_EPOCH = '2023-01-01T00:00:00+00:00'
+
+POPULARITY_TOP_COUNT = 50
+
+POPULARITY_TAGS_DELAY = int(os.getenv('POPULARITY_TAGS_DELAY', default=60))
+
+#  Фоновые задачи: число потоков run_workers, пауза между опросами
+#  пустой очереди, попытки и задержка первого повтора, которая дальше
+#  удваивается. Задача, не завершённая за JOBS_LOCK_TIMEOUT секунд,
+#  возвращается в очередь, выполненные хранятся JOBS_KEEP_DAYS дней.
+JOBS_WORKERS = int(os.getenv('JOBS_WORKERS', default=2))
+
+JOBS_POLL_INTERVAL = float(os.getenv('JOBS_POLL_INTERVAL', default=1))
+
+JOBS_MAX_ATTEMPTS = 5
+
+JOBS_RETRY_DELAY = 10
+
+JOBS_RETRY_MAX_DELAY = 3600
+
+JOBS_LOCK_TIMEOUT = int(os.getenv('JOBS_LOCK_TIMEOUT', default=600))
+
+JOBS_MAINTENANCE_INTERVAL = 60
+
+JOBS_KEEP_DAYS = 7
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'api.authentication.CachedTokenAuthentication',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.EstimatedCountPagination',
     'PAGE_SIZE': 6,
 }
 
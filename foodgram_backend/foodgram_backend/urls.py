@@ -3,9 +3,13 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
+from api.metrics import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('api.urls')),
+    #  Не проксируется nginx, доступен только из внутренней сети.
+    path('metrics', metrics_view),
 ]
 
 if settings.DEBUG:
@@ -0,0 +1,14 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'id', 'name', 'status', 'attempts', 'run_at', 'finished',
+    )
+    list_filter = ('status',)
+    search_fields = ('name', 'key',)
+    readonly_fields = ('created', 'finished', 'locked_at', 'last_error',)
+    show_full_result_count = False
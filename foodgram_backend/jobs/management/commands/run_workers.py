@@ -0,0 +1,97 @@
+'''
+Management-команда на выполнение фоновых задач.
+
+Запускает --workers потоков, каждый из которых забирает задачи из
+таблицы Job и выполняет их, а основной поток раз в
+JOBS_MAINTENANCE_INTERVAL секунд возвращает в очередь зависшие задачи и
+удаляет старые выполненные. Несколько процессов run_workers можно
+запускать одновременно, в том числе на разных серверах. SIGINT и SIGTERM
+останавливают команду после завершения текущих задач.
+'''
+
+import signal
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections, connection
+from django.utils.module_loading import autodiscover_modules
+
+from jobs import queue
+
+
+class Command(BaseCommand):
+    help = 'Выполнение фоновых задач из очереди.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=settings.JOBS_WORKERS,
+            help='Количество потоков-воркеров.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и завершиться.'
+        )
+
+    def handle(self, *args, **options):
+        autodiscover_modules('tasks')
+        self.stop = threading.Event()
+        self.once = options['once']
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *args: self.stop.set())
+        self.maintain()
+        workers = [
+            threading.Thread(target=self.work, name=f'worker-{number}')
+            for number in range(options['workers'])
+        ]
+        for worker in workers:
+            worker.start()
+        self.stdout.write(
+            f'Запущено воркеров: {len(workers)}, '
+            f'задачи: {", ".join(sorted(queue.registry))}.'
+        )
+        maintained = time.monotonic()
+        while (any(worker.is_alive() for worker in workers)
+               and not self.stop.wait(1)):
+            if (not self.once and time.monotonic() - maintained
+                    > settings.JOBS_MAINTENANCE_INTERVAL):
+                self.maintain()
+                maintained = time.monotonic()
+        for worker in workers:
+            worker.join()
+        connection.close()
+
+    def maintain(self):
+        close_old_connections()
+        released = queue.release_stale()
+        purged = queue.purge()
+        if released or purged:
+            self.stdout.write(
+                f'Возвращено в очередь: {released}, удалено: {purged}.'
+            )
+
+    def work(self):
+        try:
+            while not self.stop.is_set():
+                close_old_connections()
+                try:
+                    job = queue.claim()
+                except DatabaseError as error:
+                    self.stderr.write(f'Ошибка при получении задачи: {error}')
+                    connection.close()
+                    self.stop.wait(settings.JOBS_POLL_INTERVAL)
+                    continue
+                if job is None:
+                    if self.once:
+                        return
+                    self.stop.wait(settings.JOBS_POLL_INTERVAL)
+                    continue
+                started = time.monotonic()
+                status = queue.run(job)
+                self.stdout.write(
+                    f'{job}: {status}, попытка {job.attempts}, '
+                    f'{time.monotonic() - started:.2f} с.'
+                )
+        finally:
+            connection.close()
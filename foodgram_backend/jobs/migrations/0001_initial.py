@@ -0,0 +1,50 @@
+# Generated by Django 3.2.13 on 2026-10-19 09:14
+
+from django.db import migrations, models
+import django.utils.timezone
+import jobs.models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Имя зарегистрированного обработчика', max_length=200, verbose_name='Задача')),
+                ('payload', models.JSONField(blank=True, default=dict, help_text='Именованные аргументы обработчика', verbose_name='Аргументы')),
+                ('key', models.CharField(blank=True, help_text='Из ожидающих задач с одним ключом хранится одна', max_length=200, null=True, verbose_name='Ключ идемпотентности')),
+                ('status', models.CharField(choices=[('pending', 'Ожидает'), ('running', 'Выполняется'), ('done', 'Выполнена'), ('failed', 'Ошибка')], default='pending', help_text='Статус', max_length=10, verbose_name='Статус')),
+                ('attempts', models.PositiveIntegerField(default=0, help_text='Сколько раз задача запускалась', verbose_name='Попытки')),
+                ('max_attempts', models.PositiveIntegerField(default=jobs.models.default_max_attempts, help_text='Максимум попыток', verbose_name='Максимум попыток')),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Запуск не раньше', verbose_name='Запуск не раньше')),
+                ('locked_at', models.DateTimeField(blank=True, help_text='Взята в работу', null=True, verbose_name='Взята в работу')),
+                ('last_error', models.TextField(blank=True, help_text='Последняя ошибка', verbose_name='Последняя ошибка')),
+                ('created', models.DateTimeField(auto_now_add=True, help_text='Дата создания', verbose_name='Дата создания')),
+                ('finished', models.DateTimeField(blank=True, help_text='Дата завершения', null=True, verbose_name='Дата завершения')),
+            ],
+            options={
+                'verbose_name': 'Фоновая задача',
+                'verbose_name_plural': 'Фоновые задачи',
+                'ordering': ('-id',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['run_at'], name='job_pending_run_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('status', 'running')), fields=['locked_at'], name='job_running_locked_at_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='job',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'pending')), fields=('key',), name='unique_pending_job_key'),
+        ),
+    ]
@@ -0,0 +1,110 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+def default_max_attempts():
+    return settings.JOBS_MAX_ATTEMPTS
+
+
+class Job(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'Ожидает'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField(
+        verbose_name='Задача',
+        max_length=200,
+        help_text='Имя зарегистрированного обработчика',
+    )
+    payload = models.JSONField(
+        verbose_name='Аргументы',
+        default=dict,
+        blank=True,
+        help_text='Именованные аргументы обработчика',
+    )
+    key = models.CharField(
+        verbose_name='Ключ идемпотентности',
+        max_length=200,
+        null=True,
+        blank=True,
+        help_text='Из ожидающих задач с одним ключом хранится одна',
+    )
+    status = models.CharField(
+        verbose_name='Статус',
+        max_length=10,
+        choices=STATUSES,
+        default=PENDING,
+        help_text='Статус',
+    )
+    attempts = models.PositiveIntegerField(
+        verbose_name='Попытки',
+        default=0,
+        help_text='Сколько раз задача запускалась',
+    )
+    max_attempts = models.PositiveIntegerField(
+        verbose_name='Максимум попыток',
+        default=default_max_attempts,
+        help_text='Максимум попыток',
+    )
+    run_at = models.DateTimeField(
+        verbose_name='Запуск не раньше',
+        default=timezone.now,
+        help_text='Запуск не раньше',
+    )
+    locked_at = models.DateTimeField(
+        verbose_name='Взята в работу',
+        null=True,
+        blank=True,
+        help_text='Взята в работу',
+    )
+    last_error = models.TextField(
+        verbose_name='Последняя ошибка',
+        blank=True,
+        help_text='Последняя ошибка',
+    )
+    created = models.DateTimeField(
+        verbose_name='Дата создания',
+        auto_now_add=True,
+        help_text='Дата создания',
+    )
+    finished = models.DateTimeField(
+        verbose_name='Дата завершения',
+        null=True,
+        blank=True,
+        help_text='Дата завершения',
+    )
+
+    class Meta:
+        ordering = ('-id',)
+        verbose_name = 'Фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('key',),
+                condition=models.Q(status='pending'),
+                name='unique_pending_job_key',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=('run_at',),
+                condition=models.Q(status='pending'),
+                name='job_pending_run_at_idx',
+            ),
+            models.Index(
+                fields=('locked_at',),
+                condition=models.Q(status='running'),
+                name='job_running_locked_at_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.name} #{self.id}'
@@ -0,0 +1,139 @@
+'''
+Очередь фоновых задач в таблице базы данных.
+
+enqueue() записывает задачу в текущей транзакции: если транзакция
+откатится, задача пропадёт вместе с данными, а воркеры не увидят её
+раньше коммита. Воркеры run_workers забирают задачи запросом
+SELECT ... FOR UPDATE SKIP LOCKED, поэтому несколько потоков и процессов
+не мешают друг другу. Взятая задача помечается выполняемой и
+выполняется вне транзакции; если воркер не завершил её за
+JOBS_LOCK_TIMEOUT секунд, задача считается упавшей.
+
+Упавшая задача повторяется через JOBS_RETRY_DELAY секунд, задержка
+удваивается с каждой попыткой. Ключ идемпотентности уникален среди
+ожидающих задач: повторная постановка с тем же ключом ничего не делает,
+пока задача не взята в работу.
+'''
+
+import random
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import Job
+
+registry = {}
+
+
+def task(name):
+    '''Зарегистрировать обработчик задачи под именем name.'''
+    def decorator(func):
+        registry[name] = func
+        return func
+    return decorator
+
+
+def enqueue(name, payload=None, key=None, delay=0):
+    Job.objects.bulk_create(
+        [Job(
+            name=name,
+            payload=payload or {},
+            key=key,
+            run_at=timezone.now() + timedelta(seconds=delay),
+        )],
+        ignore_conflicts=True,
+    )
+
+
+def claim():
+    '''Взять в работу ближайшую готовую задачу или вернуть None.'''
+    now = timezone.now()
+    with transaction.atomic():
+        job = Job.objects.select_for_update(skip_locked=True).filter(
+            status=Job.PENDING, run_at__lte=now
+        ).order_by('run_at').first()
+        if job is None:
+            return None
+        job.status = Job.RUNNING
+        job.attempts += 1
+        job.locked_at = now
+        job.save(update_fields=('status', 'attempts', 'locked_at'))
+    return job
+
+
+def retry_delay(attempts):
+    delay = min(
+        settings.JOBS_RETRY_DELAY * 2 ** (attempts - 1),
+        settings.JOBS_RETRY_MAX_DELAY,
+    )
+    return delay * random.uniform(1, 1.25)
+
+
+def lease(job):
+    '''
+    Задача, пока она за этим воркером: если её уже вернули в очередь по
+    таймауту, запоздалый результат не должен её перезаписать.
+    '''
+    return Job.objects.filter(
+        pk=job.pk, status=Job.RUNNING, attempts=job.attempts
+    )
+
+
+def fail(job, error):
+    '''Вернуть задачу в очередь с задержкой или отметить ошибкой.'''
+    now = timezone.now()
+    fields = {'locked_at': None, 'last_error': error}
+    if job.attempts < job.max_attempts:
+        try:
+            with transaction.atomic():
+                lease(job).update(
+                    status=Job.PENDING,
+                    run_at=now + timedelta(
+                        seconds=retry_delay(job.attempts)
+                    ),
+                    **fields,
+                )
+            return Job.PENDING
+        except IntegrityError:
+            #  Пока задача выполнялась, с тем же ключом поставили новую,
+            #  она и выполнит работу.
+            pass
+    lease(job).update(status=Job.FAILED, finished=now, **fields)
+    return Job.FAILED
+
+
+def run(job):
+    '''Выполнить взятую задачу и вернуть её новый статус.'''
+    try:
+        handler = registry[job.name]
+    except KeyError:
+        return fail(job, f'Неизвестная задача {job.name}.')
+    try:
+        handler(**job.payload)
+    except Exception:
+        return fail(job, traceback.format_exc())
+    lease(job).update(
+        status=Job.DONE, finished=timezone.now(), locked_at=None
+    )
+    return Job.DONE
+
+
+def release_stale():
+    '''Вернуть в очередь задачи воркеров, которые не ответили вовремя.'''
+    cutoff = timezone.now() - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT)
+    stale = Job.objects.filter(status=Job.RUNNING, locked_at__lt=cutoff)
+    for job in stale:
+        fail(job, 'Воркер не завершил задачу за JOBS_LOCK_TIMEOUT секунд.')
+    return len(stale)
+
+
+def purge():
+    '''Удалить выполненные задачи старше JOBS_KEEP_DAYS дней.'''
+    cutoff = timezone.now() - timedelta(days=settings.JOBS_KEEP_DAYS)
+    deleted, _ = Job.objects.filter(
+        status=Job.DONE, finished__lt=cutoff
+    ).delete()
+    return deleted
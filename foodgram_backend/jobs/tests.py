@@ -0,0 +1,66 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from . import queue
+from .models import Job
+
+calls = []
+
+
+@queue.task('tests.record')
+def record(value, fail_times=0):
+    calls.append(value)
+    if calls.count(value) <= fail_times:
+        raise RuntimeError(value)
+
+
+@override_settings(JOBS_RETRY_DELAY=10, JOBS_MAX_ATTEMPTS=2)
+class JobQueueTest(TestCase):
+    '''Постановка, выполнение и повторы фоновых задач.'''
+
+    def setUp(self):
+        calls.clear()
+
+    def run_ready(self):
+        Job.objects.filter(status=Job.PENDING).update(run_at=timezone.now())
+        job = queue.claim()
+        return queue.run(job) if job else None
+
+    def test_key_collapses_pending_jobs(self):
+        for _ in range(3):
+            queue.enqueue('tests.record', {'value': 'a'}, key='a')
+        self.assertEqual(Job.objects.count(), 1)
+        queue.claim()
+        queue.enqueue('tests.record', {'value': 'a'}, key='a')
+        self.assertEqual(Job.objects.count(), 2)
+
+    def test_delay(self):
+        queue.enqueue('tests.record', {'value': 'a'}, delay=60)
+        self.assertIsNone(queue.claim())
+
+    def test_retry_with_backoff(self):
+        queue.enqueue('tests.record', {'value': 'a', 'fail_times': 1})
+        self.assertEqual(queue.run(queue.claim()), Job.PENDING)
+        job = Job.objects.get()
+        self.assertGreaterEqual(
+            job.run_at - timezone.now(), timedelta(seconds=9)
+        )
+        self.assertIn('RuntimeError', job.last_error)
+        self.assertEqual(self.run_ready(), Job.DONE)
+        self.assertEqual(calls, ['a', 'a'])
+
+    def test_gives_up_after_max_attempts(self):
+        queue.enqueue('tests.record', {'value': 'a', 'fail_times': 5})
+        self.assertEqual(self.run_ready(), Job.PENDING)
+        self.assertEqual(self.run_ready(), Job.FAILED)
+        self.assertIsNone(self.run_ready())
+
+    def test_stale_job_released(self):
+        queue.enqueue('tests.record', {'value': 'a'})
+        job = queue.claim()
+        Job.objects.update(locked_at=timezone.now() - timedelta(days=1))
+        self.assertEqual(queue.release_stale(), 1)
+        queue.run(job)
+        self.assertEqual(Job.objects.get().status, Job.PENDING)
@@ -1,36 +1,73 @@
 from django.contrib import admin
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 
+from api.pagination import EstimatedCountPaginator
+from . import shopping
 from .models import (FavoriteRecipe, Follow, Ingredient, Recipe,
                      RecipeIngredient, ShoppingCart, Tag)
 
 
+class LargeTableAdmin(admin.ModelAdmin):
+    '''Админка таблиц, в которых точный COUNT(*) слишком дорог.'''
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
 class RecipeIngredientInline(admin.TabularInline):
     model = RecipeIngredient
     extra = 0
     min_num = 1
+    autocomplete_fields = ('ingredient',)
 
 
 @admin.register(Ingredient)
 class IngredientAdmin(admin.ModelAdmin):
     list_display = ('id', 'name', 'measurement_unit',)
-    list_filter = ('name',)
     search_fields = ('name',)
 
 
 @admin.register(Recipe)
-class RecipeAdmin(admin.ModelAdmin):
+class RecipeAdmin(LargeTableAdmin):
     inlines = (RecipeIngredientInline,)
     list_display = ('id', 'name', 'author', 'pub_date', 'get_favorite_count',)
-    list_filter = ('author__username', 'name', 'tags',)
-    search_fields = ('author__username', 'name', 'tags__name',)
+    list_filter = ('tags',)
+    list_select_related = ('author',)
+    search_fields = ('author__username', 'name',)
+    autocomplete_fields = ('author',)
     filter_horizontal = ('tags',)
     empty_value_display = '-пустые поля-'
 
+    def get_queryset(self, request):
+        favorites = FavoriteRecipe.objects.filter(
+            recipe=OuterRef('pk')
+        ).order_by().values('recipe').annotate(
+            count=Count('id')
+        ).values('count')
+        return super().get_queryset(request).annotate(
+            favorite_count=Coalesce(
+                Subquery(favorites, output_field=IntegerField()), 0
+            )
+        )
+
     def get_favorite_count(self, obj):
-        return obj.favorite.count()
+        return obj.favorite_count
 
     get_favorite_count.short_description = 'Добавлений в избранное'
 
+    def save_related(self, request, form, formsets, change):
+        with shopping.batch():
+            super().save_related(request, form, formsets, change)
+
+    def delete_model(self, request, obj):
+        with shopping.batch():
+            super().delete_model(request, obj)
+
+    def delete_queryset(self, request, queryset):
+        with shopping.batch():
+            super().delete_queryset(request, queryset)
+
 
 @admin.register(Tag)
 class TagAdmin(admin.ModelAdmin):
@@ -39,10 +76,11 @@ class TagAdmin(admin.ModelAdmin):
 
 
 @admin.register(Follow)
-class FollowAdmin(admin.ModelAdmin):
+class FollowAdmin(LargeTableAdmin):
     list_display = ('id', 'get_follow',)
-    list_filter = ('author',)
+    list_select_related = ('user', 'author',)
     search_fields = ('author__username', 'user__username',)
+    autocomplete_fields = ('user', 'author',)
 
     def get_follow(self, obj):
         return (f'Пользователь {str(obj.user).capitalize()} '
@@ -52,9 +90,11 @@ class FollowAdmin(admin.ModelAdmin):
 
 
 @admin.register(FavoriteRecipe)
-class FavoriteAdmin(admin.ModelAdmin):
+class FavoriteAdmin(LargeTableAdmin):
     list_display = ('id', 'get_favorite',)
+    list_select_related = ('user', 'recipe',)
     search_fields = ('recipe__name', 'user__username',)
+    autocomplete_fields = ('user', 'recipe',)
 
     def get_favorite(self, obj):
         return f'"{obj.recipe}" добавлен пользователем {obj.user}.'
@@ -63,10 +103,11 @@ class FavoriteAdmin(admin.ModelAdmin):
 
 
 @admin.register(ShoppingCart)
-class ShoppingAdmin(admin.ModelAdmin):
+class ShoppingAdmin(LargeTableAdmin):
     list_display = ('id', 'get_shopping',)
-    list_filter = ('recipe',)
-    search_fields = ('recipe__name',)
+    list_select_related = ('user', 'recipe',)
+    search_fields = ('recipe__name', 'user__username',)
+    autocomplete_fields = ('user', 'recipe',)
 
     def get_shopping(self, obj):
         return (f'"{obj.recipe}" добавлен в покупки '
@@ -0,0 +1,75 @@
+'''
+Management-команда на расчёт похожих рецептов.
+
+Строит разреженную матрицу рецептов по ингредиентам и тегам и сохраняет
+для каждого рецепта самые похожие в таблицу SimilarRecipe. С --queued
+пересчитывает только рецепты из очереди SimilarRecipeQueue, куда они
+попадают при создании и изменении. Полный пересчёт стоит запускать
+периодически, например раз в сутки.
+'''
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from recipes.similarity import (SimilarityIndex, requeue, save_neighbours,
+                                take_queued, update_recipes)
+
+
+class Command(BaseCommand):
+    help = 'Расчёт похожих рецептов по ингредиентам и тегам.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--queued', action='store_true',
+            help='Пересчитать только рецепты из очереди.'
+        )
+        parser.add_argument(
+            '--count', type=int, default=settings.SIMILAR_RECIPES_COUNT,
+            help='Сколько похожих рецептов хранить для каждого.'
+        )
+        parser.add_argument(
+            '--min-score', type=float,
+            default=settings.SIMILAR_RECIPES_MIN_SCORE,
+            help='Минимальное косинусное сходство.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=256,
+            help='Количество рецептов в одном блоке умножения матриц.'
+        )
+
+    def handle(self, *args, **options):
+        if not options['queued']:
+            self.build(None, options)
+            return
+        recipe_ids = take_queued()
+        if not recipe_ids:
+            self.stdout.write('Очередь пуста.')
+            return
+        try:
+            self.build(recipe_ids, options)
+        except BaseException:
+            requeue(recipe_ids)
+            raise
+
+    def build(self, recipe_ids, options):
+        started = time.monotonic()
+        index = SimilarityIndex()
+        self.stdout.write(
+            f'Матрица {index.matrix.shape[0]} x {index.matrix.shape[1]}, '
+            f'{index.matrix.nnz} элементов, '
+            f'{time.monotonic() - started:.1f} с.'
+        )
+        arguments = (options['count'], options['min_score'],
+                     options['chunk_size'])
+        if recipe_ids is not None:
+            updated = update_recipes(index, recipe_ids, *arguments)
+        else:
+            updated = save_neighbours(
+                index, range(index.matrix.shape[0]), *arguments
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Похожие рецепты пересчитаны для {updated} рецептов '
+            f'за {time.monotonic() - started:.1f} с.'
+        ))
@@ -0,0 +1,124 @@
+'''
+Management-команда на выгрузку рецептов в NDJSON файл.
+
+Каждая строка файла - отдельный рецепт с автором, тегами
+и ингредиентами. Рецепты читаются из базы потоково, пачками по
+--chunk-size, ингредиенты и теги догружаются одним запросом на пачку.
+'''
+
+import base64
+import json
+import os
+from itertools import islice
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from recipes.models import Recipe, RecipeIngredient
+
+RECIPE_FIELDS = (
+    'id', 'name', 'text', 'cooking_time', 'pub_date', 'image',
+    'author__email', 'author__username', 'author__first_name',
+    'author__last_name',
+)
+
+
+def shard_paths(path, shards):
+    '''Имена файлов для выгрузки, разбитой на несколько частей.'''
+    if shards == 1:
+        return [path]
+    root, ext = os.path.splitext(path)
+    return [f'{root}.{number}{ext or ".ndjson"}' for number in range(shards)]
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class Command(BaseCommand):
+    help = 'Выгрузка рецептов в файл NDJSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Путь к файлу выгрузки.')
+        parser.add_argument(
+            '--chunk-size', type=int, default=2000,
+            help='Количество рецептов, читаемых из базы за один запрос.'
+        )
+        parser.add_argument(
+            '--shards', type=int, default=1,
+            help='Разбить выгрузку на указанное количество файлов.'
+        )
+        parser.add_argument(
+            '--with-images', action='store_true',
+            help='Встраивать содержимое изображений в base64.'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        paths = shard_paths(options['path'], options['shards'])
+        files = [open(path, 'w', encoding='utf-8') for path in paths]
+        recipes = Recipe.objects.order_by('id').values_list(
+            *RECIPE_FIELDS
+        ).iterator(chunk_size=chunk_size)
+        exported = 0
+        try:
+            for chunk in chunked(recipes, chunk_size):
+                ingredients, tags = self.get_related(
+                    [row[0] for row in chunk]
+                )
+                for row in chunk:
+                    line = self.dump_recipe(
+                        row, ingredients, tags, options['with_images']
+                    )
+                    files[row[0] % len(files)].write(line + '\n')
+                exported += len(chunk)
+        finally:
+            for file in files:
+                file.close()
+        self.stdout.write(f'Выгружено рецептов: {exported}.')
+
+    def get_related(self, recipe_ids):
+        ingredients = {}
+        for recipe_id, name, unit, amount in RecipeIngredient.objects.filter(
+            recipe_id__in=recipe_ids
+        ).order_by().values_list(
+            'recipe_id', 'ingredient__name',
+            'ingredient__measurement_unit', 'amount'
+        ):
+            ingredients.setdefault(recipe_id, []).append([name, unit, amount])
+        tags = {}
+        for recipe_id, slug in Recipe.tags.through.objects.filter(
+            recipe_id__in=recipe_ids
+        ).values_list('recipe_id', 'tag__slug'):
+            tags.setdefault(recipe_id, []).append(slug)
+        return ingredients, tags
+
+    def dump_recipe(self, row, ingredients, tags, with_images):
+        (recipe_id, name, text, cooking_time, pub_date, image,
+         email, username, first_name, last_name) = row
+        recipe = {
+            'name': name,
+            'text': text,
+            'cooking_time': cooking_time,
+            'pub_date': pub_date.isoformat(),
+            'image': image,
+            'author': {
+                'email': email,
+                'username': username,
+                'first_name': first_name,
+                'last_name': last_name,
+            },
+            'tags': tags.get(recipe_id, []),
+            'ingredients': ingredients.get(recipe_id, []),
+        }
+        if with_images and image and default_storage.exists(image):
+            with default_storage.open(image, 'rb') as file:
+                recipe['image_data'] = base64.b64encode(
+                    file.read()
+                ).decode('ascii')
+        return json.dumps(recipe, ensure_ascii=False)
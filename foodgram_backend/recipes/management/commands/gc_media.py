@@ -0,0 +1,119 @@
+'''
+Management-команда на удаление осиротевших изображений рецептов.
+
+Файлы не удаляются вместе с рецептом, при замене изображения и при
+каскадном удалении автора. Команда обходит каталог изображений через
+os.scandir, не собирая список файлов целиком, и пачками по --chunk-size
+проверяет, какие пути ещё указаны в Recipe.image. Файлы без ссылок,
+не менявшиеся дольше --min-age часов, удаляются в --workers потоков.
+Порог возраста защищает изображения, которые уже сохранены запросом,
+но транзакция с рецептом ещё не закоммичена.
+'''
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from recipes.models import Recipe
+from .export_recipes import chunked
+
+
+def scan(path):
+    '''Файлы каталога path и всех вложенных каталогов.'''
+    directories = [path]
+    while directories:
+        try:
+            with os.scandir(directories.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        directories.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        yield entry
+        except FileNotFoundError:
+            continue
+
+
+def remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+class Command(BaseCommand):
+    help = 'Удаление изображений рецептов, на которые нет ссылок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только посчитать осиротевшие файлы, ничего не удаляя.'
+        )
+        parser.add_argument(
+            '--min-age', type=float, default=24,
+            help='Не трогать файлы, изменённые меньше стольких часов назад.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Сколько файлов проверять в базе одним запросом.'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Количество потоков удаления.'
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        root = settings.MEDIA_ROOT
+        cutoff = time.time() - options['min_age'] * 3600
+        dry_run = options['dry_run']
+        files = referenced = recent = orphans = removed = reclaimed = 0
+        entries = scan(os.path.join(root, Recipe.image.field.upload_to))
+        with ThreadPoolExecutor(options['workers']) as executor:
+            for chunk in chunked(entries, options['chunk_size']):
+                names = {
+                    os.path.relpath(entry.path, root).replace(os.sep, '/'):
+                    entry
+                    for entry in chunk
+                }
+                used = set(Recipe.objects.filter(
+                    image__in=list(names)
+                ).values_list('image', flat=True))
+                files += len(names)
+                referenced += len(used)
+                candidates = []
+                for name, entry in names.items():
+                    if name in used:
+                        continue
+                    stat = entry.stat(follow_symlinks=False)
+                    if stat.st_mtime > cutoff:
+                        recent += 1
+                        continue
+                    candidates.append((entry.path, stat.st_size))
+                    if options['verbosity'] > 1:
+                        self.stdout.write(name)
+                orphans += len(candidates)
+                if dry_run:
+                    reclaimed += sum(size for _, size in candidates)
+                    continue
+                results = executor.map(
+                    remove, [path for path, _ in candidates]
+                )
+                for (_, size), deleted in zip(candidates, results):
+                    removed += deleted
+                    reclaimed += size if deleted else 0
+        self.stdout.write(
+            f'Файлов: {files}, используется: {referenced}, '
+            f'моложе порога: {recent}, без ссылок: {orphans}.'
+        )
+        if dry_run:
+            result = 'Можно освободить'
+        else:
+            result = f'Удалено файлов: {removed}, освобождено'
+        self.stdout.write(self.style.SUCCESS(
+            f'{result}: {reclaimed / 1024 / 1024:.1f} МБ '
+            f'за {time.monotonic() - started:.1f} с.'
+        ))
@@ -0,0 +1,209 @@
+'''
+Management-команда на генерацию синтетических данных.
+
+Создаёт пользователей, рецепты из реального каталога ингредиентов,
+теги, подписки, избранное и списки покупок. Популярность авторов,
+рецептов и ингредиентов распределена по закону Ципфа, как в живой базе:
+немногие объекты собирают большую часть связей.
+'''
+
+import io
+import random
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max
+from PIL import Image
+
+from recipes import popularity, shopping
+from recipes.models import (FavoriteRecipe, Follow, Ingredient, Recipe,
+                            RecipeIngredient, ShoppingCart, Tag)
+from users.models import User
+
+FAKE_IMAGE = 'recipes/images/fake_recipe.png'
+FAKE_PASSWORD = 'fake-password'
+
+
+class ZipfChoice:
+    '''Выбор элементов с весами 1 / rank ** exponent.'''
+
+    def __init__(self, population, rng, exponent=1.1):
+        self.population = list(population)
+        self.rng = rng
+        self.cum_weights = list(accumulate(
+            1 / rank ** exponent
+            for rank in range(1, len(self.population) + 1)
+        ))
+
+    def one(self):
+        return self.rng.choices(
+            self.population, cum_weights=self.cum_weights
+        )[0]
+
+    def distinct(self, count):
+        count = min(count, len(self.population))
+        chosen = set()
+        while len(chosen) < count:
+            chosen.update(self.rng.choices(
+                self.population, cum_weights=self.cum_weights,
+                k=count - len(chosen)
+            ))
+        return chosen
+
+
+class Command(BaseCommand):
+    help = 'Генерация синтетических данных для нагрузочных проверок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--recipes', type=int, default=1000)
+        parser.add_argument(
+            '--tags', type=int, default=0,
+            help='Количество дополнительных тегов.'
+        )
+        parser.add_argument('--follows', type=int, default=2000)
+        parser.add_argument('--favorites', type=int, default=5000)
+        parser.add_argument('--carts', type=int, default=1000)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        ingredients = list(
+            Ingredient.objects.order_by('id').values_list('id', flat=True)
+        )
+        if not ingredients:
+            raise CommandError(
+                'Каталог ингредиентов пуст, выполните load_ingredients.'
+            )
+        self.rng.shuffle(ingredients)
+        self.ingredients = ZipfChoice(ingredients, self.rng)
+        self.create_tags(options['tags'])
+        tags = list(Tag.objects.values_list('id', flat=True))
+        self.rng.shuffle(tags)
+        self.tags = ZipfChoice(tags, self.rng)
+        self.create_users(options['users'])
+        users = list(User.objects.values_list('id', flat=True))
+        if not users:
+            raise CommandError('Нет пользователей для создания рецептов.')
+        self.rng.shuffle(users)
+        self.create_recipes(options['recipes'], ZipfChoice(users, self.rng))
+        recipes = list(Recipe.objects.values_list('id', flat=True))
+        self.rng.shuffle(recipes)
+        recipes = ZipfChoice(recipes, self.rng)
+        self.create_pairs(
+            Follow, 'author_id', options['follows'],
+            users, ZipfChoice(users, self.rng)
+        )
+        self.create_pairs(
+            FavoriteRecipe, 'recipe_id', options['favorites'], users, recipes
+        )
+        self.create_pairs(
+            ShoppingCart, 'recipe_id', options['carts'], users, recipes
+        )
+        #  bulk_create не вызывает сигналы, поддерживающие итоги покупок
+        #  и популярность рецептов.
+        shopping.rebuild()
+        popularity.recompute()
+        popularity.materialize_tags(settings.POPULARITY_TOP_COUNT)
+        self.stdout.write(
+            f'Создано пользователей: {options["users"]}, '
+            f'рецептов: {options["recipes"]}, тегов: {options["tags"]}.'
+        )
+
+    def next_id(self, model):
+        return (model.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+
+    def create_tags(self, count):
+        start = self.next_id(Tag)
+        Tag.objects.bulk_create(
+            (Tag(
+                name=f'Тег {number}',
+                color=f'#{number % 0xffffff:06x}',
+                slug=f'fake-tag-{number}',
+            ) for number in range(start, start + count)),
+            batch_size=self.batch_size, ignore_conflicts=True
+        )
+
+    def create_users(self, count):
+        start = self.next_id(User)
+        password = make_password(FAKE_PASSWORD)
+        User.objects.bulk_create(
+            (User(
+                email=f'fake{number}@foodgram.fake',
+                username=f'fake{number}',
+                first_name=f'Имя{number}',
+                last_name=f'Фамилия{number}',
+                password=password,
+            ) for number in range(start, start + count)),
+            batch_size=self.batch_size, ignore_conflicts=True
+        )
+
+    def get_image(self):
+        if not default_storage.exists(FAKE_IMAGE):
+            buffer = io.BytesIO()
+            Image.new('RGB', (64, 64), (180, 154, 223)).save(buffer, 'PNG')
+            default_storage.save(FAKE_IMAGE, ContentFile(buffer.getvalue()))
+        return FAKE_IMAGE
+
+    def create_recipes(self, count, authors):
+        image = self.get_image()
+        created = 0
+        while created < count:
+            size = min(self.batch_size, count - created)
+            start = self.next_id(Recipe)
+            Recipe.objects.bulk_create(Recipe(
+                author_id=authors.one(),
+                name=f'Рецепт {start + number}',
+                text='Синтетический рецепт для нагрузочных проверок.',
+                cooking_time=self.rng.randint(5, 180),
+                image=image,
+            ) for number in range(size))
+            recipe_ids = Recipe.objects.filter(
+                id__gte=start
+            ).values_list('id', flat=True)
+            ingredients = []
+            tags = []
+            for recipe_id in recipe_ids:
+                ingredients.extend(
+                    RecipeIngredient(
+                        recipe_id=recipe_id,
+                        ingredient_id=ingredient_id,
+                        amount=self.rng.randint(1, 500),
+                    ) for ingredient_id in self.ingredients.distinct(
+                        self.rng.randint(3, 12)
+                    )
+                )
+                tags.extend(
+                    Recipe.tags.through(recipe_id=recipe_id, tag_id=tag_id)
+                    for tag_id in self.tags.distinct(self.rng.randint(1, 3))
+                )
+            RecipeIngredient.objects.bulk_create(
+                ingredients, batch_size=self.batch_size
+            )
+            Recipe.tags.through.objects.bulk_create(
+                tags, batch_size=self.batch_size
+            )
+            created += size
+
+    def create_pairs(self, model, target_field, count, users, targets):
+        '''Связи пользователь - цель, где цели выбираются неравномерно.'''
+        pairs = set()
+        attempts = 0
+        while len(pairs) < count and attempts < count * 10:
+            attempts += 1
+            user_id = self.rng.choice(users)
+            target_id = targets.one()
+            if model is Follow and user_id == target_id:
+                continue
+            pairs.add((user_id, target_id))
+        model.objects.bulk_create(
+            (model(user_id=user_id, **{target_field: target_id})
+             for user_id, target_id in pairs),
+            batch_size=self.batch_size, ignore_conflicts=True
+        )
@@ -0,0 +1,204 @@
+'''
+Management-команда на загрузку рецептов из NDJSON файлов.
+
+Ингредиенты, теги и авторы сопоставляются через словари в памяти,
+рецепты и связанные с ними строки вставляются пачками. Файлы-части
+выгрузки можно обрабатывать параллельно в нескольких процессах.
+'''
+
+import base64
+import json
+from multiprocessing import Pool
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import connection, connections, transaction
+from django.utils.dateparse import parse_datetime
+
+from recipes import popularity, shopping
+from recipes.models import Ingredient, Recipe, RecipeIngredient, Tag
+from users.models import User
+
+
+class RecipeImporter:
+    '''Пакетная загрузка рецептов из одного файла.'''
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.ingredients = {
+            (name, unit): pk for pk, name, unit in
+            Ingredient.objects.values_list('id', 'name', 'measurement_unit')
+        }
+        self.tags = dict(Tag.objects.values_list('slug', 'id'))
+        self.authors = {}
+        self.imported = 0
+        self.skipped = 0
+        self.warnings = {}
+
+    def run(self, path):
+        batch = []
+        with open(path, 'r', encoding='utf-8') as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                batch.append(json.loads(line))
+                if len(batch) >= self.batch_size:
+                    self.import_batch(batch)
+                    batch = []
+        if batch:
+            self.import_batch(batch)
+        return self.imported, self.skipped, list(self.warnings)
+
+    def warn(self, message):
+        self.warnings[message] = None
+
+    def resolve_authors(self, batch):
+        authors = {
+            recipe['author']['email']: recipe['author'] for recipe in batch
+            if recipe['author']['email'] not in self.authors
+        }
+        if not authors:
+            return
+        self.authors.update(User.objects.filter(
+            email__in=authors
+        ).values_list('email', 'id'))
+        missing = []
+        for email, data in authors.items():
+            if email in self.authors:
+                continue
+            user = User(**data, is_active=False)
+            user.set_unusable_password()
+            missing.append(user)
+        if missing:
+            User.objects.bulk_create(missing, ignore_conflicts=True)
+            self.authors.update(User.objects.filter(
+                email__in=[user.email for user in missing]
+            ).values_list('email', 'id'))
+
+    def build_recipe(self, data):
+        author_id = self.authors.get(data['author']['email'])
+        if author_id is None:
+            self.warn(
+                f'Автор {data["author"]["email"]} не найден, '
+                f'рецепт "{data["name"]}" пропущен.'
+            )
+            return None
+        image = data['image']
+        if data.get('image_data'):
+            image = default_storage.save(
+                image, ContentFile(base64.b64decode(data['image_data']))
+            )
+        return Recipe(
+            author_id=author_id,
+            name=data['name'],
+            text=data['text'],
+            cooking_time=data['cooking_time'],
+            image=image,
+        )
+
+    def save_recipes(self, recipes):
+        if connection.features.can_return_rows_from_bulk_insert:
+            Recipe.objects.bulk_create(recipes)
+            return
+        for recipe in recipes:
+            recipe.save()
+
+    @transaction.atomic
+    def import_batch(self, batch):
+        self.resolve_authors(batch)
+        recipes = []
+        rows = []
+        for data in batch:
+            recipe = self.build_recipe(data)
+            if recipe is None:
+                self.skipped += 1
+                continue
+            recipes.append(recipe)
+            rows.append(data)
+        self.save_recipes(recipes)
+        ingredients = []
+        tags = []
+        for recipe, data in zip(recipes, rows):
+            recipe.pub_date = parse_datetime(data['pub_date'])
+            for name, unit, amount in data['ingredients']:
+                ingredient_id = self.ingredients.get((name, unit))
+                if ingredient_id is None:
+                    self.warn(
+                        f'Ингредиент "{name}, {unit}" отсутствует '
+                        f'в базе и пропущен.'
+                    )
+                    continue
+                ingredients.append(RecipeIngredient(
+                    recipe_id=recipe.id,
+                    ingredient_id=ingredient_id,
+                    amount=amount,
+                ))
+            for slug in data['tags']:
+                if slug not in self.tags:
+                    self.warn(
+                        f'Тег "{slug}" отсутствует в базе и пропущен.'
+                    )
+                    continue
+                tags.append(Recipe.tags.through(
+                    recipe_id=recipe.id, tag_id=self.tags[slug]
+                ))
+        Recipe.objects.bulk_update(
+            recipes, ('pub_date',), batch_size=self.batch_size
+        )
+        RecipeIngredient.objects.bulk_create(
+            ingredients, batch_size=self.batch_size
+        )
+        Recipe.tags.through.objects.bulk_create(
+            tags, batch_size=self.batch_size
+        )
+        self.imported += len(recipes)
+
+
+def import_file(args):
+    path, batch_size = args
+    connections.close_all()
+    return RecipeImporter(batch_size).run(path)
+
+
+class Command(BaseCommand):
+    help = 'Загрузка рецептов в базу из файлов NDJSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths', nargs='+', help='Файлы выгрузки или её части.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Количество рецептов, вставляемых за одну транзакцию.'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Количество процессов для параллельной загрузки частей.'
+        )
+
+    def handle(self, *args, **options):
+        tasks = [(path, options['batch_size']) for path in options['paths']]
+        workers = min(options['workers'], len(tasks))
+        if workers > 1:
+            connections.close_all()
+            with Pool(workers) as pool:
+                results = pool.map(import_file, tasks)
+        else:
+            results = [RecipeImporter(batch_size).run(path)
+                       for path, batch_size in tasks]
+        imported = skipped = 0
+        for file_imported, file_skipped, warnings in results:
+            imported += file_imported
+            skipped += file_skipped
+            for warning in warnings:
+                self.stderr.write(warning)
+        #  bulk_create не вызывает сигналы, поддерживающие итоги покупок
+        #  и популярность рецептов.
+        shopping.rebuild()
+        popularity.recompute()
+        popularity.materialize_tags(settings.POPULARITY_TOP_COUNT)
+        self.stdout.write(
+            f'Загружено рецептов: {imported}, пропущено: {skipped}.'
+        )
@@ -0,0 +1,26 @@
+'''
+Management-команда на пересчёт итогов списков покупок.
+
+Итоги обновляются по сигналам при каждом изменении списков и состава
+рецептов. Команда пересчитывает их с нуля, если данные менялись в
+обход сигналов, например через bulk_create, update() или прямые
+запросы.
+'''
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from recipes.shopping import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Пересчёт итогов списков покупок по ингредиентам.'
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        rows = rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Итоги списков покупок: {rows} записей, '
+            f'{time.monotonic() - started:.1f} с.'
+        ))
@@ -0,0 +1,44 @@
+'''
+Management-команда на пересчёт популярности рецептов.
+
+Заново суммирует веса всех добавлений в избранное и покупки, исправляя
+расхождения инкрементальных обновлений (например, после bulk_create без
+сигналов), и сохраняет первые POPULARITY_TOP_COUNT рецептов каждого
+тега в таблицу TagPopularRecipe. Запускается периодически, например раз
+в час; начальные значения заполняет миграция
+recipes.0010_recipe_popularity.
+'''
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from recipes.popularity import materialize_tags, recompute
+
+
+class Command(BaseCommand):
+    help = 'Пересчёт популярности рецептов и рейтингов по тегам.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top-count', type=int, default=settings.POPULARITY_TOP_COUNT,
+            help='Сколько рецептов хранить в рейтинге каждого тега.'
+        )
+        parser.add_argument(
+            '--tags-only', action='store_true',
+            help='Только обновить рейтинги тегов по текущей популярности.'
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        if not options['tags_only']:
+            recipes = recompute()
+            self.stdout.write(
+                f'Популярность пересчитана для {recipes} рецептов.'
+            )
+        entries = materialize_tags(options['top_count'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Рейтинги тегов: {entries} записей, '
+            f'{time.monotonic() - started:.1f} с.'
+        ))
@@ -0,0 +1,58 @@
+# Generated by Django 3.2.13 on 2026-10-19 08:44
+
+from django.db import migrations, models
+
+POSTGRESQL_INDEXES = (
+    (
+        'ingredient_name_upper_like_idx',
+        'CREATE INDEX IF NOT EXISTS ingredient_name_upper_like_idx '
+        'ON recipes_ingredient (UPPER(name::text) text_pattern_ops)',
+    ),
+    (
+        'recipe_tags_tag_recipe_idx',
+        'CREATE INDEX IF NOT EXISTS recipe_tags_tag_recipe_idx '
+        'ON recipes_recipe_tags (tag_id, recipe_id)',
+    ),
+)
+
+
+def create_postgresql_indexes(apps, schema_editor):
+    # Поиск ингредиентов по началу названия (istartswith) и выборка
+    # рецептов по тегу. Индексы по выражению и с классом операторов
+    # есть только в PostgreSQL.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for _, sql in POSTGRESQL_INDEXES:
+        schema_editor.execute(sql)
+
+
+def drop_postgresql_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _ in POSTGRESQL_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0006_alter_recipe_pub_date'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='recipeingredient',
+            options={'verbose_name': 'Количество ингредиента', 'verbose_name_plural': 'Количество ингредиентов'},
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['-pub_date'], name='recipe_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['author', '-pub_date'], name='recipe_author_pub_date_idx'),
+        ),
+        migrations.RunPython(
+            create_postgresql_indexes, drop_postgresql_indexes
+        ),
+    ]
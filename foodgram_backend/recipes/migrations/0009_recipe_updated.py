@@ -0,0 +1,18 @@
+# Generated by Django 3.2.13 on 2026-10-19 09:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0008_similar_recipes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='updated',
+            field=models.DateTimeField(auto_now=True, db_index=True, help_text='Дата изменения', verbose_name='Дата изменения'),
+        ),
+    ]
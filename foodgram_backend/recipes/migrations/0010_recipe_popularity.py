@@ -0,0 +1,100 @@
+# Generated by Django 3.2.13 on 2026-10-19 09:05
+
+from datetime import datetime
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_popularity(apps, schema_editor):
+    epoch = datetime.fromisoformat(settings.POPULARITY_EPOCH)
+    half_life = settings.POPULARITY_HALF_LIFE_DAYS * 24 * 3600
+    scores = {}
+    for name, key in (
+        ('FavoriteRecipe', 'favorite'), ('ShoppingCart', 'shopping_cart')
+    ):
+        weight = settings.POPULARITY_WEIGHTS[key]
+        events = apps.get_model('recipes', name).objects.order_by()
+        for recipe_id, created in events.values_list(
+            'recipe_id', 'created'
+        ).iterator(chunk_size=5000):
+            seconds = (created - epoch).total_seconds() if created else 0
+            scores[recipe_id] = (
+                scores.get(recipe_id, 0) + weight * 2 ** (seconds / half_life)
+            )
+    RecipePopularity = apps.get_model('recipes', 'RecipePopularity')
+    RecipePopularity.objects.bulk_create(
+        (
+            RecipePopularity(recipe_id=recipe_id, score=score)
+            for recipe_id, score in scores.items()
+        ),
+        batch_size=5000,
+    )
+    schema_editor.execute('''
+        INSERT INTO recipes_tagpopularrecipe (tag_id, recipe_id, rank)
+        SELECT tag_id, recipe_id, position
+        FROM (
+            SELECT rt.tag_id, rt.recipe_id, ROW_NUMBER() OVER (
+                PARTITION BY rt.tag_id
+                ORDER BY p.score DESC, rt.recipe_id DESC
+            ) AS position
+            FROM recipes_recipe_tags rt
+            JOIN recipes_recipepopularity p ON p.recipe_id = rt.recipe_id
+        ) ranked
+        WHERE position <= %s
+    ''', (settings.POPULARITY_TOP_COUNT,))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0009_recipe_updated'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipePopularity',
+            fields=[
+                ('recipe', models.OneToOneField(help_text='Рецепт', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='popularity', serialize=False, to='recipes.recipe', verbose_name='Рецепт')),
+                ('score', models.FloatField(default=0, help_text='Сумма весов добавлений с затуханием по времени', verbose_name='Популярность')),
+            ],
+            options={
+                'verbose_name': 'Популярность рецепта',
+                'verbose_name_plural': 'Популярность рецептов',
+            },
+        ),
+        migrations.AddField(
+            model_name='favoriterecipe',
+            name='created',
+            field=models.DateTimeField(auto_now_add=True, help_text='Дата добавления', null=True, verbose_name='Дата добавления'),
+        ),
+        migrations.AddField(
+            model_name='shoppingcart',
+            name='created',
+            field=models.DateTimeField(auto_now_add=True, help_text='Дата добавления', null=True, verbose_name='Дата добавления'),
+        ),
+        migrations.CreateModel(
+            name='TagPopularRecipe',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveIntegerField(help_text='Место рецепта в рейтинге тега', verbose_name='Место')),
+                ('recipe', models.ForeignKey(help_text='Рецепт', on_delete=django.db.models.deletion.CASCADE, related_name='+', to='recipes.recipe', verbose_name='Рецепт')),
+                ('tag', models.ForeignKey(help_text='Тег', on_delete=django.db.models.deletion.CASCADE, related_name='popular', to='recipes.tag', verbose_name='Тег')),
+            ],
+            options={
+                'verbose_name': 'Популярный рецепт тега',
+                'verbose_name_plural': 'Популярные рецепты тегов',
+                'ordering': ('tag', 'rank'),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='recipepopularity',
+            index=models.Index(fields=['-score'], name='recipe_popularity_score_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='tagpopularrecipe',
+            constraint=models.UniqueConstraint(fields=('tag', 'rank'), name='unique_tag_popular_rank'),
+        ),
+        migrations.RunPython(fill_popularity, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 3.2.13 on 2026-10-19 09:17
+
+from django.db import migrations, models
+import recipes.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0013_recipe_image_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='recipe',
+            name='image',
+            field=models.ImageField(help_text='Изображение рецепта', storage=recipes.storage.ContentAddressedStorage(), upload_to='recipes/images', verbose_name='Изображение рецепта'),
+        ),
+    ]
@@ -3,6 +3,7 @@ from django.db import models
 
 from foodgram_backend.settings import QUERY_SET_LENGTH
 from users.models import User
+from .storage import ContentAddressedStorage
 
 
 class Ingredient(models.Model):
@@ -71,6 +72,7 @@ class Recipe(models.Model):
     image = models.ImageField(
         verbose_name='Изображение рецепта',
         upload_to='recipes/images',
+        storage=ContentAddressedStorage(),
         help_text='Изображение рецепта',
     )
     text = models.TextField(
@@ -105,11 +107,35 @@ class Recipe(models.Model):
         auto_now_add=True,
         help_text='Дата публикации',
     )
+    updated = models.DateTimeField(
+        verbose_name='Дата изменения',
+        auto_now=True,
+        db_index=True,
+        help_text='Дата изменения',
+    )
 
     class Meta:
         ordering = ('-pub_date',)
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
+        indexes = [
+            models.Index(
+                fields=('-pub_date',),
+                name='recipe_pub_date_idx',
+            ),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='recipe_author_pub_date_idx',
+            ),
+            models.Index(
+                fields=('cooking_time',),
+                name='recipe_cooking_time_idx',
+            ),
+            models.Index(
+                fields=('image',),
+                name='recipe_image_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.name[:QUERY_SET_LENGTH]
@@ -142,7 +168,6 @@ class RecipeIngredient(models.Model):
     )
 
     class Meta:
-        ordering = ('recipe',)
         verbose_name = 'Количество ингредиента'
         verbose_name_plural = 'Количество ингредиентов'
         constraints = [
@@ -151,6 +176,12 @@ class RecipeIngredient(models.Model):
                 name='unique_ingredient',
             ),
         ]
+        indexes = [
+            models.Index(
+                fields=('ingredient', 'recipe'),
+                name='recipe_ingredient_lookup_idx',
+            ),
+        ]
 
     def __str__(self):
         return f'{self.ingredient} в {self.ingredient.measurement_unit}'
@@ -199,6 +230,12 @@ class FavoriteRecipe(models.Model):
         related_name='favorite',
         help_text='Избранный рецепт',
     )
+    created = models.DateTimeField(
+        verbose_name='Дата добавления',
+        auto_now_add=True,
+        null=True,
+        help_text='Дата добавления',
+    )
 
     class Meta:
         ordering = ('id',)
@@ -227,6 +264,12 @@ class ShoppingCart(models.Model):
         related_name='shopping',
         help_text='Рецепт для покупок',
     )
+    created = models.DateTimeField(
+        verbose_name='Дата добавления',
+        auto_now_add=True,
+        null=True,
+        help_text='Дата добавления',
+    )
 
     class Meta:
         ordering = ('id',)
@@ -238,3 +281,150 @@ class ShoppingCart(models.Model):
                 name='unique_shoppingcart',
             ),
         ]
+
+
+class ShoppingCartTotal(models.Model):
+    user = models.ForeignKey(
+        User,
+        verbose_name='Пользователь',
+        on_delete=models.CASCADE,
+        related_name='shopping_totals',
+        help_text='Пользователь',
+    )
+    ingredient = models.ForeignKey(
+        Ingredient,
+        verbose_name='Ингредиент',
+        on_delete=models.CASCADE,
+        related_name='+',
+        help_text='Ингредиент',
+    )
+    amount = models.IntegerField(
+        verbose_name='Количество',
+        help_text='Сумма количеств ингредиента в рецептах для покупок',
+    )
+
+    class Meta:
+        verbose_name = 'Итог списка покупок'
+        verbose_name_plural = 'Итоги списков покупок'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('user', 'ingredient',),
+                name='unique_shopping_cart_total',
+            ),
+        ]
+
+
+class RecipePopularity(models.Model):
+    recipe = models.OneToOneField(
+        Recipe,
+        verbose_name='Рецепт',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='popularity',
+        help_text='Рецепт',
+    )
+    score = models.FloatField(
+        verbose_name='Популярность',
+        default=0,
+        help_text='Сумма весов добавлений с затуханием по времени',
+    )
+
+    class Meta:
+        verbose_name = 'Популярность рецепта'
+        verbose_name_plural = 'Популярность рецептов'
+        indexes = [
+            models.Index(
+                fields=('-score',),
+                name='recipe_popularity_score_idx',
+            ),
+        ]
+
+
+class TagPopularRecipe(models.Model):
+    tag = models.ForeignKey(
+        Tag,
+        verbose_name='Тег',
+        on_delete=models.CASCADE,
+        related_name='popular',
+        help_text='Тег',
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        verbose_name='Рецепт',
+        on_delete=models.CASCADE,
+        related_name='+',
+        help_text='Рецепт',
+    )
+    rank = models.PositiveIntegerField(
+        verbose_name='Место',
+        help_text='Место рецепта в рейтинге тега',
+    )
+
+    class Meta:
+        ordering = ('tag', 'rank',)
+        verbose_name = 'Популярный рецепт тега'
+        verbose_name_plural = 'Популярные рецепты тегов'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('tag', 'rank',),
+                name='unique_tag_popular_rank',
+            ),
+        ]
+
+
+class SimilarRecipe(models.Model):
+    recipe = models.ForeignKey(
+        Recipe,
+        verbose_name='Рецепт',
+        on_delete=models.CASCADE,
+        related_name='similar',
+        help_text='Рецепт',
+    )
+    similar = models.ForeignKey(
+        Recipe,
+        verbose_name='Похожий рецепт',
+        on_delete=models.CASCADE,
+        related_name='similar_to',
+        help_text='Похожий рецепт',
+    )
+    score = models.FloatField(
+        verbose_name='Сходство',
+        help_text='Косинусное сходство ингредиентов и тегов',
+    )
+
+    class Meta:
+        ordering = ('recipe', '-score',)
+        verbose_name = 'Похожий рецепт'
+        verbose_name_plural = 'Похожие рецепты'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('recipe', 'similar',),
+                name='unique_similar_recipe',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=('recipe', '-score'),
+                name='similar_recipe_score_idx',
+            ),
+        ]
+
+
+class SimilarRecipeQueue(models.Model):
+    recipe = models.OneToOneField(
+        Recipe,
+        verbose_name='Рецепт',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='+',
+        help_text='Рецепт, похожие рецепты которого нужно пересчитать',
+    )
+    created = models.DateTimeField(
+        verbose_name='Дата добавления',
+        auto_now_add=True,
+        help_text='Дата добавления',
+    )
+
+    class Meta:
+        verbose_name = 'Рецепт в очереди пересчёта похожих'
+        verbose_name_plural = 'Очередь пересчёта похожих рецептов'
@@ -0,0 +1,294 @@
+'''
+Поиск рецептов по продуктам, которые есть у пользователя.
+
+Каждый процесс держит в памяти инвертированный индекс: для ингредиента
+и тега хранится множество позиций рецептов, как в roaring bitmap, либо
+отсортированным массивом (редкие ингредиенты), либо упакованной битовой
+маской (частые). Запрос складывает множества продуктов пользователя в
+счётчик совпадений по всем рецептам сразу.
+
+Изменённые рецепты подгружаются раз в PANTRY_INDEX_REFRESH секунд по
+полю updated: старая позиция рецепта помечается удалённой, новая
+добавляется в конец. Уже загруженная версия рецепта повторно не
+добавляется. Рецепты, удалённые в других процессах, находятся сверкой
+id индекса с id в базе; сверка идёт, только если число и сумма id живых
+рецептов индекса разошлись с базой. Раз в PANTRY_INDEX_REBUILD секунд
+индекс строится заново и уплотняется.
+'''
+
+import itertools
+import threading
+import time
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Count, Max, Sum
+
+from .models import Recipe, RecipeIngredient
+
+#  Доля рецептов, начиная с которой множество хранится битовой маской.
+BITMAP_DENSITY = 1 / 32
+#  Запас при выборке изменённых рецептов на расхождение часов серверов.
+CLOCK_MARGIN = timedelta(seconds=5)
+
+
+def read_pairs(queryset, chunk_size=10000):
+    values = itertools.chain.from_iterable(
+        queryset.iterator(chunk_size=chunk_size)
+    )
+    return np.fromiter(values, dtype=np.int64).reshape(-1, 2)
+
+
+class PositionSet:
+    '''Позиции рецептов: массив или битовая маска плюс добавленные позже.'''
+
+    def __init__(self, positions, size):
+        self.size = size
+        if size and len(positions) >= size * BITMAP_DENSITY:
+            bits = np.zeros(size, dtype=bool)
+            bits[positions] = True
+            self.bitmap = np.packbits(bits)
+            self.array = None
+        else:
+            self.bitmap = None
+            self.array = np.sort(positions).astype(np.int32)
+        self.extra = []
+
+    def add(self, position):
+        self.extra.append(position)
+
+    def count_into(self, counter):
+        '''Прибавить единицу к counter во всех позициях множества.'''
+        if self.bitmap is not None:
+            counter[:self.size] += np.unpackbits(
+                self.bitmap, count=self.size
+            ).astype(counter.dtype)
+        else:
+            counter[self.array] += 1
+        if self.extra:
+            counter[self.extra] += 1
+
+
+def known_rows(recipe_ids, pairs):
+    '''Пары только известных рецептов и позиции этих рецептов.'''
+    if not len(recipe_ids):
+        return pairs[:0], pairs[:0, 0]
+    rows = np.minimum(
+        np.searchsorted(recipe_ids, pairs[:, 0]), len(recipe_ids) - 1
+    )
+    known = recipe_ids[rows] == pairs[:, 0]
+    return pairs[known], rows[known]
+
+
+def group_positions(pairs, rows, size):
+    '''Словарь id признака -> PositionSet по парам (рецепт, признак).'''
+    if not len(pairs):
+        return {}
+    order = np.argsort(pairs[:, 1], kind='stable')
+    features = pairs[order, 1]
+    positions = rows[order]
+    keys, starts = np.unique(features, return_index=True)
+    ends = np.append(starts[1:], len(features))
+    return {
+        int(key): PositionSet(positions[start:end], size)
+        for key, start, end in zip(keys, starts, ends)
+    }
+
+
+class PantryIndex:
+    '''Инвертированный индекс ингредиентов и тегов рецептов.'''
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.built = time.monotonic()
+        self.checked = self.built
+        self.synced = Recipe.objects.aggregate(last=Max('updated'))['last']
+        self.versions = {}
+        if self.synced is not None:
+            self.versions = dict(Recipe.objects.filter(
+                updated__gte=self.synced - CLOCK_MARGIN
+            ).values_list('id', 'updated'))
+        recipes = read_pairs(
+            Recipe.objects.order_by('id').values_list('id', 'author_id')
+        )
+        ingredients = read_pairs(RecipeIngredient.objects.order_by(
+        ).values_list('recipe_id', 'ingredient_id'))
+        tags = read_pairs(Recipe.tags.through.objects.order_by(
+        ).values_list('recipe_id', 'tag_id'))
+        size = len(recipes)
+        self.base_ids = recipes[:, 0]
+        self.recipe_ids = recipes[:, 0].copy()
+        self.authors = recipes[:, 1].copy()
+        self.alive = np.ones(size, dtype=bool)
+        self.appended = {}
+        ingredients, ingredient_rows = known_rows(self.base_ids, ingredients)
+        tags, tag_rows = known_rows(self.base_ids, tags)
+        self.sizes = np.bincount(
+            ingredient_rows, minlength=size
+        ).astype(np.int32)
+        self.ingredients = group_positions(ingredients, ingredient_rows, size)
+        self.tags = group_positions(tags, tag_rows, size)
+        self.dirty = False
+
+    def position_of(self, recipe_id):
+        if recipe_id in self.appended:
+            return self.appended[recipe_id]
+        position = np.searchsorted(self.base_ids, recipe_id)
+        if (position < len(self.base_ids)
+                and self.base_ids[position] == recipe_id):
+            return int(position)
+        return None
+
+    def remove(self, recipe_id):
+        position = self.position_of(recipe_id)
+        if position is not None:
+            self.alive[position] = False
+        self.appended.pop(recipe_id, None)
+        self.versions.pop(recipe_id, None)
+
+    def remove_deleted(self):
+        '''Сверить индекс с базой, если в базе другие рецепты.'''
+        alive = self.recipe_ids[self.alive]
+        stored = Recipe.objects.aggregate(count=Count('id'), total=Sum('id'))
+        if (stored['count'] != len(alive)
+                or (stored['total'] or 0) != int(alive.sum())):
+            self.remove_missing()
+
+    def remove_missing(self):
+        '''Пометить удалёнными рецепты, которых больше нет в базе.'''
+        existing = np.fromiter(
+            Recipe.objects.order_by().values_list('id', flat=True).iterator(
+                chunk_size=10000
+            ),
+            dtype=np.int64
+        )
+        deleted = self.alive & ~np.isin(self.recipe_ids, existing)
+        for recipe_id in self.recipe_ids[deleted].tolist():
+            self.remove(recipe_id)
+
+    def refresh(self):
+        '''Подгрузить изменения базы после прошлой синхронизации.'''
+        self.checked = time.monotonic()
+        self.dirty = False
+        self.load_changed()
+        self.remove_deleted()
+
+    def load_changed(self):
+        '''Подгрузить рецепты, изменённые после прошлой синхронизации.'''
+        changed = Recipe.objects.all()
+        if self.synced is not None:
+            changed = changed.filter(updated__gte=self.synced - CLOCK_MARGIN)
+        changed = [
+            (recipe_id, author_id, updated)
+            for recipe_id, author_id, updated in changed.order_by(
+                'updated'
+            ).values_list('id', 'author_id', 'updated')
+            if self.versions.get(recipe_id) != updated
+        ]
+        if not changed:
+            return
+        ids = [recipe_id for recipe_id, _, _ in changed]
+        ingredients = read_pairs(RecipeIngredient.objects.filter(
+            recipe_id__in=ids
+        ).order_by().values_list('recipe_id', 'ingredient_id'))
+        tags = read_pairs(Recipe.tags.through.objects.filter(
+            recipe_id__in=ids
+        ).order_by().values_list('recipe_id', 'tag_id'))
+        start = len(self.recipe_ids)
+        for recipe_id in ids:
+            self.remove(recipe_id)
+        positions = {
+            recipe_id: start + offset for offset, recipe_id in enumerate(ids)
+        }
+        self.appended.update(positions)
+        self.recipe_ids = np.append(self.recipe_ids, ids)
+        self.authors = np.append(
+            self.authors, [author_id for _, author_id, _ in changed]
+        )
+        self.alive = np.append(self.alive, np.ones(len(ids), dtype=bool))
+        self.sizes = np.append(self.sizes, np.zeros(len(ids), np.int32))
+        for recipe_id, ingredient_id in ingredients.tolist():
+            position = positions[recipe_id]
+            self.sizes[position] += 1
+            self.ingredients.setdefault(
+                ingredient_id, PositionSet(np.array([], np.int64), 0)
+            ).add(position)
+        for recipe_id, tag_id in tags.tolist():
+            self.tags.setdefault(
+                tag_id, PositionSet(np.array([], np.int64), 0)
+            ).add(positions[recipe_id])
+        self.versions.update(
+            (recipe_id, updated) for recipe_id, _, updated in changed
+        )
+        if self.synced is None or changed[-1][2] > self.synced:
+            self.synced = changed[-1][2]
+
+    def count(self, sets, keys):
+        counter = np.zeros(len(self.recipe_ids), dtype=np.int32)
+        for key in set(keys):
+            if key in sets:
+                sets[key].count_into(counter)
+        return counter
+
+    def search(self, ingredient_ids, max_missing=None, tag_ids=None,
+               author_id=None):
+        '''
+        Id рецептов, где есть хотя бы один продукт, с числом недостающих
+        ингредиентов и долей имеющихся, от самых подходящих.
+        '''
+        with self.lock:
+            present = self.count(self.ingredients, ingredient_ids)
+            mask = self.alive & (present > 0)
+            if tag_ids is not None:
+                mask &= self.count(self.tags, tag_ids) > 0
+            if author_id is not None:
+                mask &= self.authors == author_id
+            missing = self.sizes - present
+            if max_missing is not None:
+                mask &= missing <= max_missing
+            positions = np.flatnonzero(mask)
+            coverage = present[positions] / np.maximum(
+                self.sizes[positions], 1
+            )
+            order = np.lexsort((
+                -self.recipe_ids[positions],
+                -coverage,
+                missing[positions],
+            ))
+            positions = positions[order]
+            return (
+                self.recipe_ids[positions].tolist(),
+                missing[positions].tolist(),
+                coverage[order].tolist(),
+            )
+
+
+index_lock = threading.Lock()
+index = None
+
+
+def get_index():
+    '''Индекс текущего процесса, построенный или обновлённый при нужде.'''
+    global index
+    with index_lock:
+        now = time.monotonic()
+        if (index is None
+                or now - index.built > settings.PANTRY_INDEX_REBUILD):
+            index = PantryIndex()
+        elif (index.dirty
+                or now - index.checked > settings.PANTRY_INDEX_REFRESH):
+            with index.lock:
+                index.refresh()
+        return index
+
+
+def mark_dirty():
+    if index is not None:
+        index.dirty = True
+
+
+def remove_recipe(recipe_id):
+    if index is not None:
+        with index.lock:
+            index.remove(recipe_id)
@@ -0,0 +1,107 @@
+'''
+Популярность рецептов с экспоненциальным затуханием по времени.
+
+Добавление в избранное или покупки в момент t весит
+weight * 2 ** ((t - epoch) / half_life). Все веса отсчитываются от
+общей эпохи POPULARITY_EPOCH, поэтому в любой момент порядок рецептов
+по сохранённой сумме совпадает с порядком по затухшей популярности, и
+хранимые суммы не нужно пересчитывать со временем. Затухшее значение на
+момент now равно score * 2 ** (-(now - epoch) / half_life).
+
+При периоде полураспада в неделю значения укладываются во float
+примерно на 20 лет после эпохи.
+'''
+
+from datetime import datetime
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import (FavoriteRecipe, Recipe, RecipePopularity, ShoppingCart,
+                     TagPopularRecipe)
+
+EPOCH = datetime.fromisoformat(settings.POPULARITY_EPOCH)
+HALF_LIFE = settings.POPULARITY_HALF_LIFE_DAYS * 24 * 3600
+SOURCES = (
+    (FavoriteRecipe, settings.POPULARITY_WEIGHTS['favorite']),
+    (ShoppingCart, settings.POPULARITY_WEIGHTS['shopping_cart']),
+)
+
+
+def event_weight(model, created):
+    '''Вклад одного добавления, сделанного в момент created.'''
+    weight = dict(SOURCES)[model]
+    created = created or EPOCH
+    return weight * 2 ** ((created - EPOCH).total_seconds() / HALF_LIFE)
+
+
+def decayed(score, now=None):
+    '''Популярность с учётом затухания на момент now.'''
+    now = now or timezone.now()
+    return score * 2 ** (-(now - EPOCH).total_seconds() / HALF_LIFE)
+
+
+def add(recipe_id, delta):
+    updated = RecipePopularity.objects.filter(recipe_id=recipe_id).update(
+        score=F('score') + delta
+    )
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            RecipePopularity.objects.create(recipe_id=recipe_id, score=delta)
+    except IntegrityError:
+        RecipePopularity.objects.filter(recipe_id=recipe_id).update(
+            score=F('score') + delta
+        )
+
+
+def subtract(recipe_id, delta):
+    RecipePopularity.objects.filter(recipe_id=recipe_id).update(
+        score=Greatest(F('score') - delta, Value(0.0))
+    )
+
+
+def recompute(batch_size=5000):
+    '''Пересчитать популярность всех рецептов по избранному и покупкам.'''
+    scores = {}
+    for model, _ in SOURCES:
+        for recipe_id, created in model.objects.order_by().values_list(
+            'recipe_id', 'created'
+        ).iterator(chunk_size=batch_size):
+            scores[recipe_id] = (
+                scores.get(recipe_id, 0) + event_weight(model, created)
+            )
+    with transaction.atomic():
+        RecipePopularity.objects.all().delete()
+        RecipePopularity.objects.bulk_create(
+            (
+                RecipePopularity(recipe_id=recipe_id, score=score)
+                for recipe_id, score in scores.items()
+            ),
+            batch_size=batch_size,
+        )
+    return len(scores)
+
+
+def materialize_tags(count):
+    '''Сохранить первые count рецептов каждого тега по популярности.'''
+    tops = []
+    tag_ids = Recipe.tags.through.objects.order_by().values_list(
+        'tag_id', flat=True
+    ).distinct()
+    for tag_id in tag_ids:
+        recipe_ids = RecipePopularity.objects.filter(
+            recipe__tags=tag_id
+        ).order_by('-score').values_list('recipe_id', flat=True)[:count]
+        tops.extend(
+            TagPopularRecipe(tag_id=tag_id, recipe_id=recipe_id, rank=rank)
+            for rank, recipe_id in enumerate(recipe_ids, 1)
+        )
+    with transaction.atomic():
+        TagPopularRecipe.objects.all().delete()
+        TagPopularRecipe.objects.bulk_create(tops)
+    return len(tops)
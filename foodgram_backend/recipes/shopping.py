@@ -0,0 +1,135 @@
+'''
+Итоги списка покупок по ингредиентам.
+
+Таблица ShoppingCartTotal хранит для пользователя сумму количеств
+каждого ингредиента по всем рецептам его списка покупок. Она меняется
+на разницу в той же транзакции, что и сам список: при добавлении
+рецепта его ингредиенты прибавляются одним запросом
+INSERT ... ON CONFLICT DO UPDATE, при удалении прибавляются с обратным
+знаком, а обнулившиеся строки удаляются.
+
+Изменение состава рецепта (API, админка или любая запись RecipeIngredient
+через ORM) пересчитывает по сигналам итоги затронутых ингредиентов у
+пользователей, чей список покупок содержит рецепт. Внутри batch()
+пересчёты копятся и выполняются по одному на рецепт, иначе замена
+состава рецепта стоила бы запроса на каждую строку. bulk_create
+сигналов не вызывает: после него нужен refresh() или rebuild().
+'''
+
+from contextlib import contextmanager
+
+from asgiref.local import Local
+from django.db import connection, transaction
+
+from .models import RecipeIngredient, ShoppingCart, ShoppingCartTotal
+
+state = Local()
+
+UPSERT = '''
+    INSERT INTO {total} (user_id, ingredient_id, amount)
+    SELECT %s, ri.ingredient_id, %s * ri.amount
+    FROM {ingredient} ri
+    WHERE ri.recipe_id = %s
+    ON CONFLICT (user_id, ingredient_id)
+    DO UPDATE SET amount = {total}.amount + excluded.amount
+'''
+
+
+def apply(recipe_id, sign, user_id):
+    '''Прибавить ингредиенты рецепта к итогам списка покупок user_id.'''
+    sql = UPSERT.format(
+        total=ShoppingCartTotal._meta.db_table,
+        ingredient=RecipeIngredient._meta.db_table,
+    )
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [user_id, sign, recipe_id])
+        if sign < 0:
+            ShoppingCartTotal.objects.filter(
+                user_id=user_id, amount__lte=0
+            ).delete()
+
+
+def add_recipe(user_id, recipe_id):
+    apply(recipe_id, 1, user_id)
+
+
+def remove_recipe(user_id, recipe_id):
+    apply(recipe_id, -1, user_id)
+
+
+@contextmanager
+def batch():
+    '''Отложить пересчёты refresh() до выхода из блока.'''
+    if getattr(state, 'pending', None) is not None:
+        yield
+        return
+    state.pending = {}
+    try:
+        yield
+        pending, state.pending = state.pending, None
+        for recipe_id, ingredient_ids in pending.items():
+            refresh(recipe_id, ingredient_ids)
+    finally:
+        state.pending = None
+
+
+def refresh(recipe_id, ingredient_ids):
+    '''
+    Пересчитать итоги ingredient_ids у пользователей с рецептом recipe_id
+    в списке покупок.
+    '''
+    pending = getattr(state, 'pending', None)
+    if pending is not None:
+        pending.setdefault(recipe_id, set()).update(ingredient_ids)
+        return
+    ingredient_ids = list(ingredient_ids)
+    if not ingredient_ids:
+        return
+    users = ShoppingCart.objects.filter(recipe_id=recipe_id).values('user_id')
+    placeholders = ', '.join(['%s'] * len(ingredient_ids))
+    with transaction.atomic():
+        ShoppingCartTotal.objects.filter(
+            user_id__in=users, ingredient_id__in=ingredient_ids
+        ).delete()
+        with connection.cursor() as cursor:
+            cursor.execute(f'''
+                INSERT INTO {ShoppingCartTotal._meta.db_table}
+                    (user_id, ingredient_id, amount)
+                SELECT cart.user_id, ri.ingredient_id, SUM(ri.amount)
+                FROM {ShoppingCart._meta.db_table} cart
+                JOIN {RecipeIngredient._meta.db_table} ri
+                    ON ri.recipe_id = cart.recipe_id
+                WHERE ri.ingredient_id IN ({placeholders})
+                    AND cart.user_id IN (
+                        SELECT user_id FROM {ShoppingCart._meta.db_table}
+                        WHERE recipe_id = %s
+                    )
+                GROUP BY cart.user_id, ri.ingredient_id
+            ''', [*ingredient_ids, recipe_id])
+
+
+def rebuild():
+    '''Пересчитать итоги всех списков покупок с нуля.'''
+    with transaction.atomic():
+        ShoppingCartTotal.objects.all().delete()
+        with connection.cursor() as cursor:
+            cursor.execute(f'''
+                INSERT INTO {ShoppingCartTotal._meta.db_table}
+                    (user_id, ingredient_id, amount)
+                SELECT cart.user_id, ri.ingredient_id, SUM(ri.amount)
+                FROM {ShoppingCart._meta.db_table} cart
+                JOIN {RecipeIngredient._meta.db_table} ri
+                    ON ri.recipe_id = cart.recipe_id
+                GROUP BY cart.user_id, ri.ingredient_id
+            ''')
+            return cursor.rowcount
+
+
+def lines(user):
+    '''Строки (название, единица, количество) списка покупок user.'''
+    return ShoppingCartTotal.objects.filter(
+        user=user
+    ).order_by('ingredient__name').values_list(
+        'ingredient__name', 'ingredient__measurement_unit', 'amount'
+    )
@@ -0,0 +1,104 @@
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete, pre_save)
+from django.dispatch import receiver
+
+from . import pantry, popularity, shopping
+from .models import (FavoriteRecipe, Recipe, RecipeIngredient, ShoppingCart,
+                     SimilarRecipeQueue)
+
+
+@receiver(post_save, sender=Recipe)
+def queue_similar_recipes(sender, instance, raw=False, **kwargs):
+    '''Пересчёт похожих рецептов после создания или изменения рецепта.'''
+    if raw:
+        return
+    SimilarRecipeQueue.objects.get_or_create(recipe=instance)
+
+
+@receiver(post_save, sender=Recipe)
+def refresh_pantry_index(sender, instance, **kwargs):
+    '''Изменения видны в поиске по продуктам этого процесса сразу.'''
+    pantry.mark_dirty()
+
+
+@receiver(post_delete, sender=Recipe)
+def remove_from_pantry_index(sender, instance, **kwargs):
+    pantry.remove_recipe(instance.id)
+
+
+@receiver(post_save, sender=FavoriteRecipe)
+@receiver(post_save, sender=ShoppingCart)
+def add_popularity(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        popularity.add(
+            instance.recipe_id,
+            popularity.event_weight(sender, instance.created)
+        )
+
+
+@receiver(post_delete, sender=FavoriteRecipe)
+@receiver(post_delete, sender=ShoppingCart)
+def subtract_popularity(sender, instance, **kwargs):
+    popularity.subtract(
+        instance.recipe_id, popularity.event_weight(sender, instance.created)
+    )
+
+
+@receiver(post_save, sender=ShoppingCart)
+def add_to_shopping_totals(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        shopping.add_recipe(instance.user_id, instance.recipe_id)
+
+
+@receiver(pre_delete, sender=ShoppingCart)
+def subtract_from_shopping_totals(sender, instance, **kwargs):
+    '''
+    До удаления: при удалении рецепта его ингредиенты удаляются каскадом
+    в той же операции, и после неё их количества уже не прочитать.
+    '''
+    shopping.remove_recipe(instance.user_id, instance.recipe_id)
+
+
+@receiver(pre_save, sender=RecipeIngredient)
+def remember_recipe_ingredient(sender, instance, raw=False, **kwargs):
+    '''Прежние рецепт и ингредиент строки, их итоги тоже меняются.'''
+    instance._previous = None
+    if instance.pk and not raw:
+        instance._previous = RecipeIngredient.objects.filter(
+            pk=instance.pk
+        ).values_list('recipe_id', 'ingredient_id').first()
+
+
+@receiver(post_save, sender=RecipeIngredient)
+def refresh_shopping_totals(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous', None)
+    if previous is not None and previous[0] != instance.recipe_id:
+        shopping.refresh(previous[0], [previous[1]])
+        previous = None
+    shopping.refresh(instance.recipe_id, {
+        instance.ingredient_id, previous and previous[1]
+    } - {None})
+
+
+@receiver(post_delete, sender=RecipeIngredient)
+def refresh_shopping_totals_on_delete(sender, instance, **kwargs):
+    '''
+    При удалении рецепта списки покупок с ним могут ещё не удалиться:
+    пересчёт по живым строкам учитывает рецепт уже без ингредиентов.
+    '''
+    shopping.refresh(instance.recipe_id, [instance.ingredient_id])
+
+
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def refresh_shopping_totals_on_add(sender, instance, action, reverse,
+                                   pk_set, **kwargs):
+    '''Recipe.ingredients.add() создаёт строки через bulk_create.'''
+    if action != 'post_add':
+        return
+    if reverse:
+        for recipe_id in pk_set:
+            shopping.refresh(recipe_id, [instance.id])
+    else:
+        shopping.refresh(instance.id, pk_set)
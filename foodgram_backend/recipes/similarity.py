@@ -0,0 +1,225 @@
+'''
+Похожие рецепты по косинусному сходству ингредиентов и тегов.
+
+Рецепты представлены строками разреженной матрицы рецепт × признак.
+Признаки это ингредиенты и теги с весами TF-IDF, веса тегов
+дополнительно умножаются на SIMILAR_RECIPES_TAG_WEIGHT. Строки
+нормированы, поэтому произведение блока строк на транспонированную
+матрицу сразу даёт косинусное сходство блока со всеми рецептами.
+'''
+
+import itertools
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min
+from scipy import sparse
+
+from .models import (Recipe, RecipeIngredient, SimilarRecipe,
+                     SimilarRecipeQueue)
+
+#  Сколько самых похожих рецептов проверяется на попадание изменённого
+#  рецепта в их собственные списки.
+REVERSE_CANDIDATES = 1000
+
+
+def read_pairs(queryset, chunk_size=10000):
+    '''Пары (id, id) из values_list в массив без промежуточных кортежей.'''
+    values = itertools.chain.from_iterable(
+        queryset.iterator(chunk_size=chunk_size)
+    )
+    return np.fromiter(values, dtype=np.int64).reshape(-1, 2)
+
+
+class SimilarityIndex:
+    '''Нормированная матрица признаков всех рецептов.'''
+
+    def __init__(self, tag_weight=None):
+        if tag_weight is None:
+            tag_weight = settings.SIMILAR_RECIPES_TAG_WEIGHT
+        ingredients = read_pairs(RecipeIngredient.objects.order_by(
+        ).values_list('recipe_id', 'ingredient_id'))
+        tags = read_pairs(Recipe.tags.through.objects.order_by(
+        ).values_list('recipe_id', 'tag_id'))
+        recipes = np.concatenate((ingredients[:, 0], tags[:, 0]))
+        self.recipe_ids = np.unique(recipes)
+        ingredient_ids, ingredient_columns = np.unique(
+            ingredients[:, 1], return_inverse=True
+        )
+        tag_ids, tag_columns = np.unique(tags[:, 1], return_inverse=True)
+        rows = np.searchsorted(self.recipe_ids, recipes)
+        columns = np.concatenate(
+            (ingredient_columns, tag_columns + len(ingredient_ids))
+        )
+        shape = (len(self.recipe_ids), len(ingredient_ids) + len(tag_ids))
+        frequency = np.bincount(columns, minlength=shape[1])
+        idf = np.log((1 + shape[0]) / (1 + frequency)) + 1
+        weights = np.concatenate((
+            np.ones(len(ingredients)), np.full(len(tags), tag_weight)
+        )) * idf[columns]
+        matrix = sparse.csr_matrix((weights, (rows, columns)), shape=shape)
+        norms = np.sqrt(
+            np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel()
+        )
+        norms[norms == 0] = 1
+        self.matrix = sparse.diags(1 / norms).dot(matrix).tocsr()
+        self.transposed = self.matrix.T.tocsr()
+
+    def rows_of(self, recipe_ids):
+        '''Номера строк рецептов, у которых есть ингредиенты или теги.'''
+        recipe_ids = np.asarray(list(recipe_ids), dtype=np.int64)
+        if not len(self.recipe_ids) or not len(recipe_ids):
+            return np.array([], dtype=np.int64)
+        rows = np.searchsorted(self.recipe_ids, recipe_ids)
+        rows = np.minimum(rows, len(self.recipe_ids) - 1)
+        return rows[self.recipe_ids[rows] == recipe_ids]
+
+    def neighbours(self, rows, count, min_score, chunk_size):
+        '''(id рецепта, id похожих, сходство) для каждой строки rows.'''
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            scores = self.matrix[chunk].dot(self.transposed).tocsr()
+            for offset, row in enumerate(chunk):
+                begin, end = scores.indptr[offset], scores.indptr[offset + 1]
+                columns = scores.indices[begin:end]
+                values = scores.data[begin:end]
+                keep = (columns != row) & (values >= min_score)
+                columns, values = columns[keep], values[keep]
+                if len(values) > count:
+                    top = np.argpartition(-values, count)[:count]
+                    columns, values = columns[top], values[top]
+                order = np.argsort(-values, kind='stable')
+                yield (
+                    int(self.recipe_ids[row]),
+                    self.recipe_ids[columns[order]].tolist(),
+                    values[order].tolist(),
+                )
+
+    def reverse_candidates(self, rows, min_score):
+        '''Для каждой строки rows самые похожие на неё рецепты.'''
+        scores = self.matrix.dot(self.matrix[rows].T).tocsc()
+        for offset, row in enumerate(rows):
+            begin, end = scores.indptr[offset], scores.indptr[offset + 1]
+            others = scores.indices[begin:end]
+            values = scores.data[begin:end]
+            keep = (others != row) & (values >= min_score)
+            others, values = others[keep], values[keep]
+            if len(values) > REVERSE_CANDIDATES:
+                top = np.argpartition(-values, REVERSE_CANDIDATES)
+                others = others[top[:REVERSE_CANDIDATES]]
+                values = values[top[:REVERSE_CANDIDATES]]
+            yield (
+                int(self.recipe_ids[row]),
+                self.recipe_ids[others].tolist(),
+                values.tolist(),
+            )
+
+
+def save_neighbours(index, rows, count, min_score, chunk_size):
+    '''Заменить списки похожих рецептов для строк rows.'''
+    saved = 0
+    for start in range(0, len(rows), chunk_size):
+        recipe_ids = []
+        similar = []
+        for recipe_id, similar_ids, scores in index.neighbours(
+            rows[start:start + chunk_size], count, min_score, chunk_size
+        ):
+            recipe_ids.append(recipe_id)
+            similar.extend(
+                SimilarRecipe(
+                    recipe_id=recipe_id, similar_id=similar_id, score=score
+                )
+                for similar_id, score in zip(similar_ids, scores)
+            )
+        with transaction.atomic():
+            SimilarRecipe.objects.filter(recipe_id__in=recipe_ids).delete()
+            SimilarRecipe.objects.bulk_create(similar, batch_size=5000)
+        saved += len(recipe_ids)
+    return saved
+
+
+def update_recipes(index, recipe_ids, count, min_score, chunk_size):
+    '''
+    Пересчитать похожие для изменённых рецептов.
+
+    Собственные списки рецептов считаются заново, а в списки других
+    рецептов изменённый рецепт вставляется, если попадает в их первые
+    count по сходству. Изменение рецепта сдвигает веса IDF и у других
+    пар, поэтому остальные списки остаются приближёнными до следующего
+    полного пересчёта.
+    '''
+    recipe_ids = set(recipe_ids)
+    rows = index.rows_of(recipe_ids)
+    save_neighbours(index, rows, count, min_score, chunk_size)
+    SimilarRecipe.objects.filter(
+        recipe_id__in=recipe_ids - set(index.recipe_ids[rows].tolist())
+    ).delete()
+    SimilarRecipe.objects.filter(similar_id__in=recipe_ids).exclude(
+        recipe_id__in=recipe_ids
+    ).delete()
+    candidates = {}
+    for recipe_id, others, scores in index.reverse_candidates(
+        rows, min_score
+    ):
+        for other, score in zip(others, scores):
+            if other not in recipe_ids:
+                candidates.setdefault(other, []).append((recipe_id, score))
+    others = list(candidates)
+    for start in range(0, len(others), chunk_size):
+        chunk = others[start:start + chunk_size]
+        current = {
+            item['recipe_id']: (item['total'], item['lowest'])
+            for item in SimilarRecipe.objects.filter(
+                recipe_id__in=chunk
+            ).order_by().values('recipe_id').annotate(
+                total=Count('id'), lowest=Min('score')
+            )
+        }
+        similar = []
+        overflow = []
+        for other in chunk:
+            total, lowest = current.get(other, (0, 0))
+            added = [
+                SimilarRecipe(recipe_id=other, similar_id=recipe_id,
+                              score=score)
+                for recipe_id, score in candidates[other]
+                if total < count or score > lowest
+            ]
+            similar.extend(added)
+            if added and total + len(added) > count:
+                overflow.append(other)
+        SimilarRecipe.objects.bulk_create(similar, batch_size=5000)
+        for other in overflow:
+            extra = SimilarRecipe.objects.filter(
+                recipe_id=other
+            ).order_by('-score').values_list('id', flat=True)[count:]
+            SimilarRecipe.objects.filter(id__in=list(extra)).delete()
+    return len(rows)
+
+
+def take_queued():
+    '''
+    Забрать id рецептов из очереди SimilarRecipeQueue в отдельной короткой
+    транзакции: изменение рецепта во время долгого пересчёта снова
+    ставит его в очередь, а не упирается в ещё не удалённую строку.
+    '''
+    with transaction.atomic():
+        recipe_ids = list(SimilarRecipeQueue.objects.select_for_update(
+            skip_locked=True
+        ).values_list('recipe_id', flat=True))
+        SimilarRecipeQueue.objects.filter(recipe_id__in=recipe_ids).delete()
+    return recipe_ids
+
+
+def requeue(recipe_ids):
+    '''Вернуть в очередь рецепты, пересчёт которых не удался.'''
+    SimilarRecipeQueue.objects.bulk_create(
+        [
+            SimilarRecipeQueue(recipe_id=recipe_id)
+            for recipe_id in Recipe.objects.filter(
+                id__in=recipe_ids
+            ).values_list('id', flat=True)
+        ],
+        ignore_conflicts=True,
+    )
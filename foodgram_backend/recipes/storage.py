@@ -0,0 +1,53 @@
+'''
+Хранилище изображений рецептов по хешу содержимого.
+
+Имя файла - SHA-256 его байтов, который считается за один проход при
+записи во временный файл рядом с целевым. Одинаковые загрузки получают
+одно имя и хранятся один раз, а файл под этим именем никогда не
+меняется, поэтому nginx отдаёт медиафайлы с Cache-Control: immutable.
+'''
+
+import hashlib
+import os
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+
+    def get_available_name(self, name, max_length=None):
+        #  Итоговое имя выбирает _save по содержимому, а совпадение имён
+        #  означает совпадение файлов.
+        return name
+
+    def _save(self, name, content):
+        directory, filename = os.path.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        os.makedirs(self.path(directory), exist_ok=True)
+        digest = hashlib.sha256()
+        handle, temporary = tempfile.mkstemp(
+            dir=self.path(directory), prefix='.upload-'
+        )
+        try:
+            with os.fdopen(handle, 'wb') as file:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    file.write(chunk)
+            digest = digest.hexdigest()
+            name = os.path.join(directory, digest[:2], digest + extension)
+            path = self.path(name)
+            if os.path.exists(path):
+                #  Свежая дата изменения не даёт gc_media удалить файл,
+                #  который только что снова стал нужен.
+                os.utime(path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.chmod(temporary, self.file_permissions_mode or 0o644)
+                os.replace(temporary, path)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+        return name.replace('\\', '/')
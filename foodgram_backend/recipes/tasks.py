@@ -0,0 +1,63 @@
+'''
+Фоновые задачи рецептов.
+
+Задачи ставятся с ключом идемпотентности, равным имени, и с задержкой,
+поэтому серия изменений за это время обрабатывается одним запуском.
+Постановка выполняется после коммита транзакции запроса: вставка с
+общим ключом внутри транзакции держала бы блокировку уникального
+индекса до коммита, и параллельные запросы выстраивались бы в очередь.
+Если процесс упадёт между коммитом и постановкой, изменения подберёт
+периодический recompute_popularity или следующая постановка.
+'''
+
+from django.conf import settings
+from django.db import transaction
+
+from jobs.queue import enqueue, task
+from .popularity import materialize_tags
+
+SIMILAR_RECIPES = 'recipes.similar_recipes'
+POPULAR_TAGS = 'recipes.popular_tags'
+
+
+@task(SIMILAR_RECIPES)
+def similar_recipes():
+    '''
+    Пересчитать похожие для рецептов из очереди SimilarRecipeQueue. При
+    ошибке рецепты возвращаются в очередь и достаются следующей попытке.
+    '''
+    #  numpy и scipy нужны только воркерам очереди, не веб-процессам.
+    from .similarity import (SimilarityIndex, requeue, take_queued,
+                             update_recipes)
+
+    recipe_ids = take_queued()
+    if not recipe_ids:
+        return
+    try:
+        index = SimilarityIndex()
+        with transaction.atomic():
+            update_recipes(
+                index, recipe_ids, settings.SIMILAR_RECIPES_COUNT,
+                settings.SIMILAR_RECIPES_MIN_SCORE, chunk_size=256,
+            )
+    except BaseException:
+        requeue(recipe_ids)
+        raise
+
+
+@task(POPULAR_TAGS)
+def popular_tags():
+    materialize_tags(settings.POPULARITY_TOP_COUNT)
+
+
+def schedule_similar_recipes():
+    transaction.on_commit(lambda: enqueue(
+        SIMILAR_RECIPES, key=SIMILAR_RECIPES,
+        delay=settings.SIMILAR_RECIPES_DELAY,
+    ))
+
+
+def schedule_popular_tags():
+    transaction.on_commit(lambda: enqueue(
+        POPULAR_TAGS, key=POPULAR_TAGS, delay=settings.POPULARITY_TAGS_DELAY
+    ))
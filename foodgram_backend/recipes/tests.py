@@ -0,0 +1,244 @@
+import base64
+import hashlib
+import io
+import os
+import tempfile
+import time
+
+from django.core.management import call_command
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from jobs.models import Job
+from users.models import User
+from . import pantry, similarity, tasks
+from .models import (Ingredient, Recipe, RecipeIngredient,
+                     SimilarRecipeQueue, Tag)
+
+#  Прозрачный PNG 1x1.
+PNG = base64.b64decode(
+    'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAC'
+    'hwGA60e6kgAAAABJRU5ErkJggg=='
+)
+
+
+class GcMediaTest(TestCase):
+    '''Удаление изображений, на которые не ссылается ни один рецепт.'''
+
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        self.images = os.path.join(self.media.name, 'recipes', 'images')
+        os.makedirs(os.path.join(self.images, 'old'))
+        user = User.objects.create_user(
+            username='cook', email='cook@example.com', password='password'
+        )
+        Recipe.objects.create(
+            author=user, name='суп', text='суп', cooking_time=10,
+            image='recipes/images/used.png',
+        )
+        day_ago = time.time() - 24 * 3600 - 60
+        for name, age in (
+            ('used.png', day_ago), ('orphan.png', day_ago),
+            ('old/orphan.png', day_ago), ('fresh.png', None),
+        ):
+            path = os.path.join(self.images, name)
+            with open(path, 'wb') as file:
+                file.write(b'x' * 1024)
+            if age:
+                os.utime(path, (age, age))
+
+    def files(self):
+        return sorted(
+            os.path.relpath(os.path.join(directory, name), self.images)
+            for directory, _, names in os.walk(self.images)
+            for name in names
+        )
+
+    def gc(self, **options):
+        output = io.StringIO()
+        with override_settings(MEDIA_ROOT=self.media.name):
+            call_command('gc_media', chunk_size=2, stdout=output, **options)
+        return output.getvalue()
+
+    def test_dry_run(self):
+        output = self.gc(dry_run=True)
+        self.assertIn('без ссылок: 2', output)
+        self.assertEqual(len(self.files()), 4)
+
+    def test_removes_old_orphans(self):
+        output = self.gc()
+        self.assertIn('Удалено файлов: 2', output)
+        self.assertEqual(self.files(), ['fresh.png', 'used.png'])
+
+
+class ContentAddressedStorageTest(TestCase):
+    '''Одинаковые изображения хранятся одним файлом с именем по хешу.'''
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        settings = override_settings(MEDIA_ROOT=media.name)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.media = media.name
+        self.user = User.objects.create_user(
+            username='cook', email='cook@example.com', password='password'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.data = {
+            'name': 'суп',
+            'text': 'суп',
+            'cooking_time': 10,
+            'image': 'data:image/png;base64,' + base64.b64encode(
+                PNG
+            ).decode(),
+            'tags': [Tag.objects.create(
+                name='Обед', color='#000000', slug='lunch'
+            ).id],
+            'ingredients': [{
+                'id': Ingredient.objects.create(
+                    name='соль', measurement_unit='г'
+                ).id,
+                'amount': 1,
+            }],
+        }
+
+    def test_identical_uploads_share_file(self):
+        first = self.client.post('/api/recipes/', self.data, format='json')
+        self.assertEqual(first.status_code, 201, first.content)
+        second = self.client.patch(
+            f'/api/recipes/{first.json()["id"]}/', self.data, format='json'
+        )
+        self.assertEqual(second.status_code, 200, second.content)
+        self.client.post('/api/recipes/', self.data, format='json')
+        digest = hashlib.sha256(PNG).hexdigest()
+        self.assertEqual(
+            set(Recipe.objects.values_list('image', flat=True)),
+            {f'recipes/images/{digest[:2]}/{digest}.png'},
+        )
+        files = [
+            name for _, _, names in os.walk(self.media) for name in names
+        ]
+        self.assertEqual(files, [f'{digest}.png'])
+
+
+class ScheduleAfterCommitTest(TestCase):
+    '''Задачи пересчёта ставятся только после коммита запроса.'''
+
+    def test_favorite_enqueues_after_commit(self):
+        user = User.objects.create_user(
+            username='cook', email='cook@example.com', password='password'
+        )
+        recipe = Recipe.objects.create(
+            author=user, name='суп', text='суп', cooking_time=10,
+            image='recipes/images/soup.png',
+        )
+        client = APIClient()
+        client.force_authenticate(user)
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = client.post(f'/api/recipes/{recipe.id}/favorite/')
+            self.assertEqual(response.status_code, 201)
+            self.assertFalse(Job.objects.exists())
+        for callback in callbacks:
+            callback()
+        self.assertEqual(
+            list(Job.objects.values_list('key', flat=True)),
+            [tasks.POPULAR_TAGS],
+        )
+
+
+class PantryIndexRefreshTest(TestCase):
+    '''Обновление индекса продуктов, построенного в другом процессе.'''
+
+    def setUp(self):
+        user = User.objects.create_user(
+            username='cook', email='cook@example.com', password='password'
+        )
+        self.salt = Ingredient.objects.create(
+            name='соль', measurement_unit='г'
+        )
+        self.recipes = [
+            Recipe.objects.create(
+                author=user, name=name, text=name, cooking_time=10,
+                image=f'recipes/images/{number}.png',
+            )
+            for number, name in enumerate(('суп', 'каша'))
+        ]
+        for recipe in self.recipes:
+            RecipeIngredient.objects.create(
+                recipe=recipe, ingredient=self.salt, amount=5
+            )
+        self.index = pantry.PantryIndex()
+
+    def search(self):
+        return sorted(self.index.search([self.salt.id])[0])
+
+    def test_deleted_recipe_disappears(self):
+        self.recipes[0].delete()
+        self.index.refresh()
+        self.assertEqual(self.search(), [self.recipes[1].id])
+
+    def test_deleted_and_created_recipes(self):
+        self.recipes[0].delete()
+        recipe = Recipe.objects.create(
+            author=self.recipes[1].author, name='борщ', text='борщ',
+            cooking_time=10, image='recipes/images/2.png',
+        )
+        RecipeIngredient.objects.create(
+            recipe=recipe, ingredient=self.salt, amount=5
+        )
+        self.index.refresh()
+        self.assertEqual(self.search(), [self.recipes[1].id, recipe.id])
+
+    def test_unchanged_base_is_not_scanned(self):
+        with mock.patch.object(self.index, 'remove_missing') as scan:
+            self.index.refresh()
+        scan.assert_not_called()
+
+    def test_repeated_refresh_keeps_one_entry(self):
+        self.recipes[0].name = 'борщ'
+        self.recipes[0].save()
+        for _ in range(3):
+            self.index.refresh()
+        self.assertEqual(len(self.index.recipe_ids), 3)
+        self.assertEqual(
+            self.search(), sorted(recipe.id for recipe in self.recipes)
+        )
+
+
+class SimilarRecipesQueueTest(TestCase):
+    '''Очередь пересчёта похожих рецептов не теряет рецепты.'''
+
+    def setUp(self):
+        user = User.objects.create_user(
+            username='cook', email='cook@example.com', password='password'
+        )
+        self.recipe = Recipe.objects.create(
+            author=user, name='суп', text='суп', cooking_time=10,
+            image='recipes/images/soup.png',
+        )
+
+    def queued(self):
+        return list(
+            SimilarRecipeQueue.objects.values_list('recipe_id', flat=True)
+        )
+
+    def test_failed_update_requeues(self):
+        with mock.patch.object(
+            similarity, 'update_recipes', side_effect=RuntimeError
+        ):
+            with self.assertRaises(RuntimeError):
+                tasks.similar_recipes()
+        self.assertEqual(self.queued(), [self.recipe.id])
+
+    def test_edit_during_update_stays_queued(self):
+        def edit(*args, **kwargs):
+            self.recipe.save()
+
+        with mock.patch.object(similarity, 'update_recipes', edit):
+            tasks.similar_recipes()
+        self.assertEqual(self.queued(), [self.recipe.id])
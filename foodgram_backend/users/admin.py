@@ -1,12 +1,15 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 
+from api.pagination import EstimatedCountPaginator
 from .models import User
 
 
 @admin.register(User)
 class UserAdmin(UserAdmin):
     list_display = ('id', 'username', 'email', 'first_name', 'last_name',)
-    list_filter = ('username', 'email',)
+    list_filter = ('is_staff', 'is_active',)
     search_fields = ('username', 'email',)
     empty_value_display = 'не заполнено'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False